@@ -3,12 +3,27 @@ import sys
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from flask import Flask, render_template, request, jsonify
-from src.utils.test_generator import TestGenerator
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context, url_for, send_file
+from src.utils.test_generator import TestGenerator, provider_pool
 from src.utils.test_executor import TestExecutor
+from src.utils.run_store import RunStore
+from src.utils.page_store import PageStore, SQLitePageStore
+from src.utils.job_queue import JobQueue, SQLiteJobQueue, QueueFullError
+from src.utils.single_flight import SingleFlight
+from src.utils.llm_gate import backend_gate, LLMBusyError, INTERACTIVE, BATCH, PRIORITIES
+from src.utils import metrics
+from src.utils.profiler import ProfileStore
+from src.utils import tracing
+from src.utils.transcripts import transcript_store
+from src.utils.model_warmup import model_warmer
+from src.utils.test_dedup import request_signature, deduplicate_test_cases
+from config.config import settings
+import functools
 import logging
 import requests
 import json
+import time
+import math
 
 # Update the app.py file to correctly find the templates
 
@@ -24,11 +39,225 @@ template_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', '
 static_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'static')
 app = Flask(__name__, template_folder=template_dir, static_folder=static_dir)
 
+# Every executed test is appended to the run history as it completes
+run_store = RunStore(settings.RUN_STORE_PATH)
+
+# Generated suites and run results kept server-side so the UI can page through them
+test_case_fields = ('description', 'test_type', 'expected_status_code')
+result_fields = ('test_name', 'test_type', 'status', 'expected_status_code', 'actual_status_code')
+job_options = dict(
+    max_workers=settings.JOB_WORKERS,
+    max_pending=settings.JOB_MAX_PENDING,
+    retention_seconds=settings.JOB_RETENTION_SECONDS
+)
+if settings.STATE_DB_PATH:
+    # Multi-process serving: any worker must be able to answer for any job or page
+    test_case_pages = SQLitePageStore(settings.STATE_DB_PATH, 'test_cases', test_case_fields)
+    result_pages = SQLitePageStore(settings.STATE_DB_PATH, 'results', result_fields)
+    job_queue = SQLiteJobQueue(settings.STATE_DB_PATH, lease_seconds=settings.JOB_LEASE_SECONDS, **job_options)
+else:
+    test_case_pages = PageStore(test_case_fields)
+    result_pages = PageStore(result_fields)
+    # Generation and runs submitted as jobs execute here instead of holding a request worker
+    job_queue = JobQueue(**job_options)
+
+def runtime_metrics():
+    """Gate, coalescing and job queue state, read fresh on every scrape"""
+    gate = backend_gate.stats()
+    flights = generation_flights.stats()
+    yield ('gentest_llm_gate_active', 'gauge', 'Model calls currently running', [({}, gate['active'])])
+    yield ('gentest_llm_gate_queue_depth', 'gauge', 'Model calls waiting for a slot', [({}, gate['queue_depth'])])
+    yield ('gentest_llm_gate_rejected_total', 'counter', 'Model calls turned away at the gate', [
+        ({'reason': 'queue_full'}, gate['rejected_queue_full']),
+        ({'reason': 'deadline'}, gate['rejected_deadline'])
+    ])
+    yield ('gentest_generation_coalesced_waiters_total', 'counter',
+           'Generation requests answered by an identical in-flight generation', [({}, flights['coalesced_waiters'])])
+    backends = provider_pool.stats()
+    yield ('gentest_llm_backend_up', 'gauge', 'Model backends whose circuit breaker is closed',
+           [({'backend': backend['backend']}, int(backend['state'] == 'closed')) for backend in backends])
+    yield ('gentest_llm_backend_outstanding', 'gauge', 'Model calls in flight per backend',
+           [({'backend': backend['backend']}, backend['outstanding']) for backend in backends])
+
+def job_metrics():
+    yield ('gentest_jobs', 'gauge', 'Background jobs by state',
+           [({'state': state}, count) for state, count in job_queue.stats().items()])
+
+metrics.REGISTRY.add_collector(runtime_metrics)
+# With STATE_DB_PATH every worker reads the same queue, so it is reported once rather than per worker
+metrics.REGISTRY.add_collector(job_metrics, shared=isinstance(job_queue, SQLiteJobQueue))
+if settings.METRICS_DIR:
+    metrics.REGISTRY.share(settings.METRICS_DIR)
+
+def preload_resources():
+    """Load shared read-only state once; under gunicorn --preload this runs before workers fork"""
+    from src.utils.html_reporter import HTMLReporter, _load_template
+    from src.utils.test_generator import shared_ai_provider
+
+    reporter = HTMLReporter()
+    _load_template(reporter.template_dir, reporter.template_name)
+    if settings.PRELOAD_MODEL:
+        shared_ai_provider()
+    app.logger.info(f"Preloaded resources (model: {'yes' if settings.PRELOAD_MODEL else 'no'})")
+
+def start_model_warmup():
+    """Load the Ollama model now instead of inside the first request's timeout, then keep it loaded"""
+    if settings.MODEL_WARMUP:
+        model_warmer.start(TestGenerator()._select_model, provider_pool)
+
+# Opt-in cProfile captures of slow requests, newest PROFILE_MAX_FILES kept
+profile_store = ProfileStore(settings.PROFILE_DIR, settings.PROFILE_MAX_FILES)
+
+def profiling_requested():
+    return settings.PROFILE_REQUESTS or request.headers.get('X-Profile', '').lower() in ('1', 'true', 'yes')
+
+def profiled(view):
+    """Run the view under the profiler when asked to; the response names the capture in X-Profile-Id"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not profiling_requested():
+            return view(*args, **kwargs)
+        result, profile_id = profile_store.run(f"{request.method} {request.path}", view, *args, **kwargs)
+        response = app.make_response(result)
+        if profile_id:
+            response.headers['X-Profile-Id'] = profile_id
+            response.headers['X-Profile-Url'] = url_for('profile_report', profile_id=profile_id)
+        return response
+    return wrapper
+
+# Identical generations running at the same time in this worker process share one model call
+generation_flights = SingleFlight()
+
+def generate_suite(curl_command, priority=INTERACTIVE, deadline_at=None):
+    """Generate test cases, joining an in-flight generation of the same request if there is one"""
+    def generate():
+        test_generator = TestGenerator(priority=priority, deadline_at=deadline_at)
+        test_cases = test_generator.generate_test_cases(curl_command)
+        return test_cases, test_generator.last_dedup_stats, test_generator.last_transcript_id
+
+    # A deadline-bound generation may stop early, so only callers with the same deadline share it
+    key = ('generate', request_signature(curl_command))
+    if deadline_at is not None:
+        key += (deadline_at,)
+    (test_cases, dedup_stats, transcript_id), shared = generation_flights.do(key, generate)
+    return test_cases, dedup_stats, shared, transcript_id
+
+def generation_job(curl_command, priority=INTERACTIVE):
+    """Generate a suite and keep it pageable; the job result only carries the id"""
+    test_cases, dedup_stats, shared, transcript_id = generate_suite(curl_command, priority)
+    return {
+        'generation_id': test_case_pages.put(test_cases),
+        'test_count': len(test_cases),
+        'dedup_stats': dedup_stats,
+        'coalesced': shared,
+        'transcript_id': transcript_id
+    }
+
+def enrichment_job(curl_command, deadline_at, known_cases, priority=BATCH):
+    """Model-generated cases beyond the deterministic ones, kept only if they are ready before the deadline.
+    
+    The gate wait, each model call and the retries are all bounded by deadline_at.
+    """
+    if time.time() >= deadline_at:
+        # Sat in the job queue past the deadline; not worth a model call any more
+        metrics.GENERATION_ENRICHMENTS.inc(outcome='expired')
+        return {'outcome': 'expired', 'added_cases': [], 'added_count': 0}
+    try:
+        test_cases, dedup_stats, shared, transcript_id = generate_suite(curl_command, priority, deadline_at)
+    except LLMBusyError:
+        # Not admitted to the backend before the deadline (or its queue was full)
+        outcome = 'expired' if time.time() >= deadline_at else 'rejected'
+        metrics.GENERATION_ENRICHMENTS.inc(outcome=outcome)
+        return {'outcome': outcome, 'added_cases': [], 'added_count': 0}
+    if time.time() > deadline_at:
+        metrics.GENERATION_ENRICHMENTS.inc(outcome='dropped')
+        return {'outcome': 'dropped', 'added_cases': [], 'added_count': 0, 'transcript_id': transcript_id}
+    # Known cases come first, so only model cases sending a request not already covered survive
+    merged, _ = deduplicate_test_cases(known_cases + test_cases, curl_command)
+    added = merged[len(known_cases):]
+    metrics.GENERATION_ENRICHMENTS.inc(outcome='appended')
+    return {
+        'outcome': 'appended',
+        'added_cases': added,
+        'added_count': len(added),
+        'generation_id': test_case_pages.put(merged),
+        'test_count': len(merged),
+        'coalesced': shared,
+        'transcript_id': transcript_id
+    }
+
+def hybrid_generation(curl_command, deadline_seconds):
+    """Deterministic tests now; the model's extra tests from a background job that must finish by the deadline"""
+    test_cases = TestGenerator().deterministic_test_cases(curl_command)
+    deadline_at = time.time() + deadline_seconds
+    response = {'status': 'success', 'test_cases': test_cases, 'deadline_at': deadline_at}
+    try:
+        # Batch priority: interactive generations waiting at the gate go first
+        job = job_queue.submit('enrich', enrichment_job, curl_command=curl_command, deadline_at=deadline_at,
+                               known_cases=[dict(test_case) for test_case in test_cases], priority=BATCH)
+    except QueueFullError as e:
+        app.logger.warning(f"Skipped enrichment: {str(e)}")
+        metrics.GENERATION_ENRICHMENTS.inc(outcome='rejected')
+        response['enrichment'] = None
+        return response
+    response['enrichment'] = {
+        'job_id': job.id,
+        'status_url': url_for('job_status', job_id=job.id),
+        'events_url': url_for('job_events', job_id=job.id)
+    }
+    return response
+
+def run_job(curl_command, priority=INTERACTIVE):
+    """Run a suite and keep the results pageable"""
+    results = TestExecutor(run_store=run_store, priority=priority).run_all_tests(curl_command)
+    return {
+        'results_id': result_pages.put(results),
+        'test_count': len(results),
+        'passed': sum(1 for result in results if result.get('status') == 'PASS')
+    }
+
+def submit_job(kind, func, curl_command, priority=INTERACTIVE):
+    if not curl_command:
+        return jsonify({'status': 'error', 'error': 'No curl command provided'}), 400
+    if priority not in PRIORITIES:
+        return jsonify({'status': 'error', 'error': f"Unknown priority: {priority}"}), 400
+    if profiling_requested():
+        # The job body runs on a worker thread, so the capture wraps it there
+        profile_id, job_func = profile_store.new_id(), func
+        profile_url = url_for('profile_report', profile_id=profile_id)
+
+        def func(**params):
+            result, captured = profile_store.run(f"{kind} job", job_func, profile_id=profile_id, **params)
+            # None when the profiler was busy with another capture and the job ran unprofiled
+            return {**result, 'profile_id': captured, 'profile_url': profile_url if captured else None}
+    try:
+        job = job_queue.submit(kind, func, curl_command=curl_command, priority=priority)
+    except QueueFullError as e:
+        app.logger.warning(f"Rejected {kind} job: {str(e)}")
+        return jsonify({'status': 'error', 'error': 'Job queue is full, retry later'}), 503, {'Retry-After': '30'}
+    response = {
+        'status': 'accepted',
+        'job_id': job.id,
+        'status_url': url_for('job_status', job_id=job.id),
+        'events_url': url_for('job_events', job_id=job.id)
+    }
+    return jsonify(response), 202
+
+def requested_page_size(data):
+    """The body's page_size as a positive int, or None when the client doesn't page; ValueError otherwise"""
+    page_size = data.get('page_size')
+    if not page_size:
+        return None
+    if isinstance(page_size, bool) or not str(page_size).isdecimal() or int(page_size) < 1:
+        raise ValueError('page_size must be a positive integer')
+    return int(page_size)
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/generate-tests', methods=['POST'])
+@profiled
 def generate_tests():
     try:
         data = request.get_json()
@@ -40,18 +269,60 @@ def generate_tests():
                 'error': 'No curl command provided'
             }), 400
         
+        try:
+            page_size = requested_page_size(data)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'error': str(e)}), 400
+        
+        # With a deadline, answer with the deterministic tests at once and let the model catch up in the background
+        deadline_seconds = data.get('deadline_seconds')
+        if deadline_seconds is not None:
+            try:
+                deadline_seconds = math.nan if isinstance(deadline_seconds, bool) else float(deadline_seconds)
+            except (TypeError, ValueError):
+                deadline_seconds = math.nan
+            if not math.isfinite(deadline_seconds) or deadline_seconds <= 0:
+                return jsonify({
+                    'status': 'error',
+                    'error': 'deadline_seconds must be a positive number of seconds'
+                }), 400
+            deadline_seconds = min(deadline_seconds, settings.GENERATION_MAX_DEADLINE_SECONDS)
+            return jsonify(hybrid_generation(curl_command, deadline_seconds))
+        
         # Generate test cases using the TestGenerator
         app.logger.info("Generating test cases using AI")
-        test_generator = TestGenerator()
-        test_cases = test_generator.generate_test_cases(curl_command)
+        test_cases, dedup_stats, shared, transcript_id = generate_suite(curl_command)
         
-        app.logger.info(f"Generated {len(test_cases)} test cases")
+        app.logger.info(f"Generated {len(test_cases)} test cases{' (shared with a concurrent request)' if shared else ''}")
+        
+        # Paged clients get the first page of summaries and fetch the rest on demand
+        if page_size:
+            generation_id = test_case_pages.put(test_cases)
+            return jsonify({
+                'status': 'success',
+                'generation_id': generation_id,
+                'page': test_case_pages.page(generation_id, 0, page_size),
+                'dedup_stats': dedup_stats,
+                'coalesced': shared,
+                'transcript_id': transcript_id
+            })
         
         return jsonify({
             'status': 'success',
-            'test_cases': test_cases
+            'test_cases': test_cases,
+            'dedup_stats': dedup_stats,
+            'coalesced': shared,
+            'transcript_id': transcript_id
         })
         
+    except LLMBusyError as e:
+        # Turned away at the backend gate: fail fast so the client can retry or submit a job
+        app.logger.warning(f"Rejected generate_tests: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'error': str(e)
+        }), 503, {'Retry-After': str(e.retry_after)}
+        
     except Exception as e:
         app.logger.error(f"Error in generate_tests: {str(e)}", exc_info=True)
         return jsonify({
@@ -60,6 +331,7 @@ def generate_tests():
         }), 500
 
 @app.route('/run_tests', methods=['POST'])
+@profiled
 def run_tests():
     try:
         data = request.get_json()
@@ -68,12 +340,25 @@ def run_tests():
             
         curl_command = data['curl_command']
         app.logger.info(f"Received curl command: {curl_command}")
+        try:
+            page_size = requested_page_size(data)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
-        executor = TestExecutor()
+        executor = TestExecutor(run_store=run_store)
         results = executor.run_all_tests(curl_command)
         
         app.logger.info(f"Generated {len(results)} test results")
         
+        if page_size:
+            results_id = result_pages.put(results)
+            return jsonify({
+                'success': True,
+                'results_id': results_id,
+                'page': result_pages.page(results_id, 0, page_size),
+                'test_count': len(results)
+            })
+        
         return jsonify({
             'success': True,
             'results': results,
@@ -87,6 +372,179 @@ def run_tests():
             'error': str(e)
         }), 500
 
+@app.route('/profiles', methods=['GET'])
+def list_profiles():
+    return jsonify({'status': 'success', 'profiles': profile_store.list()})
+
+@app.route('/profiles/<profile_id>', methods=['GET'])
+def profile_report(profile_id):
+    # ?sort=cumulative|tottime|ncalls|pcalls, ?limit=N rows
+    report = profile_store.report(
+        profile_id,
+        request.args.get('sort', 'cumulative'),
+        request.args.get('limit', 40, type=int)
+    )
+    if report is None:
+        return jsonify({'status': 'error', 'error': 'Unknown or expired profile id'}), 404
+    return Response(report, mimetype='text/plain')
+
+@app.route('/profiles/<profile_id>/download', methods=['GET'])
+def download_profile(profile_id):
+    path = profile_store.file_path(profile_id)
+    if path is None:
+        return jsonify({'status': 'error', 'error': 'Unknown or expired profile id'}), 404
+    return send_file(os.path.abspath(path), mimetype='application/octet-stream',
+                     as_attachment=True, download_name=f"{profile_id}.prof")
+
+@app.route('/debug/transcripts', methods=['GET'])
+def list_transcripts():
+    # Per process: a worker only holds the transcripts of generations it ran
+    return jsonify({'status': 'success', 'transcripts': transcript_store.recent(request.args.get('limit', 50, type=int))})
+
+@app.route('/debug/transcripts/<transcript_id>', methods=['GET'])
+def transcript_detail(transcript_id):
+    transcript = transcript_store.get(transcript_id)
+    if transcript is None:
+        return jsonify({'status': 'error', 'error': 'Unknown or evicted transcript id'}), 404
+    return jsonify({'status': 'success', 'transcript': transcript})
+
+@app.route('/traces', methods=['GET'])
+def list_traces():
+    if tracing.tracer.exporter is None:
+        return jsonify({'status': 'error', 'error': 'Tracing is disabled (TRACE_DIR is not set)'}), 404
+    return jsonify({'status': 'success', 'traces': tracing.tracer.exporter.recent(request.args.get('limit', 50, type=int))})
+
+@app.route('/traces/<trace_id>', methods=['GET'])
+def trace_document(trace_id):
+    # Raw OTLP/JSON, loadable by OpenTelemetry tooling
+    document = tracing.tracer.exporter.load(trace_id) if tracing.tracer.exporter else None
+    if document is None:
+        return jsonify({'status': 'error', 'error': 'Unknown or expired trace id'}), 404
+    return jsonify(document)
+
+@app.route('/traces/<trace_id>/critical-path', methods=['GET'])
+def trace_critical_path(trace_id):
+    document = tracing.tracer.exporter.load(trace_id) if tracing.tracer.exporter else None
+    if document is None:
+        return jsonify({'status': 'error', 'error': 'Unknown or expired trace id'}), 404
+    return jsonify({'status': 'success', 'trace_id': trace_id,
+                    'critical_path': tracing.critical_path(tracing.otlp_spans(document))})
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    # Sums every worker when METRICS_DIR is set; otherwise only the process that answers
+    return Response(metrics.REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/generate-tests/stats', methods=['GET'])
+def generation_stats():
+    # coalesced_waiters counts requests that were answered by another request's generation
+    return jsonify({
+        'status': 'success',
+        'single_flight': generation_flights.stats(),
+        'backend_gate': backend_gate.stats()
+    })
+
+@app.route('/jobs/generate-tests', methods=['POST'])
+def submit_generation_job():
+    data = request.get_json(silent=True) or {}
+    return submit_job('generate', generation_job, data.get('curl_command', ''), data.get('priority', INTERACTIVE))
+
+@app.route('/jobs/run-tests', methods=['POST'])
+def submit_run_job():
+    data = request.get_json(silent=True) or {}
+    return submit_job('run', run_job, data.get('curl_command', ''), data.get('priority', INTERACTIVE))
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    # ?wait=N long-polls until the job finishes, or changes past ?version when given
+    wait = min(request.args.get('wait', 0, type=float), 60)
+    if wait > 0:
+        job = job_queue.wait(job_id, request.args.get('version', type=int), timeout=wait)
+    else:
+        job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'error': 'Unknown or expired job id'}), 404
+    return jsonify({'status': 'success', 'job': job.to_dict()})
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    if job_queue.get(job_id) is None:
+        return jsonify({'status': 'error', 'error': 'Unknown or expired job id'}), 404
+
+    def stream():
+        for event in job_queue.events(job_id):
+            # Comment lines keep proxies from closing an idle stream
+            yield ': heartbeat\n\n' if event is None else f"data: {json.dumps(event)}\n\n"
+
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    if not job_queue.cancel(job_id):
+        return jsonify({'status': 'error', 'error': 'Job not found or already started'}), 409
+    return jsonify({'status': 'success', 'job_id': job_id})
+
+@app.route('/test-cases/<generation_id>', methods=['GET'])
+def test_case_page(generation_id):
+    page = test_case_pages.page(
+        generation_id,
+        request.args.get('offset', 0, type=int),
+        request.args.get('limit', 50, type=int)
+    )
+    if page is None:
+        return jsonify({'status': 'error', 'error': 'Unknown or expired generation id'}), 404
+    return jsonify({'status': 'success', 'page': page})
+
+@app.route('/test-cases/<generation_id>/<int:index>', methods=['GET'])
+def test_case_detail(generation_id, index):
+    test_case = test_case_pages.item(generation_id, index)
+    if test_case is None:
+        return jsonify({'status': 'error', 'error': 'Test case not found'}), 404
+    return jsonify({'status': 'success', 'test_case': test_case})
+
+@app.route('/results/<results_id>', methods=['GET'])
+def result_page(results_id):
+    page = result_pages.page(
+        results_id,
+        request.args.get('offset', 0, type=int),
+        request.args.get('limit', 50, type=int)
+    )
+    if page is None:
+        return jsonify({'success': False, 'error': 'Unknown or expired results id'}), 404
+    return jsonify({'success': True, 'page': page})
+
+@app.route('/results/<results_id>/<int:index>', methods=['GET'])
+def result_detail(results_id, index):
+    result = result_pages.item(results_id, index)
+    if result is None:
+        return jsonify({'success': False, 'error': 'Result not found'}), 404
+    return jsonify({'success': True, 'result': result})
+
+@app.route('/history/pass-rate', methods=['GET'])
+def history_pass_rate():
+    endpoint = request.args.get('endpoint')
+    days = request.args.get('days', 90, type=int)
+    if not endpoint:
+        return jsonify({'status': 'error', 'error': 'No endpoint provided'}), 400
+    
+    return jsonify({
+        'status': 'success',
+        'endpoint': endpoint,
+        'days': days,
+        'pass_rate': run_store.pass_rate(endpoint, days),
+        'trend': run_store.pass_rate_trend(endpoint, days)
+    })
+
+@app.route('/history/flaky', methods=['GET'])
+def history_flaky():
+    days = request.args.get('days', 30, type=int)
+    min_runs = request.args.get('min_runs', 3, type=int)
+    return jsonify({
+        'status': 'success',
+        'flaky_tests': run_store.flaky_tests(days, min_runs)
+    })
+
 @app.route('/check-ai', methods=['GET'])
 def check_ai():
     try:
@@ -94,17 +552,23 @@ def check_ai():
         models = response.json()
         return jsonify({
             'status': 'AI service is running',
-            'available_models': models
+            'available_models': models,
+            'model_warmup': model_warmer.stats(),
+            'backends': provider_pool.stats()
         })
     except requests.exceptions.ConnectionError:
         return jsonify({
             'status': 'AI service is not running',
-            'error': 'Cannot connect to Ollama service'
+            'error': 'Cannot connect to Ollama service',
+            'model_warmup': model_warmer.stats(),
+            'backends': provider_pool.stats()
         })
     except Exception as e:
         return jsonify({
             'status': 'Error checking AI service',
-            'error': str(e)
+            'error': str(e),
+            'model_warmup': model_warmer.stats(),
+            'backends': provider_pool.stats()
         })
 
 @app.route('/execute-curl', methods=['POST'])
@@ -199,4 +663,5 @@ def execute_curl():
 
 if __name__ == '__main__':
     logging.basicConfig(level=logging.INFO)
+    start_model_warmup()
     app.run(debug=True)
\ No newline at end of file
@@ -1,3 +1,4 @@
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -5,6 +6,61 @@ class Settings(BaseSettings):
     BASE_URL: str = "http://127.0.0.1:8000"
     TIMEOUT: int = 30
     MAX_RETRIES: int = 3
+    SUITE_CACHE_DIR: str = ".gentest_cache/suites"
+    SHARD_DB_PATH: str = ".gentest_cache/shards.db"
+    SHARD_SIZE: int = 25
+    RUN_STORE_PATH: str = ".gentest_cache/run_history.db"
+    JOB_WORKERS: int = 2
+    JOB_MAX_PENDING: int = 100
+    JOB_RETENTION_SECONDS: int = 3600
+    # Shared jobs whose worker stops renewing this lease (it died) are marked failed
+    JOB_LEASE_SECONDS: int = 60
+    # Set (gunicorn.conf.py does) to share jobs and result pages between server worker processes
+    STATE_DB_PATH: Optional[str] = None
+    PRELOAD_MODEL: bool = False
+    # Per-process metric snapshots are merged from here so /metrics covers every worker
+    METRICS_DIR: Optional[str] = None
+    # Profile every /generate-tests and /run_tests call (otherwise only those sent with X-Profile: 1)
+    PROFILE_REQUESTS: bool = False
+    PROFILE_DIR: str = ".gentest_cache/profiles"
+    PROFILE_MAX_FILES: int = 50
+    # Set to write finished traces here as OTLP/JSON files; tracing is off by default
+    TRACE_DIR: Optional[str] = None
+    TRACE_MAX_FILES: int = 200
+    # Recent model exchanges kept in memory for /debug/transcripts; set the spill dir to also append them to disk
+    TRANSCRIPT_MAX_ENTRIES: int = 100
+    TRANSCRIPT_SPILL_DIR: Optional[str] = None
+    # Estimated-token budget for generation prompts, and the length beyond which values become placeholders
+    PROMPT_TOKEN_BUDGET: int = 3000
+    PROMPT_MAX_VALUE_CHARS: int = 200
+    # Plans testing more fields than this are generated in chunks of this many fields, in parallel
+    GENERATION_CHUNK_FIELDS: int = 12
+    GENERATION_CHUNK_RETRIES: int = 2
+    GENERATION_CHUNK_TIMEOUT: int = 120
+    # Longest deadline_seconds a /generate-tests caller gets; larger values are clamped to it
+    GENERATION_MAX_DEADLINE_SECONDS: int = 600
+    # Ollama output constraint: 'schema' (JSON schema, Ollama >= 0.5), 'json' (any JSON) or 'none'
+    LLM_OUTPUT_FORMAT: str = "schema"
+    # Ollama keeps the model loaded this long after each call; warm-up loads it at startup and
+    # pings it every KEEP_WARM_INTERVAL seconds (0: never) during KEEP_WARM_HOURS (local, e.g. "8-19"; empty: always)
+    OLLAMA_KEEP_ALIVE: str = "30m"
+    MODEL_WARMUP: bool = True
+    KEEP_WARM_INTERVAL: int = 240
+    KEEP_WARM_HOURS: str = "8-19"
+    # A call whose model load took at least this long counts as a cold start
+    MODEL_COLD_LOAD_MS: float = 500
+    # Model backends: Ollama URLs, or "localai=URL" for a LocalAI server (serving LOCALAI_MODEL).
+    # Set as a JSON list, e.g. LLM_BACKENDS='["http://gpu1:11434", "http://gpu2:11434", "localai=http://localhost:8080"]'
+    LLM_BACKENDS: List[str] = ["http://localhost:11434"]
+    LOCALAI_MODEL: str = "gpt4all-j"
+    # A backend failing this many calls in a row is ejected, then probed again after the reset time
+    LLM_BREAKER_FAILURES: int = 3
+    LLM_BREAKER_RESET_SECONDS: float = 30
+    # Admission control for model calls (per process)
+    LLM_MAX_CONCURRENCY: int = 1
+    LLM_MAX_QUEUE: int = 16
+    LLM_QUEUE_TIMEOUT_INTERACTIVE: float = 30
+    LLM_QUEUE_TIMEOUT_BATCH: float = 600
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,40 @@
+import multiprocessing
+import os
+
+# Jobs and result pages must be visible to every worker process
+os.environ.setdefault('STATE_DB_PATH', '.gentest_cache/state.db')
+# So is /metrics: each worker writes its counters here and a scrape merges them
+os.environ.setdefault('METRICS_DIR', '.gentest_cache/metrics')
+
+bind = os.getenv('GENTEST_BIND', '0.0.0.0:5000')
+
+# Load the app (configs, templates, optional model) once in the master; workers share it copy-on-write
+preload_app = True
+
+# See "Production Deployment" in the README for sizing workers from measured memory
+workers = int(os.getenv('GENTEST_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+worker_class = 'gthread'
+threads = int(os.getenv('GENTEST_THREADS', 4))
+
+# The synchronous /generate-tests can wait on the model for 3 x 180 s plus retries
+timeout = int(os.getenv('GENTEST_TIMEOUT', 600))
+graceful_timeout = 30
+
+# No max_requests: recycling a worker would kill the background jobs running inside it
+
+accesslog = '-'
+
+def on_starting(server):
+    # The master serves no requests; with preload_app it has already started writing a snapshot
+    from src.utils import metrics
+    metrics.REGISTRY.stop_sharing()
+    # Snapshots left by a previous server would be counted again
+    metrics_dir = os.environ['METRICS_DIR']
+    if os.path.isdir(metrics_dir):
+        for name in os.listdir(metrics_dir):
+            os.remove(os.path.join(metrics_dir, name))
+
+def post_fork(server, worker):
+    # Threads don't survive the fork, so each worker warms the model and keeps its own cold/warm figures
+    from app import start_model_warmup
+    start_model_warmup()
@@ -1,4 +1,6 @@
 import yaml
+import json
+import hashlib
 from typing import Dict, Any, List, Optional
 try:
     from pydantic.v1 import BaseModel  # Using v1 for compatibility
@@ -44,4 +46,54 @@ class APIParser:
                     parameters=params or None  # Set None if empty
                 )
         
-        return parsed_specs
\ No newline at end of file
+        return parsed_specs
+
+    @staticmethod
+    def fingerprint_openapi(spec_path: str) -> Dict[str, str]:
+        """Fingerprint every operation so unchanged endpoints can reuse generated suites"""
+        with open(spec_path, 'r') as file:
+            spec = yaml.safe_load(file)
+
+        fingerprints = {}
+        paths = spec.get('paths', {})
+
+        for path, methods in paths.items():
+            # Path-level parameters apply to every operation under the path
+            shared_params = methods.get('parameters', [])
+            for method, details in methods.items():
+                if method == 'parameters' or not isinstance(details, dict):
+                    continue
+                spec_key = f"{method.upper()}_{path}"
+                operation = {
+                    'path': path,
+                    'method': method.upper(),
+                    'parameters': shared_params + details.get('parameters', []),
+                    'requestBody': details.get('requestBody'),
+                    'responses': details.get('responses'),
+                }
+                # Resolve $refs so a change to a shared schema invalidates its users
+                resolved = APIParser._resolve_refs(operation, spec)
+                canonical = json.dumps(resolved, sort_keys=True, separators=(',', ':'), default=str)
+                fingerprints[spec_key] = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+        return fingerprints
+
+    @staticmethod
+    def _resolve_refs(node: Any, root: Dict[str, Any], seen: tuple = ()) -> Any:
+        """Inline local '#/...' references, leaving recursive ones as-is"""
+        if isinstance(node, list):
+            return [APIParser._resolve_refs(item, root, seen) for item in node]
+        if not isinstance(node, dict):
+            return node
+
+        ref = node.get('$ref')
+        if isinstance(ref, str) and ref.startswith('#/'):
+            if ref in seen:
+                return {'$ref': ref}
+            target = root
+            for part in ref[2:].split('/'):
+                part = part.replace('~1', '/').replace('~0', '~')
+                target = target.get(part, {}) if isinstance(target, dict) else {}
+            return APIParser._resolve_refs(target, root, seen + (ref,))
+
+        return {key: APIParser._resolve_refs(value, root, seen) for key, value in node.items()}
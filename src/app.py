@@ -85,7 +85,8 @@ def generate_tests():
             'status': 'success',
             'original_response': original_response,
             'test_cases': test_cases,
-            'raw_ai_response': raw_ai_response
+            'raw_ai_response': raw_ai_response,
+            'dedup_stats': test_generator.last_dedup_stats
         })
         
     except Exception as e:
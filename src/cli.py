@@ -1,6 +1,4 @@
 import click
-from .test_suite import TestSuite
-import json
 
 @click.group()
 def cli():
@@ -10,23 +8,56 @@ def cli():
 @cli.command()
 @click.argument('spec_path', type=click.Path(exists=True))
 @click.option('--env', default='development', help='Environment to run tests against')
-def run(spec_path, env):
+@click.option('--no-cache', is_flag=True, help='Regenerate tests for every operation')
+@click.option('--workers', default=1, help='Number of local worker processes to shard execution across')
+@click.option('--results', 'results_path', default=None, help='Stream results to this JSONL file (.gz to compress)')
+def run(spec_path, env, no_cache, workers, results_path):
     """Run API tests based on OpenAPI specification"""
+    # Imported here so `--help` and other commands don't load the generator stack
+    from .test_suite import TestSuite
     try:
-        suite = TestSuite(name="default")
+        suite = TestSuite(name="default", use_cache=not no_cache, results_path=results_path)
         suite.load_api_spec(spec_path)
-        results = suite.run_tests()
+        results = suite.run_distributed(workers) if workers > 1 else suite.run_tests()
+        
+        # Print which operations needed a fresh generation
+        stats = suite.generation_stats
+        print(f"\nTest Generation: {len(stats['regenerated'])} regenerated, {len(stats['reused'])} reused")
+        for spec_key in stats['regenerated']:
+            print(f"  regenerated: {spec_key}")
+        for spec_key in stats['reused']:
+            print(f"  reused: {spec_key}")
+        for spec_key in stats['skipped']:
+            print(f"  skipped (model backend busy): {spec_key}")
         
         # Print results
         print("\nTest Results:")
         for result in results:
             status = "✅ Passed" if result.get('success') else "❌ Failed"
             test = result['test']
-            print(f"\n{status} - {test['method']} {test['endpoint']}")
+            print(f"\n{status} - {test.get('method', '')} {test.get('endpoint', '')}")
             if not result.get('success'):
                 print(f"Error: {result.get('error', 'Unknown error')}")
+        
+        sink = suite.executor.result_sink
+        if sink:
+            sink.close()
+            summary = sink.summary()
+            print(f"\nResults streamed to {summary['results_file']}: "
+                  f"{summary['passed']} passed, {summary['failed']} failed, {summary['errors']} errors")
     except Exception as e:
         print(f"Error running tests: {str(e)}")
 
+@cli.command()
+@click.argument('run_id')
+@click.option('--db', default=None, help='Path to the shard queue database')
+def worker(run_id, db):
+    """Join a sharded run as an extra worker process"""
+    from config.config import settings
+    from .utils.shard_queue import run_worker
+    run_worker(db or settings.SHARD_DB_PATH, run_id, base_url=settings.BASE_URL,
+               max_attempts=settings.MAX_RETRIES, timeout=settings.TIMEOUT,
+               run_store_path=settings.RUN_STORE_PATH)
+
 if __name__ == '__main__':
     cli()
\ No newline at end of file
@@ -54,6 +54,72 @@ function formatHeaders(headers) {
         .join('\n');
 }
 
+// Number of test cases requested per page; further pages load as the list is scrolled
+const PAGE_SIZE = 50;
+// Pretty-printed responses longer than this are truncated until the user asks for the rest
+const MAX_RESPONSE_CHARS = 20000;
+
+// Paging state for the current generation
+window.generationId = null;
+window.testCaseTotal = 0;
+window.testCaseOffset = 0;
+window.testCases = {};
+window.testCaseDetails = {};
+
+// Function to fetch the full test case (curl command etc.) the first time it is needed
+async function loadTestCaseDetails(index) {
+    if (window.testCaseDetails[index]) {
+        return window.testCaseDetails[index];
+    }
+    // Legacy responses carry the full test cases already
+    if (!window.generationId) {
+        return window.testCases[index];
+    }
+
+    const response = await fetch(`/test-cases/${window.generationId}/${index}`);
+    const data = await response.json();
+    if (data.status !== 'success') {
+        throw new Error(data.error || 'Test case not available');
+    }
+    window.testCaseDetails[index] = data.test_case;
+    return data.test_case;
+}
+
+// Function to fill in the request section of a card once its details are loaded
+async function renderTestCaseDetails(index) {
+    const curlElement = document.getElementById(`curl-${index}`);
+    if (!curlElement || curlElement.dataset.loaded) return;
+
+    curlElement.textContent = 'Loading request...';
+    try {
+        const test = await loadTestCaseDetails(index);
+        curlElement.textContent = (test && test.curl_command) || 'Not available';
+        curlElement.dataset.loaded = 'true';
+    } catch (error) {
+        console.error(`Error loading test case ${index + 1}:`, error);
+        curlElement.textContent = `Error: ${error.message}`;
+    }
+}
+
+// Function to show a response body, truncating very large ones
+function setResponseText(responseElement, text) {
+    if (text.length <= MAX_RESPONSE_CHARS) {
+        responseElement.textContent = text;
+        return;
+    }
+
+    responseElement.textContent = text.slice(0, MAX_RESPONSE_CHARS) +
+        `\n\n... ${text.length - MAX_RESPONSE_CHARS} more characters`;
+    const showFullButton = document.createElement('button');
+    showFullButton.className = 'execute-btn';
+    showFullButton.textContent = 'Show full response';
+    showFullButton.onclick = function () {
+        responseElement.textContent = text;
+        showFullButton.remove();
+    };
+    responseElement.after(showFullButton);
+}
+
 // Function to execute a test case
 async function executeTest(index) {
     console.log(`Executing test case ${index + 1}`);
@@ -61,8 +127,9 @@ async function executeTest(index) {
     responseElement.textContent = 'Executing test...';
 
     try {
-        // Get the curl command from the stored test cases
-        const curlCommand = window.testCases[index].curl_command;
+        // Get the curl command from the (lazily loaded) test case details
+        const test = await loadTestCaseDetails(index);
+        const curlCommand = test && test.curl_command;
         if (!curlCommand || curlCommand === 'Not available') {
             responseElement.textContent = 'Error: No curl command available';
             return;
@@ -98,10 +165,10 @@ async function executeTest(index) {
             formattedResponse += typeof data.response === 'object' ?
                 JSON.stringify(data.response, null, 2) : data.response;
 
-            responseElement.textContent = formattedResponse;
+            setResponseText(responseElement, formattedResponse);
 
             // Highlight if status code matches expected
-            const expectedStatusCode = window.testCases[index].expected_status_code;
+            const expectedStatusCode = test.expected_status_code;
             if (expectedStatusCode && data.status_code) {
                 if (parseInt(expectedStatusCode) === parseInt(data.status_code)) {
                     responseElement.classList.add('status-match');
@@ -120,6 +187,165 @@ async function executeTest(index) {
     }
 }
 
+// Function to build the collapsed card for one test case summary
+function createTestCard(test, index) {
+    // Create a container for this test case
+    const testCaseContainer = document.createElement('div');
+    testCaseContainer.className = 'test-case-container';
+
+    // Create the test card with dropdown functionality
+    const testCard = document.createElement('div');
+    testCard.className = `test-card ${test.test_type || ''}`;
+    testCaseContainer.appendChild(testCard);
+
+    // Create the header (clickable part); textContent keeps LLM output from injecting markup
+    const testHeader = document.createElement('div');
+    testHeader.className = 'test-header';
+    testHeader.onclick = function () {
+        toggleTestDetails(index);
+        renderTestCaseDetails(index);
+    };
+    const title = document.createElement('h3');
+    title.textContent = test.description || 'Test Case ' + (index + 1);
+    const badge = document.createElement('span');
+    badge.className = `test-type-badge ${test.test_type || ''}`;
+    badge.textContent = test.test_type || 'Unknown';
+    testHeader.append(title, badge);
+    testCard.appendChild(testHeader);
+
+    // Create the details section (hidden by default); its content is filled on first open
+    const testDetails = document.createElement('div');
+    testDetails.className = 'test-details';
+    testDetails.id = `test-details-${index}`;
+    testDetails.style.display = 'none';
+    testDetails.innerHTML = `
+        <div class="test-details-content">
+        
+            <div class="test-curl">
+                <h4>Request:</h4>
+                <pre id="curl-${index}" class="curl-command"></pre>
+            </div>
+            
+            <div class="test-execution">
+                <button class="execute-btn" onclick="executeTest(${index})">Run Test</button>
+            </div>
+            
+            <div class="test-response">
+                <h4>Response:</h4>
+                <pre id="response-${index}" class="response-content">Click "Run Test" to execute this test case</pre>
+            </div>
+        </div>
+    `;
+    testCard.appendChild(testDetails);
+
+    return testCaseContainer;
+}
+
+// Function to append one page of test case summaries in a single DOM update
+function appendTestCasePage(items) {
+    const resultsSection = document.getElementById('resultsSection');
+    const sentinel = document.getElementById('testCasesSentinel');
+    const fragment = document.createDocumentFragment();
+
+    items.forEach(test => {
+        window.testCases[test.index] = test;
+        fragment.appendChild(createTestCard(test, test.index));
+    });
+    resultsSection.insertBefore(fragment, sentinel);
+    window.testCaseOffset += items.length;
+
+    if (window.testCaseOffset >= window.testCaseTotal && sentinel) {
+        sentinel.remove();
+    }
+}
+
+// Function to fetch the next page of test case summaries
+async function loadNextTestCasePage() {
+    if (!window.generationId || window.loadingTestCasePage) return;
+    if (window.testCaseOffset >= window.testCaseTotal) return;
+
+    window.loadingTestCasePage = true;
+    try {
+        const response = await fetch(
+            `/test-cases/${window.generationId}?offset=${window.testCaseOffset}&limit=${PAGE_SIZE}`
+        );
+        const data = await response.json();
+        if (data.status === 'success') {
+            appendTestCasePage(data.page.items);
+        } else {
+            console.error("Error loading test cases:", data.error);
+        }
+    } catch (error) {
+        console.error('Error loading test cases:', error);
+    } finally {
+        window.loadingTestCasePage = false;
+    }
+}
+
+// Function to render the first page and load the rest as the sentinel scrolls into view
+function showTestCasePages(generationId, page) {
+    const resultsSection = document.getElementById('resultsSection');
+
+    window.generationId = generationId;
+    window.testCaseTotal = page.total;
+    window.testCaseOffset = 0;
+    window.testCases = {};
+    window.testCaseDetails = {};
+    if (window.testCaseObserver) {
+        window.testCaseObserver.disconnect();
+    }
+
+    // Create a heading for the test cases section
+    const testCasesHeading = document.createElement('h3');
+    testCasesHeading.textContent = `Generated Test Cases (${page.total})`;
+    testCasesHeading.className = 'test-cases-heading';
+    resultsSection.appendChild(testCasesHeading);
+
+    const sentinel = document.createElement('div');
+    sentinel.id = 'testCasesSentinel';
+    resultsSection.appendChild(sentinel);
+
+    appendTestCasePage(page.items);
+
+    if (window.testCaseOffset < window.testCaseTotal) {
+        window.testCaseObserver = new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                loadNextTestCasePage();
+            }
+        }, { rootMargin: '400px' });
+        window.testCaseObserver.observe(sentinel);
+    }
+}
+
+// Function to show an error card without interpreting the message as HTML
+function showErrorCard(title, message) {
+    const resultsSection = document.getElementById('resultsSection');
+    const errorCard = document.createElement('div');
+    errorCard.className = 'error-card';
+    const heading = document.createElement('h3');
+    heading.textContent = title;
+    const text = document.createElement('p');
+    text.textContent = message;
+    errorCard.append(heading, text);
+    resultsSection.appendChild(errorCard);
+}
+
+// Function to long-poll a background job until it finishes
+async function waitForJob(jobId) {
+    while (true) {
+        const response = await fetch(`/jobs/${jobId}?wait=25`);
+        const data = await response.json();
+        if (data.status !== 'success') {
+            throw new Error(data.error || 'Job status unavailable');
+        }
+        const job = data.job;
+        if (job.state === 'succeeded') return job.result;
+        if (job.state === 'failed' || job.state === 'cancelled') {
+            throw new Error(job.error || `Job ${job.state}`);
+        }
+    }
+}
+
 // Function to generate test cases
 async function generateTests() {
     const curlInput = document.getElementById('curlInput');
@@ -135,14 +361,22 @@ async function generateTests() {
         loadingSection.style.display = 'block';
         resultsSection.innerHTML = '';
 
-        console.log("Sending request to generate tests");
-        const response = await fetch('/generate-tests', {
+        // Generation runs as a background job so slow model calls don't hold a server worker
+        console.log("Submitting test generation job");
+        const submitResponse = await fetch('/jobs/generate-tests', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ curl_command: curlInput.value })
         });
+        const submitted = await submitResponse.json();
+        if (submitted.status !== 'accepted') {
+            throw new Error(submitted.error || 'Could not start test generation');
+        }
 
+        const job = await waitForJob(submitted.job_id);
+        const response = await fetch(`/test-cases/${job.generation_id}?offset=0&limit=${PAGE_SIZE}`);
         const data = await response.json();
+        data.generation_id = job.generation_id;
         console.log("Received response:", data);
 
         // Hide loading indicator
@@ -153,74 +387,9 @@ async function generateTests() {
 
         if (data.status === 'success') {
             // Display test cases
-            if (data.test_cases && data.test_cases.length > 0) {
-                console.log(`Displaying ${data.test_cases.length} test cases`);
-
-                // Store test cases globally for access by executeTest
-                window.testCases = data.test_cases;
-
-                // Create a heading for the test cases section
-                const testCasesHeading = document.createElement('h3');
-                testCasesHeading.textContent = 'Generated Test Cases';
-                testCasesHeading.className = 'test-cases-heading';
-                resultsSection.appendChild(testCasesHeading);
-
-                // Create each test case as a separate dropdown
-                data.test_cases.forEach((test, index) => {
-                    console.log(`Processing test case ${index + 1}:`, test);
-
-                    // Create a container for this test case
-                    const testCaseContainer = document.createElement('div');
-                    testCaseContainer.className = 'test-case-container';
-                    resultsSection.appendChild(testCaseContainer);
-
-                    // Create the test card with dropdown functionality
-                    const testCard = document.createElement('div');
-                    testCard.className = `test-card ${test.test_type || ''}`;
-                    testCaseContainer.appendChild(testCard);
-
-                    // Create the header (clickable part)
-                    const testHeader = document.createElement('div');
-                    testHeader.className = 'test-header';
-                    testHeader.onclick = function () { toggleTestDetails(index); };
-                    testHeader.innerHTML = `
-                        <h3>${test.description || 'Test Case ' + (index + 1)}</h3>
-                        <span class="test-type-badge ${test.test_type || ''}">${test.test_type || 'Unknown'}</span>
-                    `;
-                    testCard.appendChild(testHeader);
-
-                    // Create the details section (hidden by default)
-                    const testDetails = document.createElement('div');
-                    testDetails.className = 'test-details';
-                    testDetails.id = `test-details-${index}`;
-                    testDetails.style.display = 'none';
-                    testCard.appendChild(testDetails);
-
-                    // Format the curl command for display
-                    let formattedCurl = test.curl_command || 'Not available';
-                    // Ensure the curl command is properly escaped for HTML display
-                    formattedCurl = formattedCurl.replace(/</g, '&lt;').replace(/>/g, '&gt;');
-
-                    // Add content to the details section
-                    testDetails.innerHTML = `
-                        <div class="test-details-content">
-                        
-                            <div class="test-curl">
-                                <h4>Request:</h4>
-                                <pre class="curl-command">${formattedCurl}</pre>
-                            </div>
-                            
-                            <div class="test-execution">
-                                <button class="execute-btn" onclick="executeTest(${index})">Run Test</button>
-                            </div>
-                            
-                            <div class="test-response">
-                                <h4>Response:</h4>
-                                <pre id="response-${index}" class="response-content">Click "Run Test" to execute this test case</pre>
-                            </div>
-                        </div>
-                    `;
-                });
+            if (data.page && data.page.total > 0) {
+                console.log(`Displaying ${data.page.total} test cases`);
+                showTestCasePages(data.generation_id, data.page);
             } else {
                 console.log("No test cases found");
                 resultsSection.innerHTML = `
@@ -232,12 +401,7 @@ async function generateTests() {
             }
         } else {
             console.error("Error in response:", data.error);
-            resultsSection.innerHTML = `
-                <div class="error-card">
-                    <h3>Error</h3>
-                    <p>${data.error || 'No test results available'}</p>
-                </div>
-            `;
+            showErrorCard('Error', data.error || 'No test results available');
         }
     } catch (error) {
         console.error('Error:', error);
@@ -246,12 +410,7 @@ async function generateTests() {
         // Re-enable the button on error
         analyzeBtn.disabled = false;
 
-        resultsSection.innerHTML = `
-            <div class="error-card">
-                <h3>Error Occurred</h3>
-                <p>${error.message}</p>
-            </div>
-        `;
+        showErrorCard('Error Occurred', error.message);
     }
 }
 
@@ -2,26 +2,116 @@ from typing import List, Dict, Any
 import json
 import os
 from datetime import datetime
-from .test_generator import TestGenerator
-from .test_executor import TestExecutor
+from .utils.test_generator import TestGenerator
+from .utils.test_executor import TestExecutor
 from .api_parser import APIParser
+from .utils.suite_cache import SuiteCache
+from .utils.shard_queue import ShardCoordinator
+from .utils.run_store import RunStore
+from .utils.result_sink import JSONLResultSink
+from .utils.llm_gate import LLMBusyError, BATCH
 from config.config import settings
 
 class TestSuite:
-    def __init__(self, name: str):
+    def __init__(self, name: str, use_cache: bool = True, results_path: str = None):
         self.name = name
-        self.generator = TestGenerator()
-        self.executor = TestExecutor(base_url=settings.BASE_URL)
+        # Suite runs queue behind interactive requests at the model backend
+        self.generator = TestGenerator(priority=BATCH)
+        self.executor = TestExecutor(
+            base_url=settings.BASE_URL,
+            timeout=settings.TIMEOUT,
+            run_store=RunStore(settings.RUN_STORE_PATH),
+            result_sink=JSONLResultSink(results_path) if results_path else None
+        )
         self.api_specs = {}
+        self.fingerprints = {}
+        self.cache = SuiteCache(settings.SUITE_CACHE_DIR) if use_cache else None
+        self.generation_stats = {'regenerated': [], 'reused': [], 'skipped': []}
 
     def load_api_spec(self, spec_path: str):
         parser = APIParser()
         self.api_specs = parser.parse_openapi(spec_path)
+        self.fingerprints = parser.fingerprint_openapi(spec_path)
+
+    def _cached(self, spec_key: str):
+        fingerprint = self.fingerprints.get(spec_key)
+        if self.cache and fingerprint:
+            cached = self.cache.get(fingerprint)
+            if cached is not None:
+                self.generation_stats['reused'].append(spec_key)
+                return cached
+        return None
+
+    def _generated(self, spec_key: str, test_cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        self.generation_stats['regenerated'].append(spec_key)
+        fingerprint = self.fingerprints.get(spec_key)
+        # Empty output means generation failed, so don't pin it in the cache
+        if self.cache and fingerprint and test_cases:
+            self.cache.put(fingerprint, spec_key, test_cases)
+        return test_cases
+
+    def get_test_cases(self, spec_key: str, spec) -> List[Dict[str, Any]]:
+        """Reuse the cached suite for an unchanged operation, otherwise generate it"""
+        cached = self._cached(spec_key)
+        if cached is not None:
+            return cached
+
+        try:
+            test_cases = self.generator.generate_test_cases(spec)
+        except LLMBusyError as e:
+            print(f"Skipping {spec_key}: {str(e)}")
+            self.generation_stats['skipped'].append(spec_key)
+            return []
+        return self._generated(spec_key, test_cases)
+
+    def get_all_test_cases(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Test cases per operation: cached suites where unchanged, the rest generated in one batch"""
+        suites = {}
+        stale = []
+        for spec_key in self.api_specs:
+            cached = self._cached(spec_key)
+            if cached is not None:
+                suites[spec_key] = cached
+            else:
+                stale.append(spec_key)
+
+        if stale:
+            try:
+                generated = self.generator.generate_test_cases_batch([self.api_specs[spec_key] for spec_key in stale])
+            except LLMBusyError as e:
+                print(f"Skipping {len(stale)} operations: {str(e)}")
+                self.generation_stats['skipped'].extend(stale)
+                generated = [[] for _ in stale]
+            else:
+                generated = [self._generated(spec_key, test_cases) for spec_key, test_cases in zip(stale, generated)]
+            suites.update(zip(stale, generated))
+        return {spec_key: suites[spec_key] for spec_key in self.api_specs}
 
     def run_tests(self):
         all_results = []
-        for spec_key, spec in self.api_specs.items():
-            test_cases = self.generator.generate_test_cases(spec)
+        self.generation_stats = {'regenerated': [], 'reused': [], 'skipped': []}
+        for spec_key, test_cases in self.get_all_test_cases().items():
             results = self.executor.execute_parallel(test_cases)
             all_results.extend(results)
-        return all_results
\ No newline at end of file
+        return all_results
+
+
+    def run_distributed(self, workers: int = 4):
+        """Run the suite sharded across local worker processes via the SQLite shard queue"""
+        all_test_cases = []
+        self.generation_stats = {'regenerated': [], 'reused': [], 'skipped': []}
+        for test_cases in self.get_all_test_cases().values():
+            all_test_cases.extend(test_cases)
+
+        coordinator = ShardCoordinator(
+            settings.SHARD_DB_PATH,
+            shard_size=settings.SHARD_SIZE,
+            max_attempts=settings.MAX_RETRIES,
+            timeout=settings.TIMEOUT,
+            run_store_path=settings.RUN_STORE_PATH
+        )
+        results = coordinator.run_local(all_test_cases, workers=workers, base_url=settings.BASE_URL)
+        if self.executor.result_sink:
+            for result in results:
+                self.executor.result_sink.write(result)
+        return results
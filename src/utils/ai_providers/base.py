@@ -1,6 +1,41 @@
+import asyncio
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, Iterator, List, Sequence
 
 class AIProvider(ABC):
+    """A text-generation backend.
+
+    generate_completion is the only method a provider must implement. The
+    async generate and stream and the blocking generate_batch fall back to it:
+    on a worker thread, as a single chunk, and one prompt after another.
+    Providers that can stream or batch natively override iter_completion and
+    generate_batch, and set supports_batching so callers know that sending many
+    prompts in one call is cheaper than sending them one by one. Options
+    (model, temperature, ...) are passed through to backends that take them.
+    """
+    supports_batching = False
+
     @abstractmethod
     def generate_completion(self, prompt: str) -> str:
-        pass
\ No newline at end of file
+        pass
+
+    def iter_completion(self, prompt: str, **options) -> Iterator[str]:
+        """The completion in chunks as the backend produces them"""
+        yield self.generate_completion(prompt)
+
+    def generate_batch(self, prompts: Sequence[str], **options) -> List[str]:
+        """Completions for several prompts, in prompt order"""
+        return [self.generate_completion(prompt) for prompt in prompts]
+
+    async def generate(self, prompt: str, **options) -> str:
+        return ''.join(await asyncio.to_thread(lambda: list(self.iter_completion(prompt, **options))))
+
+    async def stream(self, prompt: str, **options) -> AsyncIterator[str]:
+        chunks = self.iter_completion(prompt, **options)
+        finished = object()
+        while True:
+            # Each chunk is pulled on a worker thread so a blocking backend doesn't stall the event loop
+            chunk = await asyncio.to_thread(next, chunks, finished)
+            if chunk is finished:
+                return
+            yield chunk
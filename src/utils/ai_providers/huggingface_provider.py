@@ -1,13 +1,18 @@
-import requests
 import json
-from transformers import pipeline
 import logging
-from typing import Dict, Any, List
+import threading
+from typing import Dict, Any, Iterator, List, Sequence
+from .base import AIProvider
 
 logger = logging.getLogger(__name__)
 
-class HuggingFaceProvider:
+class HuggingFaceProvider(AIProvider):
+    # A local pipeline pads and runs a list of prompts through the model together
+    supports_batching = True
+
     def __init__(self):
+        # transformers takes seconds to import, so only pay for it when a model is built
+        from transformers import pipeline
         device = -1  # Use CPU
         self.generator = pipeline(
             'text-generation', 
@@ -77,6 +82,32 @@ class HuggingFaceProvider:
             headers_copy[header_name] = new_value
         return headers_copy
 
+    def generate_completion(self, prompt: str) -> str:
+        return self.generator(prompt, max_new_tokens=256, return_full_text=False)[0]['generated_text']
+
+    def iter_completion(self, prompt: str, **options) -> Iterator[str]:
+        from transformers import TextIteratorStreamer
+        streamer = TextIteratorStreamer(self.generator.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        worker = threading.Thread(target=self.generator, args=(prompt,), daemon=True, kwargs={
+            'streamer': streamer, 'max_new_tokens': options.get('max_tokens', 256)
+        })
+        worker.start()
+        for text in streamer:
+            if text:
+                yield text
+        worker.join()
+
+    def generate_batch(self, prompts: Sequence[str], **options) -> List[str]:
+        if not prompts:
+            return []
+        tokenizer = self.generator.tokenizer
+        if tokenizer.pad_token_id is None:
+            # GPT-2 has no pad token; padding with EOS lets prompts of different lengths share a batch
+            tokenizer.pad_token_id = self.generator.model.config.eos_token_id
+        outputs = self.generator(list(prompts), batch_size=options.get('batch_size', 8),
+                                 max_new_tokens=options.get('max_tokens', 256), return_full_text=False)
+        return [output[0]['generated_text'] for output in outputs]
+
     def _call_model(self, prompt: str) -> str:
         # Local model doesn't need API calls
         return self.generate_test_scenarios(prompt)
\ No newline at end of file
@@ -1,3 +1,4 @@
+from typing import Iterator
 from .base import AIProvider
 from openai import OpenAI
 
@@ -6,12 +7,20 @@ class OpenAIProvider(AIProvider):
         self.client = OpenAI(api_key=api_key)
         self.model = model
 
+    def _messages(self, prompt: str):
+        return [
+            {"role": "system", "content": "You are a QA automation expert."},
+            {"role": "user", "content": prompt}
+        ]
+
     def generate_completion(self, prompt: str) -> str:
         response = self.client.chat.completions.create(
             model=self.model,
-            messages=[
-                {"role": "system", "content": "You are a QA automation expert."},
-                {"role": "user", "content": prompt}
-            ]
+            messages=self._messages(prompt)
         )
-        return response.choices[0].message.content
\ No newline at end of file
+        return response.choices[0].message.content
+
+    def iter_completion(self, prompt: str, **options) -> Iterator[str]:
+        for chunk in self.client.chat.completions.create(model=self.model, messages=self._messages(prompt), stream=True):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
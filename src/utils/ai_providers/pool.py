@@ -0,0 +1,345 @@
+import json
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+import requests
+from .base import AIProvider
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+def parse_backend_spec(spec: str) -> Tuple[str, str]:
+    """'http://host:11434' -> ('ollama', url); 'localai=http://host:8080' -> ('localai', url)"""
+    if '=' in spec.split('://', 1)[0]:
+        kind, _, url = spec.partition('=')
+        return kind.strip(), url.strip()
+    return 'ollama', spec.strip()
+
+class BackendUnavailableError(Exception):
+    """Raised when no backend in the pool could answer: all failed or all are ejected"""
+
+class CircuitBreaker:
+    """Ejects a backend after failure_threshold consecutive failures.
+
+    Once reset_seconds have passed, one probe request is let through
+    (half-open): success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_seconds: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = HALF_OPEN
+                return True
+            # Open, or half-open with the probe already out
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state, self.failures, self.opened_at = CLOSED, 0, None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state, self.opened_at = OPEN, time.monotonic()
+
+class OllamaBackend(AIProvider):
+    """One Ollama host; call() returns Ollama's /api/generate JSON.
+
+    Ollama has no multi-prompt endpoint, but it batches requests that arrive
+    together (up to its OLLAMA_NUM_PARALLEL), so generate_batch sends up to
+    `parallel` prompts at once; a `parallel` option lowers that for one batch.
+    """
+    kind = 'ollama'
+    supports_batching = True
+
+    def __init__(self, url: str, parallel: int = 4):
+        self.url = url.rstrip('/')
+        self.parallel = parallel
+
+    def call(self, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        response = requests.post(f"{self.url}/api/generate", json=payload, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def _payload(self, prompt: str, options: Dict[str, Any], stream: bool) -> Dict[str, Any]:
+        payload = {'model': options.get('model') or self.models()[0], **options, 'prompt': prompt, 'stream': stream}
+        payload.pop('timeout', None)
+        return payload
+
+    def generate_completion(self, prompt: str) -> str:
+        return self.call(self._payload(prompt, {}, stream=False), timeout=180)['response']
+
+    def iter_completion(self, prompt: str, **options) -> Iterator[str]:
+        with requests.post(f"{self.url}/api/generate", json=self._payload(prompt, options, stream=True),
+                           timeout=options.get('timeout', 180), stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                part = json.loads(line)
+                if part.get('response'):
+                    yield part['response']
+                if part.get('done'):
+                    return
+
+    def generate_batch(self, prompts: Sequence[str], **options) -> List[str]:
+        if not prompts:
+            return []
+        options = {**options, 'model': options.get('model') or self.models()[0]}
+        timeout = options.get('timeout', 180)
+        parallel = min(options.pop('parallel', self.parallel), self.parallel)
+        with ThreadPoolExecutor(max_workers=max(1, min(len(prompts), parallel))) as pool:
+            answers = pool.map(lambda prompt: self.call(self._payload(prompt, options, stream=False), timeout), prompts)
+            return [answer['response'] for answer in answers]
+
+    def models(self) -> List[str]:
+        response = requests.get(f"{self.url}/api/tags", timeout=10)
+        response.raise_for_status()
+        return [model['name'] for model in response.json().get('models', [])]
+
+class LocalAIBackend(AIProvider):
+    """A LocalAI (OpenAI-compatible) server, e.g. the docker-compose service; answers are reshaped like Ollama's.
+
+    The completions endpoint takes a list of prompts, so generate_batch is a single request.
+    """
+    kind = 'localai'
+    supports_batching = True
+
+    def __init__(self, url: str, model: str = 'gpt4all-j'):
+        self.url = url.rstrip('/')
+        self.model = model
+
+    def _completions(self, prompt: Any, options: Dict[str, Any], stream: bool = False) -> requests.Response:
+        # Ollama-only options (format, keep_alive, the Ollama model name) don't apply here
+        response = requests.post(f"{self.url}/v1/completions", json={
+            'model': self.model,
+            'prompt': prompt,
+            'max_tokens': options.get('max_tokens', 1000),
+            'temperature': options.get('temperature', 0.7),
+            'stream': stream
+        }, timeout=options.get('timeout', 180), stream=stream)
+        response.raise_for_status()
+        return response
+
+    def call(self, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        data = self._completions(payload['prompt'], {**payload, 'timeout': timeout}).json()
+        usage = data.get('usage') or {}
+        return {'model': self.model, 'response': data['choices'][0]['text'], 'done': True,
+                'prompt_eval_count': usage.get('prompt_tokens'), 'eval_count': usage.get('completion_tokens')}
+
+    def generate_completion(self, prompt: str) -> str:
+        return self.call({'prompt': prompt}, timeout=180)['response']
+
+    def iter_completion(self, prompt: str, **options) -> Iterator[str]:
+        with self._completions(prompt, options, stream=True) as response:
+            for line in response.iter_lines():
+                if not line.startswith(b'data:'):
+                    continue
+                data = line[len(b'data:'):].strip()
+                if data == b'[DONE]':
+                    return
+                text = json.loads(data)['choices'][0].get('text')
+                if text:
+                    yield text
+
+    def generate_batch(self, prompts: Sequence[str], **options) -> List[str]:
+        if not prompts:
+            return []
+        choices = self._completions(list(prompts), options).json()['choices']
+        return [choice['text'] for choice in sorted(choices, key=lambda choice: choice.get('index', 0))]
+
+    def models(self) -> List[str]:
+        return [self.model]
+
+class PooledBackend:
+    """A backend with the routing state the pool keeps for it"""
+
+    def __init__(self, provider: AIProvider, breaker: CircuitBreaker):
+        self.provider = provider
+        self.breaker = breaker
+        self.outstanding = 0
+        self.latency_ewma = None  # seconds
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def name(self) -> str:
+        return f"{self.provider.kind}={self.provider.url}"
+
+    def cost(self, default_latency: float) -> float:
+        """Expected wait: requests already outstanding here times how long one takes"""
+        return (self.outstanding + 1) * (self.latency_ewma if self.latency_ewma is not None else default_latency)
+
+class ProviderPool(AIProvider):
+    """Load balances model calls over several backends.
+
+    Each call goes to the healthy backend with the lowest expected wait
+    (outstanding requests x latency EWMA). A connection error, timeout or 5xx
+    counts against that backend's circuit breaker and the call moves on to the
+    next backend, so a host dying mid-request costs one attempt, not the request.
+    """
+
+    def __init__(self, providers: Sequence[AIProvider], failure_threshold: int = 3, reset_seconds: float = 30,
+                 latency_weight: float = 0.3):
+        if not providers:
+            raise ValueError("ProviderPool needs at least one backend")
+        self.backends = [PooledBackend(provider, CircuitBreaker(failure_threshold, reset_seconds)) for provider in providers]
+        self.latency_weight = latency_weight
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_specs(cls, specs: Sequence[str], localai_model: str = 'gpt4all-j', **kwargs) -> 'ProviderPool':
+        """Build from "URL" (Ollama) or "localai=URL" entries"""
+        providers = []
+        for spec in specs:
+            kind, url = parse_backend_spec(spec)
+            if kind == 'ollama':
+                providers.append(OllamaBackend(url))
+            elif kind == 'localai':
+                providers.append(LocalAIBackend(url, localai_model))
+            else:
+                raise ValueError(f"Unknown backend kind {kind!r} in {spec!r}")
+        return cls(providers, **kwargs)
+
+    def _ranked(self) -> List[PooledBackend]:
+        """Backends to try, cheapest first; a breaker only lets its half-open probe through once picked"""
+        with self._lock:
+            known = [backend.latency_ewma for backend in self.backends if backend.latency_ewma is not None]
+            # Unmeasured backends are assumed as fast as the fastest one and win ties, so each gets tried
+            default_latency = min(known) if known else 1.0
+            return sorted(self.backends, key=lambda backend: (backend.cost(default_latency), backend.latency_ewma is not None))
+
+    @property
+    def supports_batching(self) -> bool:
+        return any(backend.provider.supports_batching for backend in self.backends)
+
+    def _attempt(self, backend: PooledBackend, operation: Callable[[AIProvider], Any], measure: bool = True) -> Any:
+        """operation(backend.provider), counted in the backend's outstanding requests and settled on its breaker.
+
+        Every outcome settles the breaker, so a half-open probe is never left outstanding.
+        """
+        with self._lock:
+            backend.outstanding += 1
+            backend.requests += 1
+        started = time.perf_counter()
+        settled = False
+        try:
+            result = operation(backend.provider)
+            backend.breaker.record_success()
+            settled = True
+        except (requests.RequestException, ValueError, KeyError, IndexError) as e:
+            # Any transport failure, including a connection dropped mid-body, or an unparseable answer
+            status = getattr(getattr(e, 'response', None), 'status_code', None)
+            if status is not None and status < 500:
+                # Refused, not broken (e.g. this host lacks the model): no reason to eject it
+                backend.breaker.record_success()
+            else:
+                backend.breaker.record_failure()
+            settled = True
+            with self._lock:
+                backend.failures += 1
+            raise
+        finally:
+            with self._lock:
+                backend.outstanding -= 1
+            if not settled:
+                # An unexpected error on its way out still counts against this backend
+                backend.breaker.record_failure()
+                with self._lock:
+                    backend.failures += 1
+        elapsed = time.perf_counter() - started
+        if measure:
+            with self._lock:
+                backend.latency_ewma = elapsed if backend.latency_ewma is None else (
+                    self.latency_weight * elapsed + (1 - self.latency_weight) * backend.latency_ewma)
+        return result
+
+    def _route(self, operation: Callable[[AIProvider], Any], measure: bool = True) -> Tuple[Any, PooledBackend]:
+        """operation(provider) on the first backend that succeeds, in order of expected wait.
+
+        Raises requests.Timeout when any backend timed out and none answered, BackendUnavailableError otherwise.
+        measure=False keeps calls of unusual size (batches, streams) out of the latency average.
+        """
+        errors = []
+        for backend in self._ranked():
+            if not backend.breaker.allow():
+                continue
+            try:
+                return self._attempt(backend, operation, measure), backend
+            except (requests.RequestException, ValueError, KeyError, IndexError) as e:
+                logger.warning(f"Backend {backend.name} failed ({type(e).__name__}: {e}); trying the next one")
+                errors.append(e)
+        timeouts = [error for error in errors if isinstance(error, requests.Timeout)]
+        if timeouts:
+            raise timeouts[-1]
+        raise BackendUnavailableError(f"No model backend answered ({errors[-1] if errors else 'all circuit breakers open'})")
+
+    def call(self, payload: Dict[str, Any], timeout: float) -> Tuple[Dict[str, Any], PooledBackend]:
+        """One Ollama-style generate call with failover; returns (answer, backend)"""
+        return self._route(lambda provider: provider.call(payload, timeout))
+
+    def call_on(self, backend: PooledBackend, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """One generate call on this backend only (no failover), e.g. to warm it; still subject to its breaker.
+
+        Kept out of the latency average. Raises BackendUnavailableError when the breaker holds the backend out.
+        """
+        if not backend.breaker.allow():
+            raise BackendUnavailableError(f"{backend.name} is ejected")
+        return self._attempt(backend, lambda provider: provider.call(payload, timeout), measure=False)
+
+    def generate_completion(self, prompt: str) -> str:
+        return self.generate_batch([prompt])[0]
+
+    def generate_batch(self, prompts: Sequence[str], **options) -> List[str]:
+        """The whole batch goes to one backend; if it fails, the whole batch moves to the next"""
+        return self._route(lambda provider: provider.generate_batch(prompts, **options), measure=False)[0]
+
+    def iter_completion(self, prompt: str, **options) -> Iterator[str]:
+        """Streams from one backend; failover is only possible until the first chunk has arrived"""
+        def first_chunk(provider: AIProvider) -> Tuple[str, Iterator[str]]:
+            chunks = provider.iter_completion(prompt, **options)
+            return next(chunks, ''), chunks
+
+        (first, rest), _ = self._route(first_chunk, measure=False)
+        if first:
+            yield first
+        yield from rest
+
+    def models(self) -> List[str]:
+        """Models of the first reachable backend whose breaker is closed, Ollama hosts first"""
+        for backend in sorted(self._ranked(), key=lambda backend: backend.provider.kind != 'ollama'):
+            if backend.breaker.state != CLOSED:
+                continue
+            try:
+                models = backend.provider.models()
+            except (requests.RequestException, ValueError) as e:
+                logger.warning(f"Could not list models on {backend.name}: {e}")
+                continue
+            if models:
+                return models
+        return []
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{
+                'backend': backend.name,
+                'state': backend.breaker.state,
+                'outstanding': backend.outstanding,
+                'latency_ewma_s': round(backend.latency_ewma, 3) if backend.latency_ewma is not None else None,
+                'requests': backend.requests,
+                'failures': backend.failures
+            } for backend in self.backends]
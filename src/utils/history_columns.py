@@ -0,0 +1,156 @@
+import os
+import json
+import logging
+from typing import List, Dict, Any, Sequence
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STATUS_CODES = {'PASS': 0, 'FAIL': 1, 'ERROR': 2}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+COLUMNS = ('run', 'ts', 'endpoint', 'status', 'http_status', 'duration_ms')
+
+class RunHistoryColumns:
+    """Run history held as parallel NumPy columns with vectorized rollups.
+
+    Strings (run ids, endpoints) are dictionary-encoded to integer codes, so a
+    million results fit in roughly 20 MB and every rollup is a handful of
+    sort/bincount passes instead of a DataFrame build.
+    """
+
+    def __init__(self, run: np.ndarray, ts: np.ndarray, endpoint: np.ndarray, status: np.ndarray,
+                 http_status: np.ndarray, duration_ms: np.ndarray, run_ids: List[str], endpoints: List[str]):
+        self.run = run                  # int32 code into run_ids
+        self.ts = ts                    # float64 unix seconds
+        self.endpoint = endpoint        # int32 code into endpoints
+        self.status = status            # int8, see STATUS_CODES
+        self.http_status = http_status  # int16, 0 when no response was received
+        self.duration_ms = duration_ms  # float32, NaN when not measured
+        self.run_ids = run_ids
+        self.endpoints = endpoints
+
+    def __len__(self):
+        return len(self.ts)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple]) -> 'RunHistoryColumns':
+        """Build from (run_id, ts, endpoint, status, http_status, duration_ms) tuples"""
+        if not rows:
+            empty = np.empty(0)
+            return cls(empty.astype(np.int32), empty, empty.astype(np.int32), empty.astype(np.int8),
+                       empty.astype(np.int16), empty.astype(np.float32), [], [])
+
+        run_ids, ts, endpoints, statuses, http_status, duration_ms = zip(*rows)
+        run_names, run = np.unique(np.array(run_ids, dtype=str), return_inverse=True)
+        endpoint_names, endpoint = np.unique(np.array([e or '' for e in endpoints], dtype=str), return_inverse=True)
+        status_names, status = np.unique(np.array(statuses, dtype=str), return_inverse=True)
+        status_codes = np.array([STATUS_CODES.get(name, STATUS_CODES['ERROR']) for name in status_names], dtype=np.int8)
+
+        return cls(
+            run=run.astype(np.int32),
+            ts=np.array(ts, dtype=np.float64),
+            endpoint=endpoint.astype(np.int32),
+            status=status_codes[status],
+            # None becomes NaN in a float array; missing HTTP statuses are stored as 0
+            http_status=np.nan_to_num(np.array(http_status, dtype=np.float64), nan=0).astype(np.int16),
+            duration_ms=np.array(duration_ms, dtype=np.float32),
+            run_ids=run_names.tolist(),
+            endpoints=endpoint_names.tolist()
+        )
+
+    @classmethod
+    def from_results(cls, results: List[Dict[str, Any]], run_id: str = 'current') -> 'RunHistoryColumns':
+        """Build from executor result dicts of a single run"""
+        return cls.from_rows([(
+            run_id,
+            result.get('timestamp') or 0.0,
+            result.get('test', {}).get('endpoint') or result.get('endpoint'),
+            result.get('status'),
+            result.get('actual_status_code'),
+            result.get('duration_ms')
+        ) for result in results])
+
+    @classmethod
+    def from_run_store(cls, run_store, days: int = 90) -> 'RunHistoryColumns':
+        """Load the last N days of a RunStore's raw results"""
+        return cls.from_rows(run_store.fetch_results(days))
+
+    def save(self, directory: str):
+        """Write one .npy file per column plus the string dictionaries"""
+        os.makedirs(directory, exist_ok=True)
+        for name in COLUMNS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "dictionaries.json"), 'w') as f:
+            json.dump({'run_ids': self.run_ids, 'endpoints': self.endpoints}, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> 'RunHistoryColumns':
+        """Open saved columns, memory-mapped by default so only touched pages are read"""
+        mode = 'r' if mmap else None
+        columns = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode) for name in COLUMNS}
+        with open(os.path.join(directory, "dictionaries.json"), 'r') as f:
+            dictionaries = json.load(f)
+        return cls(run_ids=dictionaries['run_ids'], endpoints=dictionaries['endpoints'], **columns)
+
+    def pass_rate_per_run(self) -> Dict[str, np.ndarray]:
+        """Pass rate (percent) and start time of every run, ordered by start time"""
+        runs = len(self.run_ids)
+        totals = np.bincount(self.run, minlength=runs)
+        passed = np.bincount(self.run, weights=(self.status == STATUS_CODES['PASS']), minlength=runs)
+        started = np.full(runs, np.inf)
+        np.minimum.at(started, self.run, self.ts)
+
+        present = totals > 0
+        order = np.argsort(started[present], kind='stable')
+        return {
+            'run_id': np.asarray(self.run_ids, dtype=object)[present][order],
+            'timestamp': started[present][order],
+            'pass_rate': (100.0 * passed[present] / totals[present])[order],
+            'total': totals[present][order]
+        }
+
+    def latency_percentiles(self, percentiles: Sequence[float] = (50, 95, 99)) -> Dict[str, Dict[str, float]]:
+        """Per-endpoint latency percentiles (linear interpolation) and max, in milliseconds"""
+        measured = ~np.isnan(self.duration_ms)
+        return grouped_percentiles(self.endpoint[measured], self.duration_ms[measured], self.endpoints, percentiles)
+
+    def failure_counts_by_status(self) -> Dict[str, Dict[int, int]]:
+        """Non-passing results counted by HTTP status, per result status (FAIL/ERROR)"""
+        counts = {}
+        for code in (STATUS_CODES['FAIL'], STATUS_CODES['ERROR']):
+            http = self.http_status[self.status == code].astype(np.int64)
+            if not len(http):
+                continue
+            tally = np.bincount(http)
+            observed = np.nonzero(tally)[0]
+            counts[STATUS_NAMES[code]] = {int(status): int(tally[status]) for status in observed}
+        return counts
+
+
+def grouped_percentiles(codes: np.ndarray, values: np.ndarray, names: Sequence[str],
+                        percentiles: Sequence[float] = (50, 95, 99)) -> Dict[str, Dict[str, float]]:
+    """Percentiles (linear interpolation), max and count of values per group code, keyed by group name"""
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return {}
+
+    # Sort by group then value so each group is one sorted segment
+    order = np.lexsort((values, codes))
+    codes, values = codes[order], values[order]
+    groups, starts, counts = np.unique(codes, return_index=True, return_counts=True)
+
+    quantiles = np.asarray(percentiles, dtype=np.float64)[:, None] / 100.0
+    positions = starts + quantiles * (counts - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.ceil(positions).astype(np.int64)
+    interpolated = values[lower] + (values[upper] - values[lower]) * (positions - lower)
+    maxima = values[starts + counts - 1]
+
+    stats = {}
+    for column, code in enumerate(groups):
+        entry = {f"p{p:g}": round(float(interpolated[row, column]), 2) for row, p in enumerate(percentiles)}
+        entry['max'] = round(float(maxima[column]), 2)
+        entry['count'] = int(counts[column])
+        stats[names[code]] = entry
+    return stats
@@ -1,22 +1,39 @@
 import jinja2
+import functools
 import os
 from datetime import datetime
-import plotly.graph_objects as go
-import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 class HTMLReporter:
-    def __init__(self, output_dir: str = "test_reports"):
-        self.output_dir = f"/Users/girish.shimpi/api_test_gen/{output_dir}"
-        self.template_dir = f"/Users/girish.shimpi/api_test_gen/templates"
+    def __init__(self, output_dir: str = "test_reports", template_dir: str = None,
+                 template_name: str = "report_template.html"):
+        # Relative paths resolve against the project root, not the current directory
+        self.output_dir = os.path.join(PROJECT_ROOT, output_dir)
+        self.template_dir = template_dir or os.path.join(PROJECT_ROOT, "templates")
+        self.template_name = template_name
         os.makedirs(self.output_dir, exist_ok=True)
-        os.makedirs(self.template_dir, exist_ok=True)
 
     def create_trend_chart(self, historical_data):
-        df = pd.DataFrame(historical_data)
+        """Render the pass-rate trend from a list of dicts or RunHistoryColumns"""
+        # plotly is only needed when a chart is actually rendered
+        import plotly.graph_objects as go
+        from .history_columns import RunHistoryColumns
+
+        if isinstance(historical_data, RunHistoryColumns):
+            rollup = historical_data.pass_rate_per_run()
+            timestamps = [datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S') for ts in rollup['timestamp']]
+            pass_rates = rollup['pass_rate'].tolist()
+        else:
+            timestamps = [entry['timestamp'] for entry in historical_data]
+            pass_rates = [entry['pass_rate'] for entry in historical_data]
+
+        # WebGL scatter keeps long histories responsive in the browser
+        trace = go.Scattergl if len(pass_rates) > 1000 else go.Scatter
         fig = go.Figure()
-        fig.add_trace(go.Scatter(x=df['timestamp'], y=df['pass_rate'], name='Pass Rate'))
+        fig.add_trace(trace(x=timestamps, y=pass_rates, name='Pass Rate'))
         fig.update_layout(title='Test Pass Rate Trend')
-        return fig.to_html(full_html=False)
+        return fig.to_html(full_html=False, include_plotlyjs='cdn')
 
     def format_dict(self, d):
         if not d:
@@ -35,81 +52,50 @@ class HTMLReporter:
             )
         return self.format_dict(data)
 
-    def generate_html_report(self, test_results, historical_data=None):
-        style = """
-            body { font-family: Arial; padding: 20px; }
-            .summary { background: #f5f5f5; padding: 20px; margin-bottom: 20px; }
-            .test-case { border: 1px solid #ddd; padding: 15px; margin: 15px 0; }
-            .PASS { border-left: 5px solid #4CAF50; }
-            .FAIL { border-left: 5px solid #f44336; }
-            .request-details, .response-details { 
-                background: #f8f8f8; 
-                padding: 10px; 
-                margin: 10px 0;
-                font-family: monospace;
-            }
-            .error { color: #f44336; }
-        """
-        
-        summary = {
-            'total': len(test_results),
-            'passed': sum(1 for r in test_results if r['status'] == 'PASS'),
-            'failed': sum(1 for r in test_results if r['status'] == 'FAIL'),
-            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
-        
-        html_content = f"""
-        <html>
-            <head>
-                <title>API Test Report</title>
-                <style>{style}</style>
-            </head>
-            <body>
-                <h1>API Test Report</h1>
-                <div class="summary">
-                    <h2>Summary</h2>
-                    <p>Total Tests: {summary['total']}</p>
-                    <p>Passed: {summary['passed']}</p>
-                    <p>Failed: {summary['failed']}</p>
-                    <p>Execution Time: {summary['time']}</p>
-                </div>
-        """
-    
-        for result in test_results:
-            html_content += f"""
-                <div class="test-case {result['status']}">
-                    <h3>{result['test_name']}</h3>
-                    <p><strong>Type:</strong> {result['test_type']}</p>
-                    <p><strong>Status:</strong> {result['status']}</p>
-                    
-                    <div class="request-details">
-                        <h4>Request Details:</h4>
-                        <p><strong>Method:</strong> {result.get('method', 'None')}</p>
-                        <p><strong>Endpoint:</strong> {result.get('endpoint', 'None')}</p>
-                        <p><strong>Headers:</strong><br>{self.format_dict(result.get('headers'))}</p>
-                        <p><strong>Parameters:</strong><br>{self.format_dict(result.get('params'))}</p>
-                    </div>
-                    
-                    <div class="response-details">
-                        <h4>Response Details:</h4>
-                        <p><strong>Status:</strong> {result.get('response_status', 'None')}</p>
-                        <p><strong>Message:</strong> {result.get('response_message', 'None')}</p>
-                        <p><strong>Data:</strong><br>{self.format_response_data(result.get('response_data'))}</p>
-                    </div>
-                    
-                    {f'<p class="error">Error: {result["error_message"]}</p>' if result.get('error_message') else ''}
-                </div>
-            """
-        
-        html_content += """
-            </body>
-        </html>
+    def generate_html_report(self, test_results, historical_data=None, summary=None, latency=None):
+        """Stream the report to disk through the cached Jinja template.
+
+        test_results may be any iterable; pass summary (and latency, e.g. from
+        summarize_latency over the results file) when it is a generator so the
+        results are only walked once while rendering.
         """
-        
+        if summary is None:
+            test_results = list(test_results)
+            summary = {
+                'total': len(test_results),
+                'passed': sum(1 for r in test_results if r['status'] == 'PASS'),
+                'failed': sum(1 for r in test_results if r['status'] == 'FAIL')
+            }
+        # A copy: rendering must not write into the caller's summary
+        summary = {'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), **summary}
+        if latency is None and isinstance(test_results, list):
+            from .latency_stats import summarize_latency
+            latency = summarize_latency(test_results)
+
+        template = _load_template(self.template_dir, self.template_name)
+        stream = template.stream(
+            summary=summary,
+            test_results=test_results,
+            latency=latency if latency and latency.get('timed') else None,
+            trend_chart=self.create_trend_chart(historical_data) if historical_data else None
+        )
+        # Group small chunks into larger writes; memory stays bounded by one result
+        stream.enable_buffering(size=64)
+
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_path = f"{self.output_dir}/test_report_{timestamp}.html"
-        
-        with open(report_path, 'w') as f:
-            f.write(html_content)
+        report_path = os.path.join(self.output_dir, f"test_report_{timestamp}.html")
+        with open(report_path, 'w', encoding='utf-8') as f:
+            stream.dump(f)
         
-        return report_path
\ No newline at end of file
+        return report_path
+
+
+@functools.lru_cache(maxsize=None)
+def _load_template(template_dir: str, template_name: str) -> jinja2.Template:
+    """Compile the report template once per process"""
+    environment = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(template_dir),
+        autoescape=jinja2.select_autoescape(['html']),
+        auto_reload=False
+    )
+    return environment.get_template(template_name)
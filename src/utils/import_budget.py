@@ -0,0 +1,53 @@
+import re
+import subprocess
+import sys
+from typing import List, Dict, Any
+
+# Modules that must never be imported just to start the CLI or the web app
+HEAVY_MODULES = ('transformers', 'torch', 'pandas', 'plotly', 'numpy', 'openai')
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+
+def measure_imports(statement: str, cwd: str = None) -> Dict[str, Any]:
+    """Run a statement in a fresh interpreter under -X importtime and summarize it"""
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=cwd, capture_output=True, text=True
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"Import failed: {process.stderr[-2000:]}")
+
+    modules = []
+    for line in process.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                'module': name,
+                'self_ms': int(self_us) / 1000,
+                'cumulative_ms': int(cumulative_us) / 1000,
+                'depth': (len(indent) - 1) // 2
+            })
+
+    # Top-level entries' cumulative times add up to the whole import cost
+    top_level = [m for m in modules if m['depth'] == 0 and m['module'] not in ('site', 'encodings')]
+    imported = {m['module'].split('.')[0] for m in modules}
+    return {
+        'total_ms': sum(m['cumulative_ms'] for m in top_level),
+        'slowest': sorted(
+            (m for m in modules if m['depth'] <= 1), key=lambda m: m['cumulative_ms'], reverse=True
+        )[:10],
+        'heavy_modules': sorted(imported.intersection(HEAVY_MODULES))
+    }
+
+def format_summary(statement: str, summary: Dict[str, Any]) -> str:
+    lines = [f"{statement}: {summary['total_ms']:.1f} ms"]
+    for module in summary['slowest']:
+        lines.append(f"  {module['cumulative_ms']:8.1f} ms  {module['module']}")
+    if summary['heavy_modules']:
+        lines.append(f"  heavy modules loaded: {', '.join(summary['heavy_modules'])}")
+    return "\n".join(lines)
+
+if __name__ == '__main__':
+    for statement in sys.argv[1:] or ['import src.cli']:
+        print(format_summary(statement, measure_imports(statement)))
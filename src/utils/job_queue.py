@@ -0,0 +1,401 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional, Iterator
+from .processes import pid_alive
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = 'queued', 'running', 'succeeded', 'failed', 'cancelled'
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the pending queue is at capacity"""
+
+class Job:
+    def __init__(self, kind: str, params: Dict[str, Any] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params or {}
+        self.state = QUEUED
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # Bumped on every state change so waiters can tell whether they missed an update
+        self.version = 0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Job':
+        job = cls(data['kind'])
+        job.id = data['job_id']
+        for name in ('state', 'version', 'submitted_at', 'started_at', 'finished_at', 'error'):
+            setattr(job, name, data[name])
+        job.result = data.get('result')
+        return job
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = {
+            'job_id': self.id,
+            'kind': self.kind,
+            'state': self.state,
+            'version': self.version,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error
+        }
+        if include_result and self.state == SUCCEEDED:
+            data['result'] = self.result
+        return data
+
+class JobQueue:
+    """Runs long generation/execution jobs on a bounded thread pool.
+
+    Submitting returns immediately with a Job; clients poll get()/wait() or
+    iterate events() for state changes. Finished jobs are kept for
+    retention_seconds (and at most max_finished of them) before being pruned.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 100,
+                 retention_seconds: float = 3600, max_finished: int = 200):
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='gentest-job')
+        self._jobs = OrderedDict()
+        self._futures = {}
+        self._condition = threading.Condition()
+        self.poll_interval = 0.25
+
+    def submit(self, kind: str, func: Callable[..., Any], **params) -> Job:
+        """Queue func(**params); raises QueueFullError when too many jobs are waiting"""
+        job = Job(kind, params)
+        with self._condition:
+            self._prune()
+            pending = self._pending_count()
+            if pending >= self.max_pending:
+                raise QueueFullError(f"{pending} jobs already queued")
+            self._jobs[job.id] = job
+            self._save(job)
+            self._futures[job.id] = self._executor.submit(self._run, job, func)
+        logger.info(f"Queued {kind} job {job.id}")
+        return job
+
+    def _run(self, job: Job, func: Callable[..., Any]):
+        with self._condition:
+            if job.state == CANCELLED or not self._claim(job):
+                return
+            self._update(job, RUNNING, started_at=time.time())
+        try:
+            result = func(**job.params)
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.kind}) failed: {str(e)}", exc_info=True)
+            with self._condition:
+                self._update(job, FAILED, error=str(e), finished_at=time.time())
+            return
+        with self._condition:
+            self._update(job, SUCCEEDED, result=result, finished_at=time.time())
+        logger.info(f"Job {job.id} ({job.kind}) finished in {job.finished_at - job.started_at:.1f}s")
+
+    def _update(self, job: Job, state: str, **fields):
+        # Caller holds self._condition
+        job.state = state
+        for name, value in fields.items():
+            setattr(job, name, value)
+        job.version += 1
+        self._save(job)
+        self._condition.notify_all()
+
+    # Persistence hooks; the in-memory queue only knows the jobs submitted to it
+    def _save(self, job: Job):
+        pass
+
+    def _load(self, job_id: str) -> Optional[Job]:
+        return None
+
+    def _claim(self, job: Job) -> bool:
+        return True
+
+    def _pending_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.state == QUEUED)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._condition:
+            self._prune()
+            job = self._jobs.get(job_id)
+        return job if job is not None else self._load(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that has not started yet"""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return self._cancel_elsewhere(job_id)
+            if job.state != QUEUED:
+                return False
+            self._update(job, CANCELLED, finished_at=time.time())
+        future = self._futures.pop(job_id, None)
+        if future is not None:
+            future.cancel()
+        return True
+
+    def wait(self, job_id: str, since_version: int = None, timeout: float = 30) -> Optional[Job]:
+        """Long-poll: block until the job changes past since_version (or finishes, without one) or timeout expires"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                while not self._changed(job, since_version):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                return job
+
+        # Submitted to another process: no condition to wait on, so poll its stored state
+        job = self._load(job_id)
+        while job is not None and not self._changed(job, since_version) and time.monotonic() < deadline:
+            time.sleep(min(self.poll_interval, max(deadline - time.monotonic(), 0)))
+            job = self._load(job_id)
+        return job
+
+    @staticmethod
+    def _changed(job: Job, since_version: Optional[int]) -> bool:
+        return job.state in FINISHED_STATES or (since_version is not None and job.version > since_version)
+
+    def _cancel_elsewhere(self, job_id: str) -> bool:
+        return False
+
+    def events(self, job_id: str, heartbeat: float = 15) -> Iterator[Optional[Dict[str, Any]]]:
+        """Yield the job's state on every change until it finishes; None is yielded as a heartbeat"""
+        version = -1
+        while True:
+            job = self.wait(job_id, version, timeout=heartbeat)
+            if job is None:
+                return
+            if job.version == version:
+                yield None
+                continue
+            version = job.version
+            yield job.to_dict()
+            if job.state in FINISHED_STATES:
+                return
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            counts = {state: 0 for state in (QUEUED, RUNNING) + FINISHED_STATES}
+            for job in self._jobs.values():
+                counts[job.state] += 1
+            return counts
+
+    def _prune(self):
+        # Caller holds self._condition; drops expired jobs, then the oldest beyond max_finished
+        cutoff = time.time() - self.retention_seconds
+        finished = [job for job in self._jobs.values() if job.state in FINISHED_STATES]
+        expired = [job for job in finished if job.finished_at < cutoff]
+        excess = len(finished) - len(expired) - self.max_finished
+        if excess > 0:
+            expired += sorted((job for job in finished if job.finished_at >= cutoff),
+                              key=lambda job: job.finished_at)[:excess]
+        for job in expired:
+            del self._jobs[job.id]
+            self._futures.pop(job.id, None)
+        self._prune_saved(cutoff)
+
+    def _prune_saved(self, cutoff: float):
+        pass
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    finished_at REAL,
+    data TEXT NOT NULL,
+    owner_pid INTEGER,
+    lease_expires REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs (state);
+CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_at);
+"""
+
+class SQLiteJobQueue(JobQueue):
+    """JobQueue whose job states live in SQLite, so any server worker can answer for any job.
+
+    A job still runs in the process it was submitted to; other processes read
+    its state from the database and poll it when asked to wait. The owning
+    process renews a lease on its unfinished jobs every lease_seconds / 3.
+    Jobs whose owner has died (pid gone) or stopped renewing (lease expired)
+    are failed by the next prune in any process, so they neither count
+    against max_pending nor show as running forever.
+    """
+
+    def __init__(self, db_path: str, lease_seconds: float = 60, **kwargs):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self._heartbeat_pid = None
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+            # Databases created before leases existed lack the owner columns
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (('owner_pid', 'INTEGER'), ('lease_expires', 'REAL')):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+            conn.commit()
+        finally:
+            conn.close()
+        super().__init__(**kwargs)
+
+    def submit(self, kind: str, func: Callable[..., Any], **params) -> Job:
+        self._start_heartbeat()
+        return super().submit(kind, func, **params)
+
+    def _start_heartbeat(self):
+        # One renewal thread per process; a forked server worker starts its own
+        with self._condition:
+            if self._heartbeat_pid == os.getpid():
+                return
+            self._heartbeat_pid = os.getpid()
+        threading.Thread(target=self._heartbeat, name='gentest-job-lease', daemon=True).start()
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(self.lease_seconds / 3)
+            with self._condition:
+                job_ids = [job.id for job in self._jobs.values() if job.state in (QUEUED, RUNNING)]
+            if not job_ids:
+                continue
+            try:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.execute(
+                            f"UPDATE jobs SET lease_expires = ? WHERE job_id IN ({','.join('?' * len(job_ids))}) "
+                            "AND state IN (?, ?)",
+                            (time.time() + self.lease_seconds, *job_ids, QUEUED, RUNNING)
+                        )
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not renew job leases: {e}")
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection per call keeps the queue safe to use after the server forks
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _save(self, job: Job):
+        lease_expires = None if job.state in FINISHED_STATES else time.time() + self.lease_seconds
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO jobs (job_id, state, finished_at, data, owner_pid, lease_expires) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (job.id, job.state, job.finished_at, json.dumps(job.to_dict(), default=str),
+                     os.getpid(), lease_expires)
+                )
+        finally:
+            conn.close()
+
+    def _load(self, job_id: str) -> Optional[Job]:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return Job.from_dict(json.loads(row[0])) if row else None
+
+    def _claim(self, job: Job) -> bool:
+        # Another process may have cancelled the job while it was queued here
+        stored = self._load(job.id)
+        if stored is not None and stored.state == CANCELLED:
+            job.state, job.finished_at, job.version = CANCELLED, stored.finished_at, stored.version
+            self._condition.notify_all()
+            return False
+        return True
+
+    def _cancel_elsewhere(self, job_id: str) -> bool:
+        job = self._load(job_id)
+        if job is None or job.state != QUEUED:
+            return False
+        job.state, job.finished_at = CANCELLED, time.time()
+        job.version += 1
+        conn = self._connect()
+        try:
+            with conn:
+                updated = conn.execute(
+                    "UPDATE jobs SET state = ?, finished_at = ?, data = ? WHERE job_id = ? AND state = ?",
+                    (CANCELLED, job.finished_at, json.dumps(job.to_dict()), job_id, QUEUED)
+                ).rowcount
+        finally:
+            conn.close()
+        return updated == 1
+
+    def _pending_count(self) -> int:
+        # Only jobs whose owner still holds the lease; orphans are failed by _fail_orphans
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM jobs WHERE state = ? AND lease_expires >= ?",
+                                (QUEUED, time.time())).fetchone()[0]
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Job counts across every process sharing the database"""
+        counts = {state: 0 for state in (QUEUED, RUNNING) + FINISHED_STATES}
+        conn = self._connect()
+        try:
+            counts.update(conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+        finally:
+            conn.close()
+        return counts
+
+    def _fail_orphans(self, conn: sqlite3.Connection):
+        """Fail unfinished jobs of other processes that died or stopped renewing their lease"""
+        now = time.time()
+        rows = conn.execute("SELECT job_id, owner_pid, lease_expires, data FROM jobs WHERE state IN (?, ?)",
+                            (QUEUED, RUNNING)).fetchall()
+        for job_id, owner_pid, lease_expires, data in rows:
+            if job_id in self._jobs or ((lease_expires or 0) >= now and pid_alive(owner_pid)):
+                continue
+            job = Job.from_dict(json.loads(data))
+            job.state, job.finished_at = FAILED, now
+            job.error = f"Worker process {owner_pid} stopped before the job finished"
+            job.version += 1
+            orphaned = conn.execute(
+                "UPDATE jobs SET state = ?, finished_at = ?, data = ?, lease_expires = NULL "
+                "WHERE job_id = ? AND state IN (?, ?) AND COALESCE(lease_expires, 0) = COALESCE(?, 0)",
+                (FAILED, now, json.dumps(job.to_dict(), default=str), job_id, QUEUED, RUNNING, lease_expires)
+            ).rowcount
+            if orphaned:
+                logger.warning(f"Job {job_id} ({job.kind}) was orphaned by worker process {owner_pid}; marked failed")
+
+    def _prune_saved(self, cutoff: float):
+        conn = self._connect()
+        try:
+            with conn:
+                self._fail_orphans(conn)
+                conn.execute("DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (cutoff,))
+                conn.execute(
+                    "DELETE FROM jobs WHERE job_id IN (SELECT job_id FROM jobs WHERE finished_at IS NOT NULL "
+                    "ORDER BY finished_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_finished,)
+                )
+        finally:
+            conn.close()
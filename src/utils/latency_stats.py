@@ -0,0 +1,86 @@
+import logging
+from typing import Iterable, Dict, Any, Sequence
+import numpy as np
+from .history_columns import grouped_percentiles
+
+logger = logging.getLogger(__name__)
+
+def _field(result: Dict[str, Any], name: str, fallback: str = None):
+    """Read a field from a reporter result or from the nested test of an executor result"""
+    value = result.get(name)
+    if value is None:
+        value = (result.get('test') or {}).get(fallback or name)
+    return value
+
+def summarize_latency(results: Iterable[Dict[str, Any]], percentiles: Sequence[float] = (50, 95, 99),
+                      slowest: int = 10, buckets: int = 60) -> Dict[str, Any]:
+    """Latency distribution, throughput and slowest requests of one run.
+
+    results is walked once to fill flat arrays; every aggregation after that is
+    vectorized. Results without a duration_ms are counted but not timed.
+    """
+    durations, starts, endpoints, test_types, names = [], [], [], [], []
+    total = 0
+    for result in results:
+        total += 1
+        duration = result.get('duration_ms')
+        if duration is None:
+            continue
+        durations.append(duration)
+        starts.append(result.get('timestamp') or np.nan)
+        endpoints.append(_field(result, 'endpoint') or '')
+        test_types.append(_field(result, 'test_type') or 'Unknown')
+        names.append(_field(result, 'test_name', 'description') or '')
+
+    summary = {'total': total, 'timed': len(durations)}
+    if not durations:
+        return summary
+
+    duration = np.asarray(durations, dtype=np.float64)
+    endpoint_names, endpoint_codes = np.unique(np.asarray(endpoints, dtype=str), return_inverse=True)
+    type_names, type_codes = np.unique(np.asarray(test_types, dtype=str), return_inverse=True)
+    summary['overall'] = grouped_percentiles(np.zeros(len(duration), dtype=np.int64), duration, ['all'], percentiles)['all']
+    summary['by_endpoint'] = grouped_percentiles(endpoint_codes, duration, endpoint_names.tolist(), percentiles)
+    summary['by_test_type'] = grouped_percentiles(type_codes, duration, type_names.tolist(), percentiles)
+
+    # Slowest requests: partial selection, then sort only the selected few
+    count = min(slowest, len(duration))
+    top = np.argpartition(-duration, count - 1)[:count]
+    top = top[np.argsort(-duration[top], kind='stable')]
+    summary['slowest'] = [{
+        'test_name': names[i],
+        'endpoint': endpoints[i],
+        'test_type': test_types[i],
+        'duration_ms': round(float(duration[i]), 2)
+    } for i in top.tolist()]
+
+    summary['throughput'] = _throughput(np.asarray(starts, dtype=np.float64), duration, buckets)
+    return summary
+
+def _throughput(starts: np.ndarray, duration: np.ndarray, buckets: int) -> Dict[str, Any]:
+    """Completed requests per second over the run, overall and as a coarse timeline"""
+    stamped = ~np.isnan(starts)
+    if not stamped.any():
+        # No timestamps: only the summed request time is known (serial upper bound)
+        elapsed = duration.sum() / 1000.0
+        return {'elapsed_s': round(float(elapsed), 3),
+                'requests_per_second': round(len(duration) / elapsed, 2) if elapsed else None,
+                'timeline': []}
+
+    # Executor timestamps are taken when a request finishes
+    finished = starts[stamped]
+    began = finished - duration[stamped] / 1000.0
+    run_start, run_end = began.min(), finished.max()
+    elapsed = max(run_end - run_start, 1e-3)
+
+    bucket_count = max(1, min(buckets, int(np.ceil(elapsed))))
+    width = elapsed / bucket_count
+    bucket = np.minimum(((finished - run_start) / width).astype(np.int64), bucket_count - 1)
+    completed = np.bincount(bucket, minlength=bucket_count)
+    return {
+        'elapsed_s': round(float(elapsed), 3),
+        'requests_per_second': round(float(len(finished) / elapsed), 2),
+        'peak_requests_per_second': round(float(completed.max() / width), 2),
+        'bucket_seconds': round(float(width), 3),
+        'timeline': completed.tolist()
+    }
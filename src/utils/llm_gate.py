@@ -0,0 +1,140 @@
+import heapq
+import itertools
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+from config.config import settings
+from . import metrics, tracing
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE, BATCH = 'interactive', 'batch'
+PRIORITIES = {INTERACTIVE: 0, BATCH: 1}
+
+WAIT_SECONDS = metrics.histogram('gentest_llm_gate_wait_seconds', 'Time spent queued for a model slot', ('priority',),
+                                 buckets=(0.01, 0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600))
+
+class LLMBusyError(Exception):
+    """Raised when a model call is not admitted: the wait queue is full or the queue deadline passed"""
+
+    def __init__(self, reason: str, retry_after: int = 30):
+        super().__init__(f"LLM backend busy ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+class LLMGate:
+    """Admission control in front of the model backend.
+
+    At most max_concurrent calls run at once; up to max_queue more wait,
+    interactive callers ahead of batch ones (FIFO within a priority). A caller
+    still waiting when its queue timeout expires is turned away with
+    LLMBusyError so it can answer 503 or fall back instead of timing out later.
+    """
+
+    def __init__(self, max_concurrent: int = 1, max_queue: int = 16, queue_timeouts: Dict[str, float] = None):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeouts = queue_timeouts or {INTERACTIVE: 30, BATCH: 600}
+        self._condition = threading.Condition()
+        self._waiting = []  # heap of (priority rank, arrival sequence)
+        self._sequence = itertools.count()
+        self._active = 0
+        self.counters = {
+            'admitted': 0,
+            'rejected_queue_full': 0,
+            'rejected_deadline': 0,
+            'wait_seconds_sum': 0.0,
+            'wait_seconds_max': 0.0
+        }
+
+    @contextmanager
+    def slot(self, priority: str = INTERACTIVE, queue_timeout: Optional[float] = None, count: int = 1):
+        """Hold count backend slots (one per request the caller has in flight) for the duration of the with-block.
+
+        The slots are taken all at once, never some while waiting for the rest; count is capped at max_concurrent.
+        """
+        count = max(1, min(count, self.max_concurrent))
+        self._acquire(priority, queue_timeout, count)
+        try:
+            yield
+        finally:
+            self._release(count)
+
+    @contextmanager
+    def slot_if_free(self, priority: str = BATCH):
+        """Like slot(), but never queues: yields False (holding nothing) when no slot is free right now"""
+        with self._condition:
+            admitted = self._active < self.max_concurrent and not self._waiting
+            if admitted:
+                self._admit(0.0, priority)
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                self._release()
+
+    def _release(self, count: int = 1):
+        with self._condition:
+            self._active -= count
+            self._condition.notify_all()
+
+    @tracing.traced('llm.gate_wait')
+    def _acquire(self, priority: str, queue_timeout: Optional[float], count: int = 1):
+        if queue_timeout is None:
+            queue_timeout = self.queue_timeouts.get(priority, 30)
+        started = time.monotonic()
+        deadline = started + queue_timeout
+
+        with self._condition:
+            # Fast path only when nobody is queued ahead of us
+            if self._active + count <= self.max_concurrent and not self._waiting:
+                self._admit(0.0, priority, count)
+                return
+            if len(self._waiting) >= self.max_queue:
+                self.counters['rejected_queue_full'] += 1
+                raise LLMBusyError('queue full')
+
+            ticket = (PRIORITIES.get(priority, PRIORITIES[BATCH]), next(self._sequence))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while not (self._active + count <= self.max_concurrent and self._waiting[0] == ticket):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.counters['rejected_deadline'] += 1
+                        logger.warning(f"Gave up waiting for an LLM slot after {queue_timeout}s ({priority})")
+                        raise LLMBusyError('queue deadline exceeded')
+                    self._condition.wait(remaining)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                # The head may have changed; let the next waiter re-check
+                self._condition.notify_all()
+            self._admit(time.monotonic() - started, priority, count)
+
+    def _admit(self, waited: float, priority: str, count: int = 1):
+        # Caller holds self._condition
+        self._active += count
+        self.counters['admitted'] += 1
+        self.counters['wait_seconds_sum'] += waited
+        self.counters['wait_seconds_max'] = max(self.counters['wait_seconds_max'], waited)
+        WAIT_SECONDS.observe(waited, priority=priority)
+        tracing.annotate(priority=priority, wait_seconds=round(waited, 4))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                **self.counters,
+                'active': self._active,
+                'queue_depth': len(self._waiting),
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue
+            }
+
+# One gate per process, shared by every generator and executor in it
+backend_gate = LLMGate(
+    max_concurrent=settings.LLM_MAX_CONCURRENCY,
+    max_queue=settings.LLM_MAX_QUEUE,
+    queue_timeouts={INTERACTIVE: settings.LLM_QUEUE_TIMEOUT_INTERACTIVE, BATCH: settings.LLM_QUEUE_TIMEOUT_BATCH}
+)
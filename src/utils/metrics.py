@@ -0,0 +1,354 @@
+import bisect
+import copy
+import fcntl
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import ContextDecorator
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+from .processes import pid_alive
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers a fast curl parse up to a slow multi-minute generation
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 180, 300)
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def family(self) -> Dict[str, Any]:
+        """Point-in-time copy of this metric, in the form the registry renders and merges"""
+        with self._lock:
+            samples = [[list(key), copy.deepcopy(value)] for key, value in self._values.items()]
+        return {'kind': self.kind, 'help': self.documentation, 'labelnames': list(self.labelnames),
+                'buckets': list(getattr(self, 'buckets', ())), 'samples': samples}
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+class _Timer(ContextDecorator):
+    def __init__(self, histogram: 'Histogram', labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (last slot is +Inf), then sum and count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels) -> _Timer:
+        """Observe elapsed seconds; works as a context manager or a decorator"""
+        return _Timer(self, labels)
+
+# A collector returns (name, kind, help, [(labels, value), ...]) tuples read at scrape time
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]
+
+def _merge_value(kind: str, current, value):
+    if current is None:
+        return copy.deepcopy(value)
+    if kind == 'histogram':
+        counts = [a + b for a, b in zip(current[0], value[0])]
+        return [counts, current[1] + value[1], current[2] + value[2]]
+    return current + value
+
+def _merge_snapshots(snapshots, per_process_gauges: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Merge snapshots ((pid, families) pairs, or bare families) into families keyed by sample label tuples"""
+    families = {}
+    for entry in snapshots:
+        pid, snapshot = entry if isinstance(entry, tuple) else (None, entry)
+        for name, family in snapshot.items():
+            per_process = per_process_gauges and family['kind'] == 'gauge'
+            merged = families.setdefault(name, {
+                **family, 'samples': {},
+                'labelnames': family['labelnames'] + ['pid'] if per_process else family['labelnames']
+            })
+            samples = family['samples'].items() if isinstance(family['samples'], dict) else family['samples']
+            for key, value in samples:
+                key = tuple(key) + (pid,) if per_process else tuple(key)
+                merged['samples'][key] = _merge_value(family['kind'], merged['samples'].get(key), value)
+    return families
+
+def _listed(families: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Families with their samples back in the [[labels], value] list form snapshots use"""
+    return {name: {**family, 'samples': [[list(key), value] for key, value in family['samples'].items()]}
+            for name, family in families.items()}
+
+def _render_family(name: str, family: Dict[str, Any]) -> List[str]:
+    lines = [f"# HELP {name} {family['help']}", f"# TYPE {name} {family['kind']}"]
+    labelnames = family['labelnames']
+    for key, value in sorted(family['samples'], key=lambda sample: sample[0]):
+        if family['kind'] != 'histogram':
+            lines.append(f"{name}{_format_labels(labelnames, key)} {_format_value(value)}")
+            continue
+        counts, total, count = value
+        cumulative = 0
+        for bound, bucket_count in zip(list(family['buckets']) + [math.inf], counts):
+            cumulative += bucket_count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{name}_bucket{_format_labels(labelnames, key, le)} {cumulative}")
+        labels = _format_labels(labelnames, key)
+        lines.append(f"{name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{name}_count{labels} {count}")
+    return lines
+
+class Registry:
+    """Process-wide set of metrics rendered in the Prometheus text exposition format.
+
+    With share(directory), every process periodically writes its values to
+    <directory>/<pid>.json and render() merges the files, so a scrape answered
+    by any one server worker reports the whole server. Counters and histograms
+    are summed. Gauges describe one process's current state, so they are not
+    summed: each process's value is reported under its own pid label. Gauges
+    from a shared collector describe state all processes see (a shared
+    database) and come from the answering process alone. When a process has
+    exited, its counters and histograms are folded into <directory>/
+    aggregate.json, so totals never go down, and its gauges are dropped.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._shared_collectors = []
+        self._lock = threading.Lock()
+        self._shared_dir = None
+        self._flush_interval = 5.0
+        self._writes_snapshot = True
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Collector, shared: bool = False):
+        """shared=True for collectors reading state common to every process, reported once rather than per pid"""
+        with self._lock:
+            (self._shared_collectors if shared else self._collectors).append(collector)
+
+    def families(self, shared: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Current values of this process's metrics and collectors (shared=True: of the shared collectors only)"""
+        with self._lock:
+            metrics = [] if shared else list(self._metrics)
+            collectors = list(self._shared_collectors if shared else self._collectors)
+        families = {metric.name: metric.family() for metric in metrics}
+        for collector in collectors:
+            for name, kind, documentation, samples in collector():
+                labelnames = list(samples[0][0]) if samples else []
+                families[name] = {'kind': kind, 'help': documentation, 'labelnames': labelnames, 'buckets': [],
+                                  'samples': [[[str(labels[label]) for label in labelnames], value]
+                                              for labels, value in samples]}
+        return families
+
+    def share(self, directory: str, interval: float = 5.0):
+        """Aggregate across processes through per-process snapshot files in directory"""
+        os.makedirs(directory, exist_ok=True)
+        self._shared_dir = directory
+        self._flush_interval = interval
+        self._start_flusher()
+        # Forked workers start from zero (the parent's counts stay in its own file) and need their own flusher
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def stop_sharing(self):
+        """Stop writing this process's snapshot (the gunicorn master, which serves no requests); forks write again"""
+        self._writes_snapshot = False
+        if self._shared_dir:
+            try:
+                os.remove(os.path.join(self._shared_dir, f"{os.getpid()}.json"))
+            except OSError:
+                pass
+
+    def _after_fork(self):
+        self._writes_snapshot = True
+        self._lock = threading.Lock()
+        for metric in self._metrics:
+            metric._lock = threading.Lock()
+            metric.reset()
+        self._start_flusher()
+
+    def _start_flusher(self):
+        def flush_forever():
+            while True:
+                time.sleep(self._flush_interval)
+                self.flush()
+        threading.Thread(target=flush_forever, name='metrics-flush', daemon=True).start()
+
+    def flush(self):
+        """Write this process's snapshot file (atomically, so readers never see half a file)"""
+        if not self._shared_dir or not self._writes_snapshot:
+            return
+        path = os.path.join(self._shared_dir, f"{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.families(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics snapshot {path}: {e}")
+
+    def _fold_exited(self, path: str):
+        """Add an exited process's counters and histograms to aggregate.json, then delete its snapshot"""
+        with open(os.path.join(self._shared_dir, 'aggregate.lock'), 'w') as lock:
+            # Every worker may render at once; only one may fold a given snapshot
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except FileNotFoundError:
+                return
+            except ValueError:
+                snapshot = {}
+            aggregate_path = os.path.join(self._shared_dir, 'aggregate.json')
+            aggregate = _merge_snapshots([self._read_snapshot(aggregate_path) or {},
+                                          {name: family for name, family in snapshot.items() if family['kind'] != 'gauge'}])
+            tmp_path = f"{aggregate_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(_listed(aggregate), f)
+            os.replace(tmp_path, aggregate_path)
+            os.remove(path)
+
+    @staticmethod
+    def _read_snapshot(path: str):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def render(self) -> str:
+        if not self._shared_dir:
+            families = self.families()
+            families.update(self.families(shared=True))
+        else:
+            self.flush()
+            snapshots = []
+            for file_name in sorted(os.listdir(self._shared_dir)):
+                pid = file_name[:-len('.json')]
+                if not file_name.endswith('.json') or not pid.isdigit():
+                    continue
+                path = os.path.join(self._shared_dir, file_name)
+                if not pid_alive(int(pid)):
+                    # Left by a worker that exited (recycled or crashed)
+                    try:
+                        self._fold_exited(path)
+                    except OSError as e:
+                        logger.warning(f"Could not fold metrics snapshot {path}: {e}")
+                    continue
+                snapshot = self._read_snapshot(path)
+                if snapshot is not None:
+                    snapshots.append((pid, snapshot))
+            aggregate = self._read_snapshot(os.path.join(self._shared_dir, 'aggregate.json'))
+            if aggregate:
+                snapshots.append((None, aggregate))
+            families = _listed(_merge_snapshots(snapshots, per_process_gauges=True))
+            # Shared state is the same from every process: report this one's reading once
+            families.update(self.families(shared=True))
+
+        lines = []
+        for name, family in families.items():
+            lines.extend(_render_family(name, family))
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+# Pipeline metrics, shared by the generator, executor and caches
+CURL_PARSE_SECONDS = histogram('gentest_curl_parse_seconds', 'Time to parse a curl command')
+PROMPT_CHARS = histogram('gentest_prompt_chars', 'Size of prompts sent to the model, in characters',
+                         buckets=(500, 1000, 2000, 4000, 8000, 16000, 32000, 64000))
+PROMPT_TOKENS = histogram('gentest_prompt_tokens', 'Prompt size sent to the model, in estimated tokens',
+                          buckets=(128, 256, 512, 1024, 2048, 4096, 8192, 16384))
+LLM_REQUEST_SECONDS = histogram('gentest_llm_request_seconds', 'Latency of one model call', ('outcome',))
+LLM_TOKENS_PER_SECOND = histogram('gentest_llm_tokens_per_second', 'Model generation speed reported by Ollama',
+                                  buckets=(1, 2, 5, 10, 20, 40, 80, 160))
+LLM_BATCH_PROMPTS = histogram('gentest_llm_batch_prompts', 'Prompts sent to the model in one batched call',
+                              buckets=(2, 4, 8, 16, 32, 64, 128))
+LLM_RETRIES = counter('gentest_llm_retries_total', 'Model calls retried after a failed attempt')
+LLM_TIMEOUTS = counter('gentest_llm_timeouts_total', 'Model calls that hit the request timeout')
+AI_PARSE_SECONDS = histogram('gentest_ai_response_parse_seconds', 'Time to turn a model response into test cases')
+AI_PARSE_FALLBACK_SECONDS = histogram('gentest_ai_response_fallback_parse_seconds',
+                                      'Time spent in the heuristic parser when output was not schema-conformant')
+AI_PARSE_PATH = counter('gentest_ai_response_parse_path_total', 'Which parser produced the test cases', ('path',))
+GENERATION_FALLBACKS = counter('gentest_generation_fallback_total',
+                               'Generations answered with a default test case instead of model output', ('reason',))
+GENERATION_CHUNKS = counter('gentest_generation_chunks_total', 'Chunks of a large test plan, by outcome', ('outcome',))
+GENERATION_ENRICHMENTS = counter('gentest_generation_enrichments_total',
+                                 'Background model generations behind a deadline-bounded request, by outcome', ('outcome',))
+HTTP_TEST_SECONDS = histogram('gentest_http_test_seconds', 'Latency of one executed test request', ('status',))
+SUITE_CACHE_LOOKUPS = counter('gentest_suite_cache_lookups_total', 'Suite cache lookups', ('result',))
@@ -0,0 +1,182 @@
+import os
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import requests
+from config.config import settings
+from . import metrics
+from .llm_gate import backend_gate, BATCH
+from .ai_providers.pool import BackendUnavailableError, PooledBackend, ProviderPool
+
+logger = logging.getLogger(__name__)
+
+FIRST_TOKEN_SECONDS = metrics.histogram('gentest_llm_first_token_seconds',
+                                        'Time to the first generated token, split by whether Ollama had to load the model',
+                                        ('start',), buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80, 160))
+
+def parse_hours(hours: str) -> Optional[Tuple[int, int]]:
+    """'8-19' -> (8, 19), local hours [start, end); empty means around the clock"""
+    if not hours:
+        return None
+    start, end = (int(part) for part in hours.split('-', 1))
+    return start, end
+
+def first_token_ms(stats: Dict[str, Any]) -> Optional[float]:
+    """Load + prompt evaluation + one token's generation, from the durations (ns) Ollama reports"""
+    if not stats.get('total_duration'):
+        return None
+    per_token = stats['eval_duration'] / stats['eval_count'] if stats.get('eval_count') and stats.get('eval_duration') else 0
+    return (stats.get('load_duration', 0) + stats.get('prompt_eval_duration', 0) + per_token) / 1e6
+
+class ModelWarmer:
+    """Keeps the generation model loaded on every Ollama backend and reports cold vs warm first-token latency.
+
+    start() sends a one-token generation to each Ollama backend of the pool
+    right away, so the model load lands there instead of inside the first
+    request's timeout. During working hours a background thread repeats those
+    pings every ping_interval seconds unless a real call already kept the
+    model loaded. Pings go through the pool, so they count in each backend's
+    outstanding requests and circuit breaker. Each takes a backend_gate slot
+    like any model call, and is skipped when none is free (a running call
+    keeps the model loaded anyway). Every model response passed to
+    observe() counts as cold when Ollama spent at least cold_load_ms loading.
+    """
+
+    def __init__(self, pool: Optional[ProviderPool] = None, keep_alive: str = '30m',
+                 ping_interval: float = 240, working_hours: str = '', cold_load_ms: float = 500):
+        self.pool = pool
+        self.keep_alive = keep_alive
+        self.ping_interval = ping_interval
+        self.working_hours = parse_hours(working_hours)
+        self.cold_load_ms = cold_load_ms
+        self.model = None
+        self.warmup = None
+        self.last_call_at = None
+        self.pings = 0
+        self.pings_skipped = 0
+        self._latency = {'cold': [0, 0.0, 0.0, None], 'warm': [0, 0.0, 0.0, None]}  # count, sum, max, last (ms)
+        self._lock = threading.Lock()
+        self._thread_pid = None
+
+    def observe(self, stats: Dict[str, Any]):
+        """Record first-token latency from one Ollama /api/generate response"""
+        latency = first_token_ms(stats)
+        if latency is None:
+            return
+        start = 'cold' if stats.get('load_duration', 0) / 1e6 >= self.cold_load_ms else 'warm'
+        FIRST_TOKEN_SECONDS.observe(latency / 1000, start=start)
+        with self._lock:
+            entry = self._latency[start]
+            entry[0] += 1
+            entry[1] += latency
+            entry[2] = max(entry[2], latency)
+            entry[3] = round(latency, 1)
+            self.last_call_at = time.time()
+
+    def ping(self, timeout: float = 300) -> List[Dict[str, Any]]:
+        """Ping each Ollama backend of the pool (LocalAI keeps its models loaded); one result per backend"""
+        backends = [backend for backend in self.pool.backends if backend.provider.kind == 'ollama'] if self.pool else []
+        return [self._ping(backend, timeout) for backend in backends]
+
+    def _ping(self, backend: PooledBackend, timeout: float) -> Dict[str, Any]:
+        """One-token generation that loads the model (if needed) and refreshes its keep_alive"""
+        with backend_gate.slot_if_free(BATCH) as admitted:
+            if not admitted:
+                return {'backend': backend.name, 'model': self.model, 'skipped': 'model calls already running'}
+            started = time.time()
+            try:
+                stats = self.pool.call_on(backend, {
+                    'model': self.model,
+                    'prompt': 'ok',
+                    'stream': False,
+                    'keep_alive': self.keep_alive,
+                    'options': {'num_predict': 1}
+                }, timeout)
+            except (requests.RequestException, ValueError, BackendUnavailableError) as e:
+                logger.warning(f"Warm-up ping to {backend.name} failed: {e}")
+                return {'backend': backend.name, 'model': self.model, 'at': started, 'error': str(e)}
+        self.observe(stats)
+        return {
+            'backend': backend.name,
+            'model': self.model,
+            'at': started,
+            'elapsed_ms': round((time.time() - started) * 1000, 1),
+            'load_ms': round(stats.get('load_duration', 0) / 1e6, 1),
+            'first_token_ms': round(first_token_ms(stats) or 0, 1)
+        }
+
+    def start(self, select_model: Callable[[], str], pool: Optional[ProviderPool] = None):
+        """Warm the model and keep it warm from a background thread (one per process)"""
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            if pool is not None:
+                self.pool = pool
+        threading.Thread(target=self._run, args=(select_model,), name='model-warmup', daemon=True).start()
+
+    def _in_working_hours(self) -> bool:
+        if self.working_hours is None:
+            return True
+        start, end = self.working_hours
+        return start <= time.localtime().tm_hour < end
+
+    def _run(self, select_model: Callable[[], str]):
+        try:
+            self.model = select_model()
+            self.warmup = self.ping()
+            for result in self.warmup:
+                if 'first_token_ms' in result:
+                    logger.info(f"Warmed up {self.model} on {result['backend']}: first token after "
+                                f"{result['first_token_ms']} ms ({result['load_ms']} ms loading)")
+        except Exception as e:
+            self.warmup = [{'model': self.model, 'at': time.time(), 'error': str(e)}]
+            logger.warning(f"Model warm-up failed: {e}")
+        if self.ping_interval <= 0:
+            return
+        while True:
+            time.sleep(self.ping_interval)
+            recently_used = self.last_call_at is not None and time.time() - self.last_call_at < self.ping_interval
+            if recently_used or not self._in_working_hours():
+                self.pings_skipped += 1
+                continue
+            try:
+                for result in self.ping():
+                    if 'skipped' in result:
+                        self.pings_skipped += 1
+                    elif 'error' not in result:
+                        self.pings += 1
+            except Exception as e:
+                logger.warning(f"Keep-warm ping failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latency = {start: {
+                'count': count,
+                'mean_ms': round(total / count, 1) if count else None,
+                'max_ms': round(peak, 1) if count else None,
+                'last_ms': last
+            } for start, (count, total, peak, last) in self._latency.items()}
+        return {
+            'model': self.model,
+            'keep_alive': self.keep_alive,
+            'warmup': self.warmup,
+            'last_call_at': self.last_call_at,
+            'keep_warm': {
+                'interval_seconds': self.ping_interval,
+                'working_hours': '-'.join(map(str, self.working_hours)) if self.working_hours else 'always',
+                'pings': self.pings,
+                'skipped': self.pings_skipped
+            },
+            'first_token_latency': latency
+        }
+
+# One per process; under gunicorn each worker warms and reports on its own (post_fork in gunicorn.conf.py).
+# The pool to warm is given to start(), as it is built by test_generator, which imports this module.
+model_warmer = ModelWarmer(
+    keep_alive=settings.OLLAMA_KEEP_ALIVE,
+    ping_interval=settings.KEEP_WARM_INTERVAL,
+    working_hours=settings.KEEP_WARM_HOURS,
+    cold_load_ms=settings.MODEL_COLD_LOAD_MS
+)
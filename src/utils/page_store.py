@@ -0,0 +1,162 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Sequence
+
+class PageStore:
+    """Bounded LRU of generated suites or run results, served to the UI page by page.
+
+    Pages only carry the summary fields a collapsed card needs; the full item
+    (curl command, response body) is fetched separately when a card is opened.
+    """
+
+    def __init__(self, summary_fields: Sequence[str], max_entries: int = 50):
+        self.summary_fields = tuple(summary_fields)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, items: List[Dict[str, Any]]) -> str:
+        key = uuid.uuid4().hex
+        with self._lock:
+            self._entries[key] = items
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return key
+
+    def _get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            items = self._entries.get(key)
+            if items is not None:
+                self._entries.move_to_end(key)
+            return items
+
+    def _summary(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        return {field: item.get(field) for field in self.summary_fields}
+
+    def page(self, key: str, offset: int = 0, limit: int = 50) -> Optional[Dict[str, Any]]:
+        items = self._get(key)
+        if items is None:
+            return None
+        offset = max(offset, 0)
+        limit = max(min(limit, 500), 1)
+        return {
+            'total': len(items),
+            'offset': offset,
+            'items': [
+                {'index': index, **self._summary(item)}
+                for index, item in enumerate(items[offset:offset + limit], start=offset)
+            ]
+        }
+
+    def item(self, key: str, index: int) -> Optional[Dict[str, Any]]:
+        items = self._get(key)
+        if items is None or not 0 <= index < len(items):
+            return None
+        return items[index]
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS page_sets (
+    store TEXT NOT NULL,
+    key TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (store, key)
+);
+CREATE TABLE IF NOT EXISTS page_items (
+    key TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    summary TEXT NOT NULL,
+    item TEXT NOT NULL,
+    PRIMARY KEY (key, idx)
+) WITHOUT ROWID;
+"""
+
+class SQLitePageStore(PageStore):
+    """PageStore kept in a SQLite file so every server worker process sees the same entries.
+
+    Summaries are stored next to the full items, so a page read never decodes
+    the (possibly large) curl commands and responses.
+    """
+
+    def __init__(self, db_path: str, store: str, summary_fields: Sequence[str], max_entries: int = 50):
+        super().__init__(summary_fields, max_entries)
+        self.db_path = db_path
+        self.store = store
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection per call keeps the store safe to use after the server forks
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def put(self, items: List[Dict[str, Any]]) -> str:
+        key = uuid.uuid4().hex
+        rows = [(key, index, json.dumps(self._summary(item), default=str), json.dumps(item, default=str))
+                for index, item in enumerate(items)]
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("INSERT INTO page_sets (store, key, total, last_used) VALUES (?, ?, ?, ?)",
+                             (self.store, key, len(items), time.time()))
+                conn.executemany("INSERT INTO page_items (key, idx, summary, item) VALUES (?, ?, ?, ?)", rows)
+                evicted = conn.execute(
+                    "SELECT key FROM page_sets WHERE store = ? ORDER BY last_used DESC LIMIT -1 OFFSET ?",
+                    (self.store, self.max_entries)
+                ).fetchall()
+                conn.executemany("DELETE FROM page_items WHERE key = ?", evicted)
+                conn.executemany("DELETE FROM page_sets WHERE key = ?", evicted)
+        finally:
+            conn.close()
+        return key
+
+    def _touch(self, conn: sqlite3.Connection, key: str) -> Optional[int]:
+        row = conn.execute("SELECT total FROM page_sets WHERE store = ? AND key = ?", (self.store, key)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE page_sets SET last_used = ? WHERE store = ? AND key = ?", (time.time(), self.store, key))
+        return row[0]
+
+    def page(self, key: str, offset: int = 0, limit: int = 50) -> Optional[Dict[str, Any]]:
+        offset = max(offset, 0)
+        limit = max(min(limit, 500), 1)
+        conn = self._connect()
+        try:
+            with conn:
+                total = self._touch(conn, key)
+                if total is None:
+                    return None
+                rows = conn.execute(
+                    "SELECT idx, summary FROM page_items WHERE key = ? AND idx >= ? ORDER BY idx LIMIT ?",
+                    (key, offset, limit)
+                ).fetchall()
+        finally:
+            conn.close()
+        return {
+            'total': total,
+            'offset': offset,
+            'items': [{'index': index, **json.loads(summary)} for index, summary in rows]
+        }
+
+    def item(self, key: str, index: int) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            with conn:
+                if self._touch(conn, key) is None:
+                    return None
+                row = conn.execute("SELECT item FROM page_items WHERE key = ? AND idx = ?", (key, index)).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
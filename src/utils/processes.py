@@ -0,0 +1,14 @@
+import os
+
+def pid_alive(pid) -> bool:
+    """Whether a process with this pid is running on this host"""
+    if not pid or pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, but belongs to another user
+        return True
+    return True
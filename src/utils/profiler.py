@@ -0,0 +1,114 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SORT_KEYS = ('cumulative', 'tottime', 'ncalls', 'pcalls')
+_PROFILE_ID = re.compile(r'^[0-9a-f]{32}$')
+
+class ProfileStore:
+    """Runs calls under cProfile and keeps the newest max_profiles captures on disk.
+
+    Each capture is <id>.prof (pstats format, for snakeviz or pstats) plus
+    <id>.json metadata. cProfile only sees the calling thread, so work fanned
+    out to a thread pool shows up as time spent waiting on its futures. One
+    capture runs at a time per process; overlapping requests run unprofiled.
+    """
+
+    def __init__(self, directory: str, max_profiles: int = 50):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex
+
+    def run(self, label: str, func: Callable[..., Any], *args, profile_id: str = None,
+            **kwargs) -> Tuple[Any, Optional[str]]:
+        """Call func under the profiler; returns (result, profile_id), with None when the capture was skipped"""
+        if not self._lock.acquire(blocking=False):
+            logger.warning(f"Profiler busy, running {label} unprofiled")
+            return func(*args, **kwargs), None
+
+        profile_id = profile_id or self.new_id()
+        profiler = cProfile.Profile()
+        started = time.time()
+        try:
+            return profiler.runcall(func, *args, **kwargs), profile_id
+        finally:
+            self._lock.release()
+            # Saved even when func raised: a failing slow request is worth a profile too
+            self._save(profile_id, label, profiler, started)
+
+    def _path(self, profile_id: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.{extension}")
+
+    def _save(self, profile_id: str, label: str, profiler: cProfile.Profile, started: float):
+        meta = {
+            'profile_id': profile_id,
+            'label': label,
+            'started_at': started,
+            'elapsed_s': round(time.time() - started, 3),
+            'pid': os.getpid()
+        }
+        try:
+            profiler.dump_stats(self._path(profile_id, 'prof'))
+            with open(self._path(profile_id, 'json'), 'w') as f:
+                json.dump(meta, f)
+        except OSError as e:
+            logger.warning(f"Could not save profile {profile_id}: {e}")
+            return
+        logger.info(f"Saved profile {profile_id} for {label} ({meta['elapsed_s']}s)")
+        self._prune()
+
+    def _prune(self):
+        for meta in self.list()[self.max_profiles:]:
+            for extension in ('prof', 'json'):
+                try:
+                    os.remove(self._path(meta['profile_id'], extension))
+                except OSError:
+                    pass
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Metadata of stored profiles, newest first"""
+        profiles = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                # Pruned or still being written by another worker
+                continue
+        return sorted(profiles, key=lambda meta: meta['started_at'], reverse=True)
+
+    def file_path(self, profile_id: str) -> Optional[str]:
+        """Path of the .prof file, or None for an unknown (or malformed) id"""
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        path = self._path(profile_id, 'prof')
+        return path if os.path.exists(path) else None
+
+    def report(self, profile_id: str, sort: str = 'cumulative', limit: int = 40) -> Optional[str]:
+        """Plain-text table of the top functions, pstats style"""
+        path = self.file_path(profile_id)
+        if path is None:
+            return None
+        if sort not in SORT_KEYS:
+            sort = 'cumulative'
+        stream = io.StringIO()
+        stats = pstats.Stats(path, stream=stream)
+        stats.strip_dirs().sort_stats(sort).print_stats(max(1, min(limit, 500)))
+        return stream.getvalue()
@@ -0,0 +1,123 @@
+import json
+import re
+import logging
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rough average for English text and JSON with BPE tokenizers; no tokenizer is loaded just to count
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def compact_json(value: Any) -> str:
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+class Placeholders:
+    """Stands in short tokens for long values in a prompt, and puts the values back into the model's output.
+
+    Strings longer than max_value_chars become <<VALUE_n>>. Lists whose JSON
+    is longer than 4 * max_value_chars become "<<ITEMS_n>>" (quotes included,
+    so the compacted body is still valid JSON) and are restored as JSON.
+    """
+
+    def __init__(self, max_value_chars: int = 200):
+        self.max_value_chars = max_value_chars
+        self.values = {}
+        self._tokens = {}
+
+    def __bool__(self):
+        return bool(self.values)
+
+    def _token(self, kind: str, original: str, quoted: bool = False) -> str:
+        token = self._tokens.get((kind, original))
+        if token is None:
+            token = self._tokens[(kind, original)] = f"<<{kind}_{len(self._tokens) + 1}>>"
+            self.values[f'"{token}"' if quoted else token] = original
+        return token
+
+    def elide(self, value: str) -> str:
+        return self._token('VALUE', value) if len(value) > self.max_value_chars else value
+
+    def elide_json(self, value: Any) -> Any:
+        """Copy of a JSON value with long strings and long lists replaced by tokens"""
+        if isinstance(value, str):
+            return self.elide(value)
+        if isinstance(value, dict):
+            return {key: self.elide_json(item) for key, item in value.items()}
+        if isinstance(value, list):
+            encoded = compact_json(value)
+            if len(encoded) > 4 * self.max_value_chars:
+                return self._token('ITEMS', encoded, quoted=True)
+            return [self.elide_json(item) for item in value]
+        return value
+
+    def restore(self, value: Any) -> Any:
+        """Copy of a parsed model response with every token replaced by its original value"""
+        if isinstance(value, str):
+            if '<<' not in value:
+                return value
+            for token, original in self.values.items():
+                value = value.replace(token, original)
+                # Models sometimes drop the quotes around an ITEMS token
+                if token.startswith('"'):
+                    value = value.replace(token[1:-1], original)
+            return value
+        if isinstance(value, dict):
+            return {key: self.restore(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.restore(item) for item in value]
+        return value
+
+_HEADER = re.compile(r"""((?:-H|--header)\s+(['"])[^:'"]+:\s*)(.*?)(\2)""")
+_DATA = re.compile(r"""((?:--data-raw|--data-binary|--data|-d)\s+(['"]))(.*?)((?<!\\)\2)""", re.DOTALL)
+
+def compact_curl(curl_command: str, placeholders: Placeholders) -> str:
+    """The curl command with long header values and long parts of a JSON body replaced by placeholders"""
+    def header(match):
+        return match.group(1) + placeholders.elide(match.group(3)) + match.group(4)
+
+    def data(match):
+        quote, text = match.group(2), match.group(3)
+        try:
+            body = compact_json(placeholders.elide_json(json.loads(text)))
+        except ValueError:
+            body = placeholders.elide(text)
+        if quote in body:
+            # Re-quoting for the shell is not worth the risk; leave this body as it was
+            return match.group(0)
+        return match.group(1) + body + match.group(4)
+
+    return _DATA.sub(data, _HEADER.sub(header, curl_command))
+
+def group_plan(groups: List[Tuple[str, List[str]]], include_baseline: bool = True) -> str:
+    """Test plan with the repeated missing/invalid pair listed once per kind of field"""
+    lines = []
+    if include_baseline:
+        lines.append('1. "Baseline positive test with all valid parameters" (positive, 200): the original curl command')
+    for number, (kind, names) in enumerate(((kind, names) for kind, names in groups if names), start=len(lines) + 1):
+        lines.append(
+            f"{number}. For each {kind} in {compact_json(names)}, two negative tests expecting 400: "
+            f'"Missing required {kind}: <name>" (remove it) and "Invalid value for {kind}: <name>" (set an invalid value)'
+        )
+    return '\n        '.join(lines)
+
+class BudgetedPrompt:
+    """A prompt fitted to a token budget, with what was done to fit it"""
+
+    def __init__(self, text: str, budget: int, steps: List[str], placeholders: Placeholders):
+        self.text = text
+        self.tokens = estimate_tokens(text)
+        self.budget = budget
+        self.steps = steps
+        self.placeholders = placeholders
+        if self.tokens > budget:
+            logger.warning(f"Prompt is {self.tokens} tokens after {steps}, over the {budget} token budget")
+
+    def restore(self, test_cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return self.placeholders.restore(test_cases) if self.placeholders else test_cases
+
+    def stats(self) -> Dict[str, Any]:
+        return {'prompt_tokens': self.tokens, 'budget': self.budget, 'steps': self.steps,
+                'placeholders': len(self.placeholders.values)}
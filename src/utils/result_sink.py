@@ -0,0 +1,134 @@
+import gzip
+import json
+import os
+import threading
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+def _open_text(path: str, mode: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+def _status_of(result: Dict[str, Any]) -> str:
+    status = result.get('status')
+    if status is None:
+        status = 'PASS' if result.get('success') else 'FAIL'
+    return str(status).upper()
+
+class JSONLResultSink:
+    """Appends one compact JSON line per result as it completes.
+
+    Each line is flushed immediately, so a crash loses at most the result being
+    written. Paths ending in .gz are gzip-compressed; every flush ends a deflate
+    block, so the file stays readable up to the last complete line.
+    """
+
+    def __init__(self, path: str, compress: bool = False):
+        if compress and not path.endswith('.gz'):
+            path += '.gz'
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = _open_text(path, 'a')
+        self._lock = threading.Lock()
+        self.counters = {'total': 0, 'passed': 0, 'failed': 0, 'errors': 0}
+        self.started_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def write(self, result: Dict[str, Any]):
+        line = json.dumps(result, separators=(',', ':'), default=str)
+        status = _status_of(result)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            self.counters['total'] += 1
+            if status == 'PASS':
+                self.counters['passed'] += 1
+            elif status == 'FAIL':
+                self.counters['failed'] += 1
+            else:
+                self.counters['errors'] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counters, 'started_at': self.started_at, 'results_file': self.path}
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def iter_results(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream results from a JSONL file, skipping a truncated final line"""
+    try:
+        with _open_text(path, 'r') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    # Partially written line from a crashed run
+                    break
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning(f"Skipping unreadable result line in {path}")
+    except EOFError:
+        # gzip stream cut off mid-block; everything before it was yielded
+        logger.warning(f"Results file {path} ends in an incomplete gzip block")
+
+def aggregate(path: str) -> Dict[str, Any]:
+    """Summary counters for a results file in one streaming pass"""
+    counters = {'total': 0, 'passed': 0, 'failed': 0, 'errors': 0, 'by_test_type': {}}
+    for result in iter_results(path):
+        status = _status_of(result)
+        counters['total'] += 1
+        if status == 'PASS':
+            counters['passed'] += 1
+        elif status == 'FAIL':
+            counters['failed'] += 1
+        else:
+            counters['errors'] += 1
+        test_type = result.get('test_type') or result.get('test', {}).get('test_type') or 'Unknown'
+        by_type = counters['by_test_type'].setdefault(test_type, {'total': 0, 'passed': 0})
+        by_type['total'] += 1
+        by_type['passed'] += status == 'PASS'
+    return counters
+
+def tail(path: str, count: int = 20, block_size: int = 65536) -> List[Dict[str, Any]]:
+    """Last N results; plain files are read backwards from the end, gzip files streamed"""
+    if path.endswith('.gz'):
+        return list(deque(iter_results(path), maxlen=count))
+
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b''
+        # Read whole blocks from the end until we hold enough complete lines
+        while position > 0 and data.count(b'\n') <= count:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            data = f.read(read_size) + data
+
+    lines = data.split(b'\n')
+    if not data.endswith(b'\n'):
+        lines = lines[:-1]  # Drop a partially written final line
+    if position > 0:
+        lines = lines[1:]   # First line may start mid-record
+    results = []
+    for line in lines:
+        if line.strip():
+            try:
+                results.append(json.loads(line))
+            except ValueError:
+                continue
+    return results[-count:]
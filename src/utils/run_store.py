@@ -0,0 +1,202 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import logging
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Raw results are append-only; the daily rollups are maintained in the same
+# transaction so trend queries read a few rows per day instead of every result.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    source TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    endpoint TEXT,
+    method TEXT,
+    signature TEXT NOT NULL,
+    test_name TEXT,
+    test_type TEXT,
+    status TEXT NOT NULL,
+    expected_status INTEGER,
+    actual_status INTEGER,
+    duration_ms REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_endpoint_ts ON results (endpoint, ts);
+CREATE INDEX IF NOT EXISTS idx_results_signature_ts ON results (signature, ts);
+CREATE INDEX IF NOT EXISTS idx_results_status_ts ON results (status, ts);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results (run_id);
+CREATE TABLE IF NOT EXISTS daily_endpoint_stats (
+    endpoint TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    PRIMARY KEY (endpoint, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily_signature_stats (
+    signature TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    endpoint TEXT,
+    test_name TEXT,
+    total INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    PRIMARY KEY (signature, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_signature_stats_day ON daily_signature_stats (day);
+"""
+
+SECONDS_PER_DAY = 86400
+
+def signature_for(test: Dict[str, Any]) -> str:
+    """Stable identity of a test across runs: method, endpoint, type and description"""
+    key = "|".join(str(test.get(field) or '') for field in ('method', 'endpoint', 'test_type', 'description'))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+class RunStore:
+    """Append-only SQLite history of executed tests with indexed trend queries"""
+
+    def __init__(self, db_path: str = ".gentest_cache/run_history.db"):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connect()
+        self._conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # One connection shared by executor threads, serialised with a lock
+        self._connection = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._pid = os.getpid()
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # A SQLite connection must not be used across fork(); preloaded server workers reopen their own
+        if self._pid != os.getpid():
+            self._connect()
+        return self._connection
+
+    def begin_run(self, source: str = "cli", run_id: str = None) -> str:
+        run_id = run_id or uuid.uuid4().hex
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO runs (run_id, started_at, source) VALUES (?, ?, ?)",
+                (run_id, time.time(), source)
+            )
+        return run_id
+
+    def record(self, run_id: str, result: Dict[str, Any]):
+        """Append one executed test result (in the TestExecutor.execute_test_case shape)"""
+        self.record_many(run_id, [result])
+
+    def record_many(self, run_id: str, results: List[Dict[str, Any]]):
+        rows = []
+        for result in results:
+            test = result.get('test', {})
+            ts = result.get('timestamp') or time.time()
+            rows.append((
+                run_id, ts, test.get('endpoint'), test.get('method'), signature_for(test),
+                test.get('description'), test.get('test_type'), result.get('status', 'ERROR'),
+                result.get('expected_status_code'), result.get('actual_status_code'),
+                result.get('duration_ms'), result.get('error')
+            ))
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO results (run_id, ts, endpoint, method, signature, test_name, test_type, status, "
+                "expected_status, actual_status, duration_ms, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.executemany(
+                "INSERT INTO daily_endpoint_stats (endpoint, day, total, passed) VALUES (?, ?, 1, ?) "
+                "ON CONFLICT (endpoint, day) DO UPDATE SET total = total + 1, passed = passed + excluded.passed",
+                [(row[2] or '', int(row[1] // SECONDS_PER_DAY), int(row[7] == 'PASS')) for row in rows]
+            )
+            self._conn.executemany(
+                "INSERT INTO daily_signature_stats (signature, day, endpoint, test_name, total, passed) "
+                "VALUES (?, ?, ?, ?, 1, ?) "
+                "ON CONFLICT (signature, day) DO UPDATE SET total = total + 1, passed = passed + excluded.passed",
+                [(row[4], int(row[1] // SECONDS_PER_DAY), row[2], row[5], int(row[7] == 'PASS')) for row in rows]
+            )
+
+    def pass_rate(self, endpoint: str, days: int = 90) -> Optional[float]:
+        """Pass rate in percent for an endpoint over the last N days, None without history"""
+        since_day = int((time.time() - days * SECONDS_PER_DAY) // SECONDS_PER_DAY)
+        with self._lock:
+            total, passed = self._conn.execute(
+                "SELECT SUM(total), SUM(passed) FROM daily_endpoint_stats WHERE endpoint = ? AND day >= ?",
+                (endpoint, since_day)
+            ).fetchone()
+        if not total:
+            return None
+        return round(100.0 * passed / total, 2)
+
+    def pass_rate_trend(self, endpoint: str = None, days: int = 90) -> List[Dict[str, Any]]:
+        """Daily pass rates shaped as the historical_data HTMLReporter.create_trend_chart expects"""
+        since_day = int((time.time() - days * SECONDS_PER_DAY) // SECONDS_PER_DAY)
+        query = "SELECT day, SUM(total), SUM(passed) FROM daily_endpoint_stats WHERE day >= ?"
+        params = [since_day]
+        if endpoint:
+            query += " AND endpoint = ?"
+            params.append(endpoint)
+        query += " GROUP BY day ORDER BY day"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [{
+            'timestamp': time.strftime('%Y-%m-%d', time.gmtime(day * SECONDS_PER_DAY)),
+            'pass_rate': round(100.0 * passed / total, 2),
+            'total': total
+        } for day, total, passed in rows]
+
+    def flaky_tests(self, days: int = 30, min_runs: int = 3, limit: int = 50) -> List[Dict[str, Any]]:
+        """Tests that both passed and failed within the window, most unstable first"""
+        since_day = int((time.time() - days * SECONDS_PER_DAY) // SECONDS_PER_DAY)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT signature, MAX(endpoint), MAX(test_name), SUM(total) AS runs, SUM(passed) AS passes "
+                "FROM daily_signature_stats WHERE day >= ? GROUP BY signature "
+                "HAVING runs >= ? AND passes > 0 AND passes < runs "
+                "ORDER BY MIN(passes, runs - passes) * 1.0 / runs DESC, runs DESC LIMIT ?",
+                (since_day, min_runs, limit)
+            ).fetchall()
+        return [{
+            'signature': signature,
+            'endpoint': endpoint,
+            'test_name': test_name,
+            'runs': runs,
+            'pass_rate': round(100.0 * passes / runs, 2)
+        } for signature, endpoint, test_name, runs, passes in rows]
+
+    def history(self, signature: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent raw results for one test signature"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT run_id, ts, status, actual_status, duration_ms, error FROM results "
+                "WHERE signature = ? ORDER BY ts DESC LIMIT ?",
+                (signature, limit)
+            ).fetchall()
+        return [dict(zip(('run_id', 'ts', 'status', 'actual_status', 'duration_ms', 'error'), row)) for row in rows]
+
+    def fetch_results(self, days: int = 90) -> List[tuple]:
+        """Raw (run_id, ts, endpoint, status, actual_status, duration_ms) rows of the last N days"""
+        since = time.time() - days * SECONDS_PER_DAY
+        with self._lock:
+            return self._conn.execute(
+                "SELECT run_id, ts, endpoint, status, actual_status, duration_ms FROM results WHERE ts >= ?",
+                (since,)
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,287 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+import socket
+import logging
+import multiprocessing
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shards (
+    run_id TEXT NOT NULL,
+    shard_id INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_id TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    updated_at REAL,
+    PRIMARY KEY (run_id, shard_id)
+);
+CREATE INDEX IF NOT EXISTS idx_shards_claim ON shards (run_id, status, lease_expires);
+"""
+
+class ShardQueue:
+    """Durable shard queue backed by a local SQLite file, so no broker is needed"""
+
+    def __init__(self, db_path: str, lease_seconds: int = 60, max_attempts: int = 3):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode; claims take an explicit write lock with BEGIN IMMEDIATE
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def enqueue(self, test_cases: List[Dict[str, Any]], shard_size: int = 25) -> str:
+        """Split test cases into shards and store them under a new run id"""
+        run_id = uuid.uuid4().hex
+        now = time.time()
+        rows = [
+            (run_id, shard_id, json.dumps(test_cases[start:start + shard_size]), now)
+            for shard_id, start in enumerate(range(0, len(test_cases), shard_size))
+        ]
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO shards (run_id, shard_id, payload, updated_at) VALUES (?, ?, ?, ?)", rows
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        logger.info(f"Enqueued {len(test_cases)} test cases as {len(rows)} shards for run {run_id}")
+        return run_id
+
+    def claim(self, run_id: str, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Lease the next pending shard, or one whose previous worker stopped renewing"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            # Shards whose lease ran out on their last allowed attempt are given up on
+            conn.execute(
+                "UPDATE shards SET status = 'failed', error = 'Lease expired after final attempt', updated_at = ? "
+                "WHERE run_id = ? AND status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, run_id, now, self.max_attempts)
+            )
+            row = conn.execute(
+                "SELECT shard_id, payload, attempts FROM shards "
+                "WHERE run_id = ? AND (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) "
+                "ORDER BY shard_id LIMIT 1",
+                (run_id, now)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            shard_id, payload, attempts = row
+            conn.execute(
+                "UPDATE shards SET status = 'leased', worker_id = ?, attempts = ?, lease_expires = ?, updated_at = ? "
+                "WHERE run_id = ? AND shard_id = ?",
+                (worker_id, attempts + 1, now + self.lease_seconds, now, run_id, shard_id)
+            )
+            conn.execute("COMMIT")
+            return {'shard_id': shard_id, 'test_cases': json.loads(payload), 'attempt': attempts + 1}
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def renew(self, run_id: str, shard_id: int, worker_id: str) -> bool:
+        """Extend a lease; returns False if the shard was reassigned meanwhile"""
+        return self._update_owned(
+            "lease_expires = ?", (time.time() + self.lease_seconds,), run_id, shard_id, worker_id
+        )
+
+    def complete(self, run_id: str, shard_id: int, worker_id: str, results: List[Dict[str, Any]]) -> bool:
+        return self._update_owned(
+            "status = 'done', result = ?, error = NULL", (json.dumps(results, default=str),), run_id, shard_id, worker_id
+        )
+
+    def fail(self, run_id: str, shard_id: int, worker_id: str, error: str) -> bool:
+        """Record a failed attempt, putting the shard back in the queue while attempts remain"""
+        return self._update_owned(
+            "status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, error = ?, lease_expires = NULL",
+            (self.max_attempts, error), run_id, shard_id, worker_id
+        )
+
+    def release_worker(self, run_id: str, worker_id: str) -> int:
+        """Expire the leases of a worker known to be dead so others pick its shards up at once"""
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "UPDATE shards SET lease_expires = 0, updated_at = ? WHERE run_id = ? AND worker_id = ? AND status = 'leased'",
+                (time.time(), run_id, worker_id)
+            )
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    def _update_owned(self, assignments: str, values: tuple, run_id: str, shard_id: int, worker_id: str) -> bool:
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                f"UPDATE shards SET {assignments}, updated_at = ? "
+                "WHERE run_id = ? AND shard_id = ? AND worker_id = ? AND status = 'leased'",
+                values + (time.time(), run_id, shard_id, worker_id)
+            )
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def progress(self, run_id: str) -> Dict[str, int]:
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM shards WHERE run_id = ? GROUP BY status", (run_id,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return {status: count for status, count in rows}
+
+    def is_finished(self, run_id: str) -> bool:
+        progress = self.progress(run_id)
+        return progress.get('pending', 0) == 0 and progress.get('leased', 0) == 0
+
+    def collect(self, run_id: str) -> List[Dict[str, Any]]:
+        """Merge shard results in shard order; permanently failed shards yield error results"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT payload, status, result, error FROM shards WHERE run_id = ? ORDER BY shard_id", (run_id,)
+            ).fetchall()
+        finally:
+            conn.close()
+
+        merged = []
+        for payload, status, result, error in rows:
+            if status == 'done':
+                merged.extend(json.loads(result))
+                continue
+            for test_case in json.loads(payload):
+                merged.append({
+                    'test': test_case,
+                    'success': False,
+                    'status': 'ERROR',
+                    'expected_status_code': test_case.get('expected_status_code'),
+                    'actual_status_code': None,
+                    'response': None,
+                    'error': f"Shard {status}: {error or 'not executed'}"
+                })
+        return merged
+
+
+def run_worker(db_path: str, run_id: str, worker_id: str = None, base_url: str = None,
+               lease_seconds: int = 60, max_attempts: int = 3, timeout: int = 30,
+               run_store_path: str = None):
+    """Worker loop: claim shards for a run and execute them until the queue is drained"""
+    from .test_executor import TestExecutor
+    from .run_store import RunStore
+
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    queue = ShardQueue(db_path, lease_seconds=lease_seconds, max_attempts=max_attempts)
+    run_store = RunStore(run_store_path) if run_store_path else None
+    executor = TestExecutor(base_url=base_url, timeout=timeout, run_store=run_store, run_id=run_id)
+    logger.info(f"Worker {worker_id} started for run {run_id}")
+
+    while True:
+        shard = queue.claim(run_id, worker_id)
+        if shard is None:
+            if queue.is_finished(run_id):
+                break
+            # Other workers still hold leases; wait in case one of them dies
+            time.sleep(1)
+            continue
+
+        shard_id = shard['shard_id']
+        try:
+            results = []
+            for test_case in shard['test_cases']:
+                results.append(executor.execute_test_case(test_case))
+                # Renew after every test so a live worker never loses its shard
+                if not queue.renew(run_id, shard_id, worker_id):
+                    raise RuntimeError("Lease lost to another worker")
+            queue.complete(run_id, shard_id, worker_id, results)
+            logger.info(f"Worker {worker_id} finished shard {shard_id} (attempt {shard['attempt']})")
+        except Exception as e:
+            logger.error(f"Worker {worker_id} failed shard {shard_id}: {str(e)}")
+            queue.fail(run_id, shard_id, worker_id, str(e))
+
+    logger.info(f"Worker {worker_id} exiting, run {run_id} drained")
+
+
+class ShardCoordinator:
+    """Splits a suite into shards and runs it across N local worker processes"""
+
+    def __init__(self, db_path: str, shard_size: int = 25, lease_seconds: int = 60,
+                 max_attempts: int = 3, timeout: int = 30, run_store_path: str = None):
+        self.shard_size = shard_size
+        self.run_store_path = run_store_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.queue = ShardQueue(db_path, lease_seconds=lease_seconds, max_attempts=max_attempts)
+
+    def run_local(self, test_cases: List[Dict[str, Any]], workers: int = 4, base_url: str = None,
+                  poll_interval: float = 1.0) -> List[Dict[str, Any]]:
+        """Execute test cases on local worker processes and return the merged results"""
+        run_id = self.queue.enqueue(test_cases, self.shard_size)
+        ctx = multiprocessing.get_context('spawn')
+        processes = {}
+
+        def start_worker(index: int):
+            worker_id = f"{run_id[:8]}-worker-{index}"
+            process = ctx.Process(
+                target=run_worker,
+                args=(self.queue.db_path, run_id, worker_id, base_url,
+                      self.lease_seconds, self.max_attempts, self.timeout, self.run_store_path),
+                daemon=True
+            )
+            process.start()
+            processes[worker_id] = process
+
+        for index in range(workers):
+            start_worker(index)
+        next_index = workers
+        # Bound respawns so a worker that crashes on startup can't loop forever
+        restarts_left = workers * self.max_attempts
+
+        while not self.queue.is_finished(run_id):
+            time.sleep(poll_interval)
+            for worker_id, process in list(processes.items()):
+                if process.is_alive():
+                    continue
+                del processes[worker_id]
+                if process.exitcode != 0:
+                    # Hand the dead worker's shards back now instead of waiting for the lease
+                    released = self.queue.release_worker(run_id, worker_id)
+                    logger.warning(f"Worker {worker_id} died (exit code {process.exitcode}), released {released} shards")
+                if restarts_left > 0 and not self.queue.is_finished(run_id):
+                    start_worker(next_index)
+                    next_index += 1
+                    restarts_left -= 1
+            if not processes:
+                logger.error(f"No workers left for run {run_id}, collecting partial results")
+                break
+
+        for process in processes.values():
+            process.join(timeout=self.lease_seconds)
+
+        logger.info(f"Run {run_id} finished: {self.queue.progress(run_id)}")
+        return self.queue.collect(run_id)
@@ -0,0 +1,69 @@
+import threading
+import logging
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    still running block and receive the same result (or exception). Nothing is
+    cached: once the flight lands, the next call starts a new one.
+
+    Flights are tracked in this process only. Under several server workers
+    (gunicorn), identical requests that land on different workers are not
+    coalesced: each worker calls the model once for them.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.counters = {'calls': 0, 'executions': 0, 'coalesced_waiters': 0}
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run func for key, or wait on the in-flight run; returns (result, shared)"""
+        with self._lock:
+            self.counters['calls'] += 1
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.waiters += 1
+                self.counters['coalesced_waiters'] += 1
+                leader = False
+            else:
+                flight = self._flights[key] = _Flight()
+                self.counters['executions'] += 1
+                leader = True
+
+        if not leader:
+            logger.info(f"Joining in-flight call for {key} ({flight.waiters} waiting)")
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = func()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                **self.counters,
+                'in_flight': len(self._flights),
+                'waiting': sum(flight.waiters for flight in self._flights.values())
+            }
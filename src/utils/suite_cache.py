@@ -0,0 +1,49 @@
+import json
+import os
+import logging
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+class SuiteCache:
+    """Generated test suites persisted on disk, keyed by operation fingerprint"""
+
+    def __init__(self, cache_dir: str = ".gentest_cache/suites"):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, fingerprint: str) -> str:
+        return os.path.join(self.cache_dir, f"{fingerprint}.json")
+
+    def get(self, fingerprint: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the cached test cases for a fingerprint, or None on a miss"""
+        path = self._path(fingerprint)
+        if not os.path.exists(path):
+            metrics.SUITE_CACHE_LOOKUPS.inc(result='miss')
+            return None
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+            metrics.SUITE_CACHE_LOOKUPS.inc(result='hit')
+            return entry['test_cases']
+        except (OSError, ValueError, KeyError) as e:
+            # A corrupt entry is treated as a miss and regenerated
+            logger.warning(f"Ignoring unreadable suite cache entry {path}: {e}")
+            metrics.SUITE_CACHE_LOOKUPS.inc(result='miss')
+            return None
+
+    def put(self, fingerprint: str, spec_key: str, test_cases: List[Dict[str, Any]]):
+        """Store test cases for a fingerprint, replacing any previous entry atomically"""
+        entry = {
+            'spec_key': spec_key,
+            'fingerprint': fingerprint,
+            'generated_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'test_cases': test_cases
+        }
+        path = self._path(fingerprint)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f, indent=2, default=str)
+        os.replace(tmp_path, path)
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import shlex
+import logging
+from typing import List, Dict, Any, Tuple, Optional
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+logger = logging.getLogger(__name__)
+
+METHOD_FLAGS = {'-X', '--request'}
+HEADER_FLAGS = {'-H', '--header'}
+DATA_FLAGS = {'-d', '--data', '--data-raw', '--data-binary', '--data-ascii', '--json'}
+URL_FLAGS = {'--url'}
+# Other flags that consume the following token; kept in the signature as-is
+VALUE_FLAGS = {'-u', '--user', '-A', '--user-agent', '-b', '--cookie', '-e', '--referer', '-F', '--form',
+               '-o', '--output', '-x', '--proxy', '-m', '--max-time', '--connect-timeout'}
+
+def canonical_request(curl_command: str) -> Optional[Dict[str, Any]]:
+    """Reduce a curl command to method, URL, sorted query, normalized headers and canonical body"""
+    command = curl_command.replace('\\\n', ' ').strip()
+    try:
+        tokens = shlex.split(command)
+    except ValueError:
+        # Unbalanced quotes in LLM output; caller falls back to whitespace normalisation
+        return None
+    if not tokens or tokens[0] != 'curl':
+        return None
+
+    method, url, headers, data, extra = None, None, [], [], []
+    i = 1
+    while i < len(tokens):
+        token = tokens[i]
+        value = tokens[i + 1] if i + 1 < len(tokens) else ''
+        if token in METHOD_FLAGS:
+            method = value.upper()
+            i += 2
+        elif token in HEADER_FLAGS:
+            name, _, header_value = value.partition(':')
+            headers.append((name.strip().lower(), ' '.join(header_value.split())))
+            i += 2
+        elif token in DATA_FLAGS:
+            data.append(value)
+            i += 2
+        elif token in URL_FLAGS:
+            url = value
+            i += 2
+        elif token in VALUE_FLAGS:
+            extra.append((token, value))
+            i += 2
+        elif token.startswith('-'):
+            # Flags without a value (--location, -k, -s, ...) don't change the request
+            i += 1
+        else:
+            url = url or token
+            i += 1
+
+    if not url:
+        return None
+
+    parts = urlsplit(url)
+    query = sorted(parse_qsl(parts.query, keep_blank_values=True))
+    return {
+        'method': method or ('POST' if data else 'GET'),
+        'url': f"{parts.scheme.lower()}://{parts.netloc.lower()}{parts.path or '/'}",
+        'query': urlencode(query),
+        'headers': sorted(headers),
+        'body': _canonical_body('&'.join(data)) if data else None,
+        'extra': sorted(extra)
+    }
+
+def _canonical_body(body: str) -> str:
+    try:
+        return json.dumps(json.loads(body), sort_keys=True, separators=(',', ':'))
+    except ValueError:
+        return ' '.join(body.split())
+
+def request_signature(curl_command: str) -> str:
+    """Hash identifying the HTTP request a curl command sends, ignoring formatting"""
+    canonical = canonical_request(curl_command)
+    if canonical is None:
+        key = ' '.join(curl_command.replace('\\\n', ' ').split())
+    else:
+        key = json.dumps(canonical, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+def deduplicate_test_cases(test_cases: List[Dict[str, Any]], baseline_curl: str = None) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """Drop test cases that send the same request as an earlier one.
+
+    Descriptions of dropped duplicates are merged into the kept case. A
+    non-positive case that is an unmodified copy of the baseline request is
+    dropped as well, since it cannot exercise anything the baseline doesn't.
+    """
+    baseline_signature = request_signature(baseline_curl) if baseline_curl else None
+    kept_by_signature = {}
+    unique = []
+    stats = {'generated': len(test_cases), 'kept': 0, 'duplicates_removed': 0, 'baseline_copies_removed': 0}
+
+    for test_case in test_cases:
+        curl_command = test_case.get('curl_command') if isinstance(test_case, dict) else None
+        if not curl_command:
+            unique.append(test_case)
+            continue
+
+        signature = request_signature(curl_command)
+        if signature == baseline_signature and test_case.get('test_type') != 'positive':
+            stats['baseline_copies_removed'] += 1
+            continue
+
+        kept = kept_by_signature.get(signature)
+        if kept is not None:
+            stats['duplicates_removed'] += 1
+            description = test_case.get('description')
+            if description and description != kept.get('description'):
+                kept.setdefault('merged_descriptions', []).append(description)
+            continue
+
+        test_case['request_signature'] = signature
+        kept_by_signature[signature] = test_case
+        unique.append(test_case)
+
+    stats['kept'] = len(unique)
+    removed = stats['duplicates_removed'] + stats['baseline_copies_removed']
+    if removed:
+        logger.info(f"Removed {removed} duplicate test cases ({stats['baseline_copies_removed']} baseline copies)")
+    return unique, stats
@@ -1,21 +1,130 @@
 from src.utils.ai_providers.base import AIProvider
 from src.utils.ai_providers.huggingface_provider import HuggingFaceProvider
+from src.utils.ai_providers.pool import ProviderPool, BackendUnavailableError
+from src.utils.test_dedup import deduplicate_test_cases, request_signature
+from src.utils.llm_gate import backend_gate, LLMBusyError, INTERACTIVE
+from src.utils import metrics, tracing
+from src.utils.transcripts import transcript_store
+from src.utils.model_warmup import model_warmer
+from src.utils.prompt_budget import BudgetedPrompt, Placeholders, compact_curl, compact_json, estimate_tokens, group_plan
+from config.config import settings
+import time
 from pydantic import BaseModel, Field
+import functools
 import logging
-from typing import  List, Dict, Any, Union, Tuple
+from typing import  List, Dict, Any, Union, Tuple, Optional, Sequence
 import re
 import json
-import subprocess
+import requests
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, parse_qs
 
 logger = logging.getLogger(__name__)
 
+# Output schema sent as Ollama's `format`; the model is constrained to emit exactly this shape
+TEST_CASES_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "test_cases": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "description": {"type": "string"},
+                    "test_type": {"type": "string", "enum": ["positive", "negative"]},
+                    "expected_status_code": {"type": "integer"},
+                    "curl_command": {"type": "string"}
+                },
+                "required": ["description", "test_type", "expected_status_code", "curl_command"]
+            }
+        }
+    },
+    "required": ["test_cases"]
+}
+
+def _conformant_case(case: Any) -> Optional[Dict[str, Any]]:
+    """A case matching the schema's item shape, with a numeric-string status such as "200" made an int; None otherwise"""
+    if not isinstance(case, dict):
+        return None
+    status = case.get('expected_status_code')
+    if isinstance(status, str) and status.strip().isdigit():
+        status = int(status)
+    if not (isinstance(case.get('description'), str)
+            and case.get('test_type') in ('positive', 'negative')
+            and isinstance(status, int) and not isinstance(status, bool)
+            and isinstance(case.get('curl_command'), str)):
+        return None
+    return {**case, 'expected_status_code': status}
+
+def parse_structured_test_cases(ai_response: str) -> Optional[List[Dict[str, Any]]]:
+    """Conformant test cases from a schema object (or a bare array); None when the answer has none.
+    
+    Cases are checked one by one, so a single malformed case is dropped rather than the whole answer.
+    """
+    try:
+        data = json.loads(ai_response)
+    except (ValueError, TypeError):
+        return None
+    if isinstance(data, dict):
+        data = data.get('test_cases')
+    if not isinstance(data, list):
+        return None
+    test_cases = [case for case in map(_conformant_case, data) if case is not None]
+    if len(test_cases) < len(data):
+        logger.warning(f"Dropped {len(data) - len(test_cases)} of {len(data)} test cases that do not match the schema")
+    return test_cases or None
+
+def _output_format() -> Any:
+    """Value for Ollama's `format` option, or None to leave output unconstrained"""
+    return {'schema': TEST_CASES_SCHEMA, 'json': 'json'}.get(settings.LLM_OUTPUT_FORMAT)
+
+def _record_parse_path(path: str):
+    metrics.AI_PARSE_PATH.inc(path=path)
+    tracing.annotate(strategy=path)
+    transcript_store.note(parse_strategy=path)
+
+# Generation calls are balanced over LLM_BACKENDS, with failover and circuit breakers
+provider_pool = ProviderPool.from_specs(
+    settings.LLM_BACKENDS,
+    localai_model=settings.LOCALAI_MODEL,
+    failure_threshold=settings.LLM_BREAKER_FAILURES,
+    reset_seconds=settings.LLM_BREAKER_RESET_SECONDS
+)
+
+@functools.lru_cache(maxsize=1)
+def shared_ai_provider() -> HuggingFaceProvider:
+    """One provider per process; built before fork when the server preloads, then shared copy-on-write"""
+    return HuggingFaceProvider()
+
 class TestGenerator(BaseModel):
-    ai: HuggingFaceProvider = Field(default_factory=HuggingFaceProvider)
+    # Built on first use by get_ai_provider; loading GPT-2 on every TestGenerator() is slow
+    ai: Optional[HuggingFaceProvider] = None
+    # Duplicate counts from the most recent generate_test_cases call
+    last_dedup_stats: Dict[str, int] = Field(default_factory=dict)
+    # Id of the most recent generation's entry in the transcript store (see /debug/transcripts)
+    last_transcript_id: Optional[str] = None
+    # Queue priority at the backend gate ('interactive' or 'batch')
+    priority: str = INTERACTIVE
+    # When the gate turns us away: fall back to a default case (True) or raise LLMBusyError (False)
+    busy_fallback: bool = False
+    # Wall-clock time (time.time()) after which no model call is started or retried; None for no deadline
+    deadline_at: Optional[float] = None
     
     class Config:
         arbitrary_types_allowed = True
 
+    def _time_left(self) -> Optional[float]:
+        """Seconds until deadline_at (negative once it has passed), or None without a deadline"""
+        return None if self.deadline_at is None else self.deadline_at - time.time()
+
+    def get_ai_provider(self) -> HuggingFaceProvider:
+        """Return the HuggingFace provider, loading the model on first call"""
+        if self.ai is None:
+            self.ai = shared_ai_provider()
+        return self.ai
+
+    @metrics.CURL_PARSE_SECONDS.time()
+    @tracing.traced('curl.parse')
     def parse_curl_command(self, curl_command: str) -> Dict[str, Any]:
         """Parse curl command into components"""
         logger.info("Parsing curl command")
@@ -67,7 +176,6 @@ class TestGenerator(BaseModel):
             # Extract method
             method_match = re.search(r'-X\s+([A-Z]+)', curl_command)
             method = method_match.group(1) if method_match else 'GET'
-            self.generate_test_cases(curl_command, return_raw=True)
             # Extract headers - try multiple patterns
             headers = {}
             # With --header
@@ -119,36 +227,275 @@ class TestGenerator(BaseModel):
             logger.error(f"Error parsing curl command: {e}")
             raise ValueError(f"Failed to parse curl command: {e}")
 
+    @tracing.traced('generate')
     def generate_test_cases(self, curl_command: str, return_raw: bool = False, parsed_curl=None) -> Union[List[Dict[str, Any]], Tuple[List[Dict[str, Any]], str]]:
         """Generate test cases for a curl command"""
-        try:
-            logger.info(f"Generating test cases for curl command: {curl_command[:50]}...")
-            
-            # Generate the prompt for the AI, using parsed_curl for optimization if available
-            prompt = self._generate_optimized_prompt(curl_command, parsed_curl) if parsed_curl else self._generate_prompt(curl_command)
+        signature = request_signature(curl_command) if isinstance(curl_command, str) else None
+        with transcript_store.session(curl_signature=signature, priority=self.priority) as transcript_id:
+            self.last_transcript_id = transcript_id
+            try:
+                logger.info(f"Generating test cases for curl command: {curl_command[:50]}...")
+                tracing.annotate(curl_signature=signature, priority=self.priority, transcript_id=transcript_id)
             
-            # Get the AI response
-            ai_response = self._generate_ai_test_scenarios(prompt)
+                # On the optimized (plan) path, a plan too large for one answer is generated in chunks, in parallel
+                fields = self._plan_fields(parsed_curl) if parsed_curl else []
+                if len(fields) > settings.GENERATION_CHUNK_FIELDS:
+                    started = time.perf_counter()
+                    test_cases = self._generate_chunked(curl_command, parsed_curl, fields)
+                    transcript_store.note_timing('llm', started)
+                    ai_response = json.dumps(test_cases)
+                else:
+                    # Generate the prompt for the AI, using parsed_curl for optimization if available
+                    started = time.perf_counter()
+                    prompt = self._generate_optimized_prompt(curl_command, parsed_curl) if parsed_curl else self._generate_prompt(curl_command)
+                    transcript_store.note_timing('prompt', started)
+                    transcript_store.note(prompt_budget=prompt.stats())
+                    tracing.annotate(prompt_tokens=prompt.tokens)
+                
+                    # Get the AI response
+                    started = time.perf_counter()
+                    ai_response = self._generate_ai_test_scenarios(prompt.text, curl_command)
+                    transcript_store.note_timing('llm', started)
+                
+                    # Parse the AI response to extract test cases; values elided from the prompt go back in
+                    started = time.perf_counter()
+                    test_cases = prompt.restore(self._parse_ai_response(ai_response, curl_command))
+                    transcript_store.note_timing('parse', started)
             
-            # Parse the AI response to extract test cases
-            test_cases = self._parse_ai_response(ai_response, curl_command)
-            logger.info(f"Generated {len(test_cases)} test cases")
+                # Drop near-duplicate requests before they cost an HTTP call each
+                baseline_curl = curl_command if isinstance(curl_command, str) else None
+                test_cases, self.last_dedup_stats = deduplicate_test_cases(test_cases, baseline_curl)
+                logger.info(f"Generated {len(test_cases)} test cases")
+                tracing.annotate(test_cases=len(test_cases))
+                transcript_store.note(test_cases=len(test_cases))
             
-            if return_raw:
-                return test_cases, ai_response
-            return test_cases
-        except Exception as e:
-            logger.error(f"Error generating test cases: {str(e)}", exc_info=True)
-            if return_raw:
-                return [], str(e)
+                if return_raw:
+                    return test_cases, ai_response
+                return test_cases
+            except LLMBusyError:
+                # Callers answer 503 (or retry later) instead of getting an empty suite
+                raise
+            except Exception as e:
+                logger.error(f"Error generating test cases: {str(e)}", exc_info=True)
+                if return_raw:
+                    return [], str(e)
+                return []
+
+    @tracing.traced('generate.batch')
+    def generate_test_cases_batch(self, curl_commands: Sequence[Any]) -> List[List[Dict[str, Any]]]:
+        """Test cases for several endpoints, their prompts sent to the model in one batched call.
+        
+        Only used when a backend can batch (provider_pool.supports_batching). Endpoints whose batched
+        answer yields no test cases go through generate_test_cases on their own.
+        """
+        results = [None] * len(curl_commands)
+        prompts = {}
+        for index, curl_command in enumerate(curl_commands):
+            try:
+                prompts[index] = self._generate_prompt(curl_command)
+            except Exception as e:
+                logger.warning(f"Could not build a batch prompt for endpoint {index}: {e}")
+        
+        if provider_pool.supports_batching and len(prompts) > 1:
+            answers = self._generate_batch([prompt.text for prompt in prompts.values()])
+            for (index, prompt), answer in zip(prompts.items(), answers):
+                if not answer:
+                    continue
+                try:
+                    test_cases = [case for case in prompt.restore(self._parse_ai_response(answer, curl_commands[index]))
+                                  if isinstance(case, dict)]
+                except Exception as e:
+                    logger.warning(f"Could not parse the batched answer for endpoint {index}: {e}")
+                    continue
+                if test_cases:
+                    baseline_curl = curl_commands[index] if isinstance(curl_commands[index], str) else None
+                    results[index] = deduplicate_test_cases(test_cases, baseline_curl)[0]
+        
+        return [test_cases if test_cases is not None else self.generate_test_cases(curl_command)
+                for test_cases, curl_command in zip(results, curl_commands)]
+
+    @tracing.traced('llm.batch')
+    def _generate_batch(self, prompts: List[str]) -> List[str]:
+        """One batched model call; empty answers when no backend could take it"""
+        model = self._select_model()
+        options = {name: value for name, value in self._ollama_payload(model, '').items() if name not in ('prompt', 'stream')}
+        metrics.LLM_BATCH_PROMPTS.observe(len(prompts))
+        tracing.annotate(model=model, prompts=len(prompts))
+        
+        # One gate slot per request in flight: Ollama answers a batch as concurrent requests,
+        # so the batch is held to the slots it got and stays within LLM_MAX_CONCURRENCY
+        parallel = min(len(prompts), backend_gate.max_concurrent)
+        with backend_gate.slot(self.priority, count=parallel):
+            started = time.perf_counter()
+            try:
+                # Same per-request timeout as a single generation attempt
+                answers = provider_pool.generate_batch(prompts, timeout=180, parallel=parallel, **options)
+            except (requests.Timeout, BackendUnavailableError) as e:
+                outcome = 'timeout' if isinstance(e, requests.Timeout) else 'unavailable'
+                metrics.LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, outcome=outcome)
+                tracing.annotate(outcome=outcome)
+                logger.warning(f"Batched generation of {len(prompts)} prompts failed ({e}); generating one by one")
+                return [''] * len(prompts)
+        metrics.LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, outcome='ok')
+        tracing.annotate(outcome='ok')
+        return answers
+
+    def _parse_for_plan(self, curl_command: str) -> Optional[Dict[str, Any]]:
+        """Parsed curl used only to size the test plan; None when it can't be parsed"""
+        if not isinstance(curl_command, str):
+            return None
+        try:
+            return self.parse_curl_command(curl_command)
+        except ValueError:
+            return None
+
+    @tracing.traced('llm.chunks')
+    def _generate_chunked(self, curl_command: str, parsed_curl: dict, fields: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Generate a large plan as chunks of GENERATION_CHUNK_FIELDS fields, in parallel up to the backend's limit.
+        
+        Each chunk has its own prompt and retries. Results are merged in plan order;
+        a chunk that still fails is reported and left out rather than failing the rest.
+        """
+        size = settings.GENERATION_CHUNK_FIELDS
+        chunks = [fields[start:start + size] for start in range(0, len(fields), size)]
+        model = self._select_model()
+        tracing.annotate(chunks=len(chunks), fields=len(fields), model=model)
+        logger.info(f"Generating {len(fields)} fields in {len(chunks)} chunks with {model}")
+        
+        def run(index: int) -> List[Dict[str, Any]]:
+            with tracing.span('llm.chunk', chunk=index, fields=len(chunks[index])):
+                prompt = self._generate_optimized_prompt(curl_command, parsed_curl, chunks[index], include_baseline=index == 0)
+                return self._generate_chunk(model, prompt, curl_command)
+        
+        # The gate decides how many actually run at once; more threads would only queue there
+        workers = max(1, min(len(chunks), backend_gate.max_concurrent))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='gentest-chunk') as pool:
+            futures = [pool.submit(tracing.wrap(run), index) for index in range(len(chunks))]
+        
+        test_cases, failures = [], []
+        for index, future in enumerate(futures):
+            try:
+                test_cases.extend(future.result())
+                metrics.GENERATION_CHUNKS.inc(outcome='ok')
+            except Exception as e:
+                logger.warning(f"Chunk {index + 1}/{len(chunks)} failed: {str(e)}")
+                metrics.GENERATION_CHUNKS.inc(outcome='failed')
+                failures.append((index, e))
+        transcript_store.note(chunks={'total': len(chunks), 'failed': [index for index, _ in failures]})
+        
+        if not test_cases and failures:
+            busy = next((e for _, e in failures if isinstance(e, LLMBusyError)), None)
+            if busy is not None and not self.busy_fallback:
+                raise busy
+            metrics.GENERATION_FALLBACKS.inc(reason='chunks_failed')
+            return [{
+                "description": "Default test case (all chunks failed)",
+                "test_type": "positive",
+                "expected_status_code": 200,
+                "curl_command": curl_command
+            }]
+        return test_cases
+
+    def _generate_chunk(self, model: str, prompt: BudgetedPrompt, curl_command: str) -> List[Dict[str, Any]]:
+        """One chunk's test cases; raises once GENERATION_CHUNK_RETRIES retries are used up"""
+        error = None
+        for attempt in range(settings.GENERATION_CHUNK_RETRIES + 1):
+            if attempt:
+                time_left = self._time_left()
+                if time_left is not None and time_left <= attempt:
+                    break
+                metrics.LLM_RETRIES.inc()
+                with tracing.span('llm.retry_wait', seconds=attempt):
+                    time.sleep(attempt)
+            with tracing.span('llm.attempt', attempt=attempt + 1, model=model):
+                try:
+                    stdout, _ = self._call_ollama(model, prompt.text, settings.GENERATION_CHUNK_TIMEOUT)
+                    ai_response = json.loads(stdout.decode('utf-8')).get('response', '') if stdout else ''
+                except requests.Timeout:
+                    error = TimeoutError(f"no answer within {settings.GENERATION_CHUNK_TIMEOUT}s")
+                    continue
+                except ValueError as e:
+                    error = e
+                    continue
+                test_cases = [case for case in self._parse_ai_response(ai_response, curl_command) if isinstance(case, dict)]
+                if test_cases:
+                    return prompt.restore(test_cases)
+                error = ValueError('no test cases in the response')
+        raise error
+
+    @staticmethod
+    def _query_params(url: str) -> Dict[str, str]:
+        query_params = {}
+        if '?' in url:
+            base_url, query_string = url.split('?', 1)
+            for param_pair in query_string.split('&'):
+                if '=' in param_pair:
+                    key, value = param_pair.split('=', 1)
+                    query_params[key] = value
+        return query_params
+
+    def _plan_fields(self, parsed_curl: dict) -> List[Tuple[str, str]]:
+        """(kind, name) of every field the optimized plan tests, in plan order; two plan entries each"""
+        body = parsed_curl.get('body') or {}
+        return ([('header', name) for name in parsed_curl.get('headers', {})] +
+                [('body parameter', name) for name in (body if isinstance(body, dict) else {})] +
+                [('query parameter', name) for name in self._query_params(parsed_curl.get('url', ''))])
+
+    @tracing.traced('generate.deterministic')
+    def deterministic_test_cases(self, curl_command: str) -> List[Dict[str, Any]]:
+        """The optimized plan's tests built without the model: baseline, then missing/invalid for every field"""
+        parsed = self._parse_for_plan(curl_command)
+        if parsed is None:
             return []
+        base_url = parsed['url'].split('?', 1)[0]
+        query = self._query_params(parsed['url'])
+        body = parsed.get('body') if isinstance(parsed.get('body'), dict) else None
 
-    def _generate_optimized_prompt(self, curl_command: str, parsed_curl: dict) -> str:
+        def case(description: str, headers: dict = None, body_value: Any = body, params: dict = None) -> Dict[str, Any]:
+            params = query if params is None else params
+            request = {
+                'method': parsed['method'],
+                'headers': parsed['headers'] if headers is None else headers,
+                'body': body_value if body is not None else parsed.get('body'),
+                'url': base_url + ('?' + '&'.join(f"{key}={value}" for key, value in params.items()) if params else '')
+            }
+            return {'description': description, 'test_type': 'negative', 'expected_status_code': 400,
+                    'curl_command': self._generate_curl_command(request)}
+
+        test_cases = [{'description': "Baseline positive test with all valid parameters", 'test_type': 'positive',
+                       'expected_status_code': 200, 'curl_command': curl_command}]
+        for kind, name in self._plan_fields(parsed):
+            if kind == 'header':
+                missing = {key: value for key, value in parsed['headers'].items() if key != name}
+                invalid = {**parsed['headers'], name: self._get_invalid_value(parsed['headers'][name])}
+                test_cases.append(case(f"Missing required header: {name}", headers=missing))
+                test_cases.append(case(f"Invalid value for header: {name}", headers=invalid))
+            elif kind == 'body parameter':
+                missing = {key: value for key, value in body.items() if key != name}
+                invalid = {**body, name: self._get_invalid_value(body[name])}
+                test_cases.append(case(f"Missing required body parameter: {name}", body_value=missing))
+                test_cases.append(case(f"Invalid value for body parameter: {name}", body_value=invalid))
+            else:
+                missing = {key: value for key, value in query.items() if key != name}
+                invalid = {**query, name: self._get_invalid_value(query[name])}
+                test_cases.append(case(f"Missing required query parameter: {name}", params=missing))
+                test_cases.append(case(f"Invalid value for query parameter: {name}", params=invalid))
+        return deduplicate_test_cases(test_cases, curl_command)[0]
+
+    @tracing.traced('prompt.build')
+    def _generate_optimized_prompt(self, curl_command: str, parsed_curl: dict,
+                                   fields: Optional[List[Tuple[str, str]]] = None, include_baseline: bool = True) -> BudgetedPrompt:
         """
         Generate an optimized prompt that systematically creates test cases for:
         1. Each header (missing and invalid)
         2. Each request parameter (missing and invalid)
         3. Each query parameter (missing and invalid)
+        
+        JSON is always compacted. While the prompt, as sent (wrapped by _scenario_prompt), is over
+        PROMPT_TOKEN_BUDGET, the plan is grouped, long values are replaced by placeholders and
+        finally the duplicated API details are reduced to field names.
+        
+        fields (from _plan_fields) restricts the plan to those fields, for one chunk of a large plan.
         """
         # Extract key information from parsed_curl
         url = parsed_curl.get('url', '')
@@ -157,27 +504,26 @@ class TestGenerator(BaseModel):
         body = parsed_curl.get('body', {})
         
         # Extract query parameters from URL
-        query_params = {}
-        if '?' in url:
-            base_url, query_string = url.split('?', 1)
-            for param_pair in query_string.split('&'):
-                if '=' in param_pair:
-                    key, value = param_pair.split('=', 1)
-                    query_params[key] = value
+        query_params = self._query_params(url)
+        wanted = set(fields) if fields is not None else None
+        
+        def planned(kind: str, name: str) -> bool:
+            return wanted is None or (kind, name) in wanted
         
         # Create a structured test plan
         test_plan = []
         
         # 1. Add a baseline positive test
-        test_plan.append({
-            "description": "Baseline positive test with all valid parameters",
-            "test_type": "positive",
-            "expected_status_code": 200,
-            "curl_command": curl_command
-        })
+        if include_baseline:
+            test_plan.append({
+                "description": "Baseline positive test with all valid parameters",
+                "test_type": "positive",
+                "expected_status_code": 200,
+                "curl_command": curl_command
+            })
         
         # 2. Generate test cases for each header
-        for header_name in headers.keys():
+        for header_name in (name for name in headers.keys() if planned('header', name)):
             # Missing header test
             test_plan.append({
                 "description": f"Missing required header: {header_name}",
@@ -196,7 +542,7 @@ class TestGenerator(BaseModel):
         
         # 3. Generate test cases for each body parameter (if body is present and is a dict)
         if isinstance(body, dict):
-            for param_name in body.keys():
+            for param_name in (name for name in body.keys() if planned('body parameter', name)):
                 # Missing parameter test
                 test_plan.append({
                     "description": f"Missing required body parameter: {param_name}",
@@ -214,7 +560,7 @@ class TestGenerator(BaseModel):
                 })
         
         # 4. Generate test cases for each query parameter
-        for param_name in query_params.keys():
+        for param_name in (name for name in query_params.keys() if planned('query parameter', name)):
             # Missing parameter test
             test_plan.append({
                 "description": f"Missing required query parameter: {param_name}",
@@ -231,25 +577,40 @@ class TestGenerator(BaseModel):
                 "curl_command": f"Set {param_name} to an invalid value"
             })
         
-        # Create the optimized prompt
-        prompt = f"""
+        placeholders = Placeholders(settings.PROMPT_MAX_VALUE_CHARS)
+        shown = {'curl': curl_command, 'headers': headers, 'body': body, 'query': query_params}
+        plan_text = compact_json(test_plan)
+        full_details = True
+        
+        def render() -> str:
+            if full_details:
+                details = f"""- Headers: {compact_json(shown['headers'])}
+        - Body Parameters: {compact_json(shown['body']) if body else "None"}
+        - Query Parameters: {compact_json(shown['query']) if query_params else "None"}"""
+            else:
+                # Values are all in the curl command already
+                details = f"""- Header names: {compact_json(list(headers))}
+        - Body parameter names: {compact_json(list(body)) if isinstance(body, dict) and body else "None"}
+        - Query parameter names: {compact_json(list(query_params)) if query_params else "None"}"""
+            elided = ("""
+        Values written as <<VALUE_n>> or <<ITEMS_n>> stand for long values left out to save space; copy them into the curl commands unchanged.
+        """ if placeholders else "")
+            return f"""
         You are an API testing expert. I will provide you with a curl command and a structured test plan.
         Your task is to implement the test plan by modifying the curl command for each test case.
         
         Original curl command:
         ```
-        {curl_command}
+        {shown['curl']}
         ```
-        
+        {elided}
         API Details:
         - Method: {method}
         - URL: {url}
-        - Headers: {json.dumps(headers, indent=2)}
-        - Body Parameters: {json.dumps(body, indent=2) if body else "None"}
-        - Query Parameters: {json.dumps(query_params, indent=2) if query_params else "None"}
+        {details}
         
         Test Plan:
-        {json.dumps(test_plan, indent=2)}
+        {plan_text}
         
         For each test case in the test plan:
         1. Keep the description, test_type, and expected_status_code as they are
@@ -260,10 +621,49 @@ class TestGenerator(BaseModel):
         Return the completed test plan as a JSON array with the same structure, but with actual curl commands.
         Do not include any explanatory text, just return the JSON array.
         """
-        return prompt
+        
+        # Cheapest, least lossy reductions first; each one only while still over budget
+        budget = settings.PROMPT_TOKEN_BUDGET
+        steps = ['compact_json']
+        prompt = self._scenario_prompt(render())
+        if estimate_tokens(prompt) > budget:
+            steps.append('group_plan')
+            plan_text = group_plan([
+                ('header', [name for name in headers if planned('header', name)]),
+                ('body parameter', [name for name in body if planned('body parameter', name)] if isinstance(body, dict) else []),
+                ('query parameter', [name for name in query_params if planned('query parameter', name)])
+            ], include_baseline)
+            prompt = self._scenario_prompt(render())
+        if estimate_tokens(prompt) > budget:
+            steps.append('placeholders')
+            shown = {
+                'curl': compact_curl(curl_command, placeholders),
+                'headers': placeholders.elide_json(headers),
+                'body': placeholders.elide_json(body),
+                'query': placeholders.elide_json(query_params)
+            }
+            prompt = self._scenario_prompt(render())
+        if estimate_tokens(prompt) > budget:
+            steps.append('field_names_only')
+            full_details = False
+            prompt = self._scenario_prompt(render())
+        return BudgetedPrompt(prompt, budget, steps, placeholders)
 
-    def _generate_prompt(self, curl_command: str) -> str:
-        """Generate a prompt for the AI to generate test cases"""
+    @tracing.traced('prompt.build')
+    def _generate_prompt(self, curl_command: str) -> BudgetedPrompt:
+        """Generate a prompt for the AI to generate test cases; long values become placeholders when over budget"""
+        budget = settings.PROMPT_TOKEN_BUDGET
+        placeholders = Placeholders(settings.PROMPT_MAX_VALUE_CHARS)
+        prompt = self._scenario_prompt(self._render_basic_prompt(curl_command))
+        if estimate_tokens(prompt) <= budget:
+            return BudgetedPrompt(prompt, budget, [], placeholders)
+        prompt = self._scenario_prompt(self._render_basic_prompt(compact_curl(curl_command, placeholders), elided=bool(placeholders)))
+        return BudgetedPrompt(prompt, budget, ['placeholders'], placeholders)
+
+    def _render_basic_prompt(self, curl_command: str, elided: bool = False) -> str:
+        elided_note = ("""
+        Values written as <<VALUE_n>> or <<ITEMS_n>> stand for long values left out to save space; copy them into the curl commands unchanged.
+        """ if elided else "")
         prompt = f"""
         You are an API testing expert. I will provide you with a curl command, and I want you to generate comprehensive test cases for this API.
         
@@ -271,7 +671,7 @@ class TestGenerator(BaseModel):
         ```
         {curl_command}
         ```
-        
+        {elided_note}
         # Please generate as many relevant test cases as possible to thoroughly test the API. Include:
         Please generate only 5 relevant test cases as possible to thoroughly test the API. Include:
         1. Positive test cases (valid inputs that should succeed)
@@ -318,13 +718,13 @@ class TestGenerator(BaseModel):
         """
         return prompt
 
-    def _generate_ai_test_scenarios(self, curl_command: str) -> str:
-        """Generate test scenarios using Llama model"""
-        try:
-            logger.info("Preparing prompt for AI model")
-            
-            # Create a comprehensive prompt to generate test cases
-            prompt = f"""
+    def _scenario_prompt(self, curl_command: str) -> str:
+        """The full generation prompt around a curl command (or a prompt built from one).
+        
+        The prompt builders apply it, so PROMPT_TOKEN_BUDGET covers the text actually sent.
+        """
+        # Create a comprehensive prompt to generate test cases
+        prompt = f"""
             You are an API testing expert. Given the following curl command, generate comprehensive test cases 
             including positive and negative scenarios. Generate as many relevant test cases as possible to thoroughly test the API.
             For each test case, provide:
@@ -358,35 +758,21 @@ class TestGenerator(BaseModel):
             
             Format your response as JSON with an array of test cases.
             """
-            
+        if settings.LLM_OUTPUT_FORMAT == 'schema':
+            # Tell the model the shape its output is being held to
+            prompt += '\nReturn an object whose "test_cases" key holds that array.\n'
+        return prompt
+    
+    @tracing.traced('llm.generate')
+    def _generate_ai_test_scenarios(self, prompt: str, curl_command: str) -> str:
+        """Generate test scenarios using Llama model, from a prompt built by _generate_prompt or _generate_optimized_prompt.
+        
+        The default test case used when the model fails sends curl_command.
+        """
+        try:
             logger.info("Executing AI model with prompt")
             
-            # First, let's check which models are available
-            check_models_cmd = ["curl", "http://localhost:11434/api/tags"]
-            logger.info("Checking available models")
-            
-            try:
-                models_process = subprocess.Popen(
-                    check_models_cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE
-                )
-                models_stdout, models_stderr = models_process.communicate(timeout=10)
-                
-                if models_process.returncode == 0:
-                    models_data = json.loads(models_stdout.decode('utf-8'))
-                    available_models = [model['name'] for model in models_data.get('models', [])]
-                    logger.info(f"Available models: {available_models}")
-                    
-                    # Choose the first available model
-                    model_to_use = available_models[0] if available_models else "mistral"
-                else:
-                    logger.warning(f"Failed to get available models: {models_stderr.decode('utf-8')}")
-                    model_to_use = "mistral"  # Default to mistral as it's commonly available
-            except Exception as e:
-                logger.error(f"Error checking available models: {str(e)}")
-                model_to_use = "mistral"  # Default to mistral as it's commonly available
-            
+            model_to_use = self._select_model()
             logger.info(f"Using model: {model_to_use}")
             
             # Increased timeout and added retry logic
@@ -394,102 +780,111 @@ class TestGenerator(BaseModel):
             timeout_seconds = 180  # Increased from 60 to 180 seconds
             
             for retry in range(max_retries):
-                try:
-                    logger.info(f"Attempt {retry + 1}/{max_retries} to call Ollama API")
-                    
-                    # Call AI model using Ollama
-                    cmd = [
-                        "curl", "-X", "POST", "http://localhost:11434/api/generate",
-                        "-d", json.dumps({
-                            "model": model_to_use,
-                            "prompt": prompt,
-                            "stream": False,
-                            # Add parameters to control generation
-                            "temperature": 0.7,
-                            "top_p": 0.9,
-                            "max_tokens": 4000  # Request more tokens for comprehensive output
-                        })
-                    ]
-                    
-                    logger.info(f"Executing Ollama API call with model {model_to_use}")
-                    print(f"Calling Ollama API with model {model_to_use} (attempt {retry + 1}/{max_retries})")
+                with tracing.span('llm.attempt', attempt=retry + 1, model=model_to_use):
+                    try:
+                        logger.info(f"Attempt {retry + 1}/{max_retries} to call Ollama API")
+                        if retry:
+                            metrics.LLM_RETRIES.inc()
                     
-                    process = subprocess.Popen(
-                        cmd,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE
-                    )
+                        logger.info(f"Executing Ollama API call with model {model_to_use}")
+                        print(f"Calling Ollama API with model {model_to_use} (attempt {retry + 1}/{max_retries})")
                     
-                    print(f"Waiting for Ollama response (timeout: {timeout_seconds}s)...")
-                    stdout, stderr = process.communicate(timeout=timeout_seconds)
+                        stdout, stderr = self._call_ollama(model_to_use, prompt, timeout_seconds)
                     
-                    if stderr:
-                        logger.warning(f"Stderr from Ollama model: {stderr.decode('utf-8')}")
-                        print(f"Error from Ollama: {stderr.decode('utf-8')}")
+                        if stderr:
+                            logger.warning(f"Stderr from Ollama model: {stderr.decode('utf-8')}")
+                            print(f"Error from Ollama: {stderr.decode('utf-8')}")
                     
-                    if stdout:
-                        print(f"Received response from Ollama (first 100 chars): {stdout.decode('utf-8')[:100]}")
+                        if stdout:
+                            print(f"Received response from Ollama (first 100 chars): {stdout.decode('utf-8')[:100]}")
                         
-                        try:
-                            response_json = json.loads(stdout.decode('utf-8'))
-                            ai_response = response_json.get('response', '')
-                            logger.info(f"Received {len(ai_response)} characters from Ollama model")
+                            try:
+                                response_json = json.loads(stdout.decode('utf-8'))
+                                ai_response = response_json.get('response', '')
+                                logger.info(f"Received {len(ai_response)} characters from Ollama model")
                             
-                            # Check if the response seems valid (contains test cases)
-                            if '[' in ai_response and ']' in ai_response and len(ai_response) > 100:
-                                return ai_response
-                            else:
-                                logger.warning("Response doesn't appear to contain valid test cases, retrying...")
-                                if retry == max_retries - 1:
-                                    # On last retry, return what we have
+                                # Check if the response seems valid (contains test cases)
+                                if '[' in ai_response and ']' in ai_response and len(ai_response) > 100:
                                     return ai_response
-                        except json.JSONDecodeError as e:
-                            logger.error(f"Failed to parse JSON from Ollama response: {e}")
-                            if retry == max_retries - 1:
-                                # On last retry, create a default test case
-                                return json.dumps([{
-                                    "description": "Default test case",
-                                    "test_type": "positive",
-                                    "expected_status_code": 200,
-                                    "curl_command": curl_command
-                                }])
-                    else:
-                        logger.error("No response received from Ollama API")
-                        print("No response received from Ollama API")
+                                else:
+                                    logger.warning("Response doesn't appear to contain valid test cases, retrying...")
+                                    if retry == max_retries - 1:
+                                        # On last retry, return what we have
+                                        return ai_response
+                            except json.JSONDecodeError as e:
+                                logger.error(f"Failed to parse JSON from Ollama response: {e}")
+                                if retry == max_retries - 1:
+                                    # On last retry, create a default test case
+                                    metrics.GENERATION_FALLBACKS.inc(reason='unparseable_response')
+                                    return json.dumps([{
+                                        "description": "Default test case",
+                                        "test_type": "positive",
+                                        "expected_status_code": 200,
+                                        "curl_command": curl_command
+                                    }])
+                        else:
+                            logger.error("No response received from Ollama API")
+                            print("No response received from Ollama API")
                         
-                except subprocess.TimeoutExpired:
-                    logger.warning(f"Ollama API call timed out after {timeout_seconds} seconds on attempt {retry + 1}/{max_retries}")
-                    print(f"Ollama API call timed out after {timeout_seconds} seconds")
+                    except requests.Timeout:
+                        logger.warning(f"Ollama API call timed out after {timeout_seconds} seconds on attempt {retry + 1}/{max_retries}")
+                        print(f"Ollama API call timed out after {timeout_seconds} seconds")
                     
-                    if retry == max_retries - 1:
-                        # On last retry, create a default test case
+                        if retry == max_retries - 1:
+                            # On last retry, create a default test case
+                            metrics.GENERATION_FALLBACKS.inc(reason='timeout')
+                            return json.dumps([{
+                                "description": "Default test case (timeout occurred)",
+                                "test_type": "positive",
+                                "expected_status_code": 200,
+                                "curl_command": curl_command
+                            }])
+                
+                # Wait before retrying
+                if retry < max_retries - 1:
+                    retry_wait = 5  # seconds
+                    time_left = self._time_left()
+                    if time_left is not None and time_left <= retry_wait:
+                        # No retry could finish before the deadline
+                        logger.warning("Generation deadline reached; not retrying")
+                        metrics.GENERATION_FALLBACKS.inc(reason='deadline')
                         return json.dumps([{
-                            "description": "Default test case (timeout occurred)",
+                            "description": "Default test case (deadline reached)",
                             "test_type": "positive",
                             "expected_status_code": 200,
                             "curl_command": curl_command
                         }])
-                
-                # Wait before retrying
-                if retry < max_retries - 1:
-                    retry_wait = 5  # seconds
                     logger.info(f"Waiting {retry_wait} seconds before retry...")
                     print(f"Waiting {retry_wait} seconds before retry...")
-                    import time
-                    time.sleep(retry_wait)
+                    with tracing.span('llm.retry_wait', seconds=retry_wait):
+                        time.sleep(retry_wait)
             
             # If we get here, all retries failed
+            metrics.GENERATION_FALLBACKS.inc(reason='retries_exhausted')
             return json.dumps([{
                 "description": "Default test case (all retries failed)",
                 "test_type": "positive",
                 "expected_status_code": 200,
                 "curl_command": curl_command
             }])
+        
+        except LLMBusyError as e:
+            if not self.busy_fallback:
+                raise
+            logger.warning(f"{str(e)}; using the default test case")
+            metrics.GENERATION_FALLBACKS.inc(reason='backend_busy')
+            return json.dumps([{
+                "description": "Default test case (LLM backend busy)",
+                "test_type": "positive",
+                "expected_status_code": 200,
+                "curl_command": curl_command
+            }])
                 
         except Exception as e:
             logger.error(f"Error calling Ollama model: {str(e)}", exc_info=True)
             print(f"Error calling Ollama model: {str(e)}")
             # Create a default test case as fallback
+            metrics.GENERATION_FALLBACKS.inc(reason='error')
             return json.dumps([{
                 "description": "Default test case (error occurred)",
                 "test_type": "positive",
@@ -497,17 +892,134 @@ class TestGenerator(BaseModel):
                 "curl_command": curl_command
             }])
     
+    @tracing.traced('model.lookup')
+    def _select_model(self) -> str:
+        """Pick the first model the pool's backends have pulled, falling back to mistral"""
+        logger.info("Checking available models")
+        available_models = provider_pool.models()
+        logger.info(f"Available models: {available_models}")
+        # Default to mistral as it's commonly available
+        return available_models[0] if available_models else "mistral"
+    
+    def _ollama_payload(self, model: str, prompt: str) -> Dict[str, Any]:
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": False,
+            # Add parameters to control generation
+            "temperature": 0.7,
+            "top_p": 0.9,
+            "max_tokens": 4000,  # Request more tokens for comprehensive output
+            "keep_alive": settings.OLLAMA_KEEP_ALIVE
+        }
+        output_format = _output_format()
+        if output_format is not None:
+            # Constrained decoding: the answer parses in one json.loads (see parse_structured_test_cases)
+            payload["format"] = output_format
+        return payload
+
+    @tracing.traced('llm.call')
+    def _call_ollama(self, model: str, prompt: str, timeout_seconds: int) -> Tuple[bytes, bytes]:
+        """Run one generate call on the provider pool once the backend gate admits it.
+
+        Returns the Ollama-style JSON answer as bytes, or empty bytes and the error
+        when no backend could answer; raises requests.Timeout when they timed out.
+        With a deadline_at, the gate wait and the call itself both end by the deadline.
+        """
+        payload = self._ollama_payload(model, prompt)
+        
+        metrics.PROMPT_CHARS.observe(len(prompt))
+        metrics.PROMPT_TOKENS.observe(estimate_tokens(prompt))
+        tracing.annotate(model=model, prompt_chars=len(prompt), prompt_tokens=estimate_tokens(prompt), timeout_s=timeout_seconds)
+        transcript_store.note(model=model, prompt=prompt, prompt_tokens=estimate_tokens(prompt))
+        
+        time_left = self._time_left()
+        if time_left is not None and time_left <= 0:
+            raise requests.Timeout('generation deadline passed')
+        
+        # Slot is held per attempt, not across the sleeps between retries
+        with backend_gate.slot(self.priority, queue_timeout=time_left):
+            time_left = self._time_left()
+            if time_left is not None:
+                if time_left <= 0:
+                    raise requests.Timeout('generation deadline passed while queued')
+                timeout_seconds = min(timeout_seconds, time_left)
+            print(f"Waiting for model response (timeout: {timeout_seconds}s)...")
+            started = time.perf_counter()
+            try:
+                answer, backend = provider_pool.call(payload, timeout_seconds)
+            except requests.Timeout:
+                metrics.LLM_TIMEOUTS.inc()
+                metrics.LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, outcome='timeout')
+                tracing.annotate(outcome='timeout')
+                transcript_store.note_attempt(model=model, outcome='timeout', seconds=round(time.perf_counter() - started, 3))
+                raise
+            except BackendUnavailableError as e:
+                metrics.LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, outcome='unavailable')
+                tracing.annotate(outcome='unavailable')
+                transcript_store.note_attempt(model=model, outcome='unavailable', seconds=round(time.perf_counter() - started, 3),
+                                              error=str(e))
+                return b'', str(e).encode('utf-8')
+        
+        stdout = json.dumps(answer).encode('utf-8')
+        metrics.LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, outcome='ok')
+        tracing.annotate(outcome='ok', backend=backend.name, response_bytes=len(stdout))
+        transcript_store.note_attempt(model=model, outcome='ok', backend=backend.name,
+                                      seconds=round(time.perf_counter() - started, 3), response_bytes=len(stdout))
+        self._observe_generation_speed(stdout)
+        return stdout, b''
+    
+    def _observe_generation_speed(self, stdout: bytes):
+        """Record tokens/sec from the eval_count/eval_duration (ns) Ollama reports, and its actual prompt token count"""
+        try:
+            stats = json.loads(stdout)
+            model_warmer.observe(stats)
+            if stats.get('prompt_eval_count'):
+                tracing.annotate(prompt_eval_count=stats['prompt_eval_count'])
+                transcript_store.note(prompt_eval_count=stats['prompt_eval_count'])
+            if stats.get('eval_count') and stats.get('eval_duration'):
+                metrics.LLM_TOKENS_PER_SECOND.observe(stats['eval_count'] / (stats['eval_duration'] / 1e9))
+                tracing.annotate(eval_count=stats['eval_count'])
+        except (ValueError, TypeError, AttributeError):
+            pass
+    
+    @metrics.AI_PARSE_SECONDS.time()
+    @tracing.traced('ai_response.parse')
     def _parse_ai_response(self, ai_response: str, curl_command: str) -> List[Dict[str, Any]]:
-        """Parse the AI response to extract test cases"""
+        """Parse the AI response to extract test cases: one strict parse for structured output, heuristics otherwise"""
+        # Kept with this request's transcript for debugging (see /debug/transcripts)
+        transcript_store.note(raw_response=ai_response)
+        
+        test_cases = parse_structured_test_cases(ai_response)
+        if test_cases is not None:
+            _record_parse_path('structured')
+            return test_cases
+        
+        # Unconstrained or non-conformant output: the heuristic cascade, timed on its own
+        with metrics.AI_PARSE_FALLBACK_SECONDS.time():
+            return self._parse_ai_response_heuristic(ai_response, curl_command)
+    
+    @tracing.traced('ai_response.heuristic_parse')
+    def _parse_ai_response_heuristic(self, ai_response: str, curl_command: str) -> List[Dict[str, Any]]:
+        """Recover test cases from free-form output: JSON cleanup, Ollama wrapper, text markers, curl scraping"""
         try:
             logger.info("Parsing AI response")
             
-            # Save the raw AI response to a file for debugging
-            with open('/tmp/raw_ai_response.txt', 'w') as f:
-                f.write(ai_response)
-            logger.info("Saved raw AI response to /tmp/raw_ai_response.txt")
+            # Valid JSON that failed the strict check: take its cases as they are, unwrapping a schema object
+            try:
+                data = json.loads(ai_response)
+            except (ValueError, TypeError):
+                data = None
+            if isinstance(data, dict) and isinstance(data.get('test_cases'), list):
+                data = data['test_cases']
+            if isinstance(data, list):
+                test_cases = [case for case in data if isinstance(case, dict)]
+                if test_cases:
+                    logger.info(f"Parsed JSON response with {len(test_cases)} test cases")
+                    _record_parse_path('json')
+                    return test_cases
             
-            # First, try to parse as JSON
+            # Then try to parse as a JSON array after cleaning it up
             try:
                 # Check if the response is a JSON array
                 if ai_response.strip().startswith('[') and ai_response.strip().endswith(']'):
@@ -517,6 +1029,7 @@ class TestGenerator(BaseModel):
                     fixed_json = re.sub(r'\\(?!["\\/bfnrt]|u[0-9a-fA-F]{4})', r'\\\\', fixed_json)
                     test_cases = json.loads(fixed_json)
                     logger.info(f"Successfully parsed JSON response with {len(test_cases)} test cases")
+                    _record_parse_path('json')
                     return test_cases
             except json.JSONDecodeError as e:
                 logger.warning(f"Failed to parse response as JSON: {e}")
@@ -531,8 +1044,7 @@ class TestGenerator(BaseModel):
                     logger.info(f"Extracted response from Ollama wrapper: {ai_response[:100]}...")
                     
                     # Save the extracted response for debugging
-                    with open('/tmp/extracted_ai_response.txt', 'w') as f:
-                        f.write(ai_response)
+                    transcript_store.note(extracted_response=ai_response)
                     
                     # Try to parse the extracted response as JSON
                     try:
@@ -546,6 +1058,7 @@ class TestGenerator(BaseModel):
                                 if 'modified_curl_command' in test_case and 'curl_command' not in test_case:
                                     test_case['curl_command'] = test_case.pop('modified_curl_command')
                             
+                            _record_parse_path('ollama_wrapper')
                             return test_cases
                     except json.JSONDecodeError as e:
                         logger.warning(f"Failed to parse extracted response as JSON: {e}")
@@ -633,6 +1146,7 @@ class TestGenerator(BaseModel):
                     
                     # If we found test cases, break out of the marker loop
                     if test_cases:
+                        _record_parse_path('text_markers')
                         break
             
             # If we didn't find any test cases using markers, try to find curl commands directly
@@ -689,17 +1203,21 @@ class TestGenerator(BaseModel):
                         test_case['expected_status_code'] = str(200 if test_case.get('test_type') == 'positive' else 400)
                     
                     test_cases.append(test_case)
+                
+                _record_parse_path('curl_scan' if test_cases else 'none')
             
             logger.info(f"Extracted {len(test_cases)} test cases")
             return test_cases
             
         except Exception as e:
             logger.error(f"Error parsing AI response: {str(e)}", exc_info=True)
+            _record_parse_path('error')
             # Return an empty list
             return []
     
-    def _fix_json(self, json_str: str) -> str:
-        """Fix common JSON formatting issues"""
+    @tracing.traced('ai_response.fix_json')
+    def _fix_json(self, json_str: str, raw_response: Optional[str] = None) -> str:
+        """Fix common JSON formatting issues; raw_response (default: this request's transcript) feeds the last-resort text scan"""
         logger.info(f"Attempting to fix JSON: {json_str[:100]}...")
         
         # First, let's try to normalize the JSON structure
@@ -791,9 +1309,9 @@ class TestGenerator(BaseModel):
         
         # If all else fails, try a completely manual approach
         try:
-            # Read the raw AI response from the file
-            with open('/tmp/raw_ai_response.txt', 'r') as f:
-                raw_response = f.read()
+            # The full raw AI response of this request, not just the fragment being fixed
+            if raw_response is None:
+                raw_response = (transcript_store.current() or {}).get('raw_response', json_str)
             
             # Extract test cases manually
             test_cases = []
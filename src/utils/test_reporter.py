@@ -1,17 +1,26 @@
 import json
+import time
 from datetime import datetime
 from typing import List, Dict
 import os
 import pytest
+from .result_sink import JSONLResultSink, iter_results
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 @pytest.mark.no_collect
 class TestReporter:
-    def __init__(self, output_dir: str = "test_reports"):
-        self.output_dir = f"/Users/girish.shimpi/api_test_gen/{output_dir}"
+    def __init__(self, output_dir: str = "test_reports", compress: bool = False, keep_results: bool = True):
+        self.output_dir = os.path.join(PROJECT_ROOT, output_dir)
         os.makedirs(self.output_dir, exist_ok=True)
+        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Results are streamed to disk as they arrive; keep_results=False avoids holding them in RAM
+        self.sink = JSONLResultSink(f"{self.output_dir}/test_results_{self.timestamp}.jsonl", compress=compress)
+        self.keep_results = keep_results
         self.test_results = []
 
-    def add_result(self, scenario: Dict, response: Dict, success: bool, error: str = None):
+    def add_result(self, scenario: Dict, response: Dict, success: bool, error: str = None,
+                   duration_ms: float = None):
         result = {
             "test_name": scenario.get('description', 'Unnamed Test'),
             "test_type": scenario.get('test_type', 'Unknown'),
@@ -21,34 +30,51 @@ class TestReporter:
             "endpoint": scenario.get('endpoint'),
             "headers": scenario.get('headers'),
             "params": scenario.get('params'),
-            "actual_response": response  # Store complete actual response
+            "actual_response": response,  # Store complete actual response
+            "duration_ms": duration_ms,
+            "timestamp": time.time()
         }
-        self.test_results.append(result)
+        self.sink.write(result)
+        if self.keep_results:
+            self.test_results.append(result)
 
     def generate_report(self):
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.sink.close()
+        counters = self.sink.summary()
         
         summary = {
-            "total_tests": len(self.test_results),
-            "passed": sum(1 for r in self.test_results if r["status"] == "PASS"),
-            "failed": sum(1 for r in self.test_results if r["status"] == "FAIL"),
+            "total_tests": counters['total'],
+            "passed": counters['passed'],
+            "failed": counters['failed'] + counters['errors'],
             "execution_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
 
+        # Timing stats are computed from the results file so they work without keep_results
+        from .latency_stats import summarize_latency
+        latency = summarize_latency(iter_results(counters['results_file']))
+
+        # Individual results live in the JSONL file; the report only embeds them when kept in memory
         report = {
             "summary": summary,
-            "test_results": self.test_results
+            "latency": latency,
+            "results_file": counters['results_file']
         }
+        if self.keep_results:
+            report["test_results"] = self.test_results
 
-        report_path = f"{self.output_dir}/test_report_{timestamp}.json"
+        report_path = f"{self.output_dir}/test_report_{self.timestamp}.json"
         with open(report_path, "w") as f:
-            json.dump(report, f, indent=2)
+            json.dump(report, f, indent=2 if self.keep_results else None)
         
         # Print summary to console
         print("\n=== Test Execution Summary ===")
         print(f"Total Tests: {summary['total_tests']}")
         print(f"Passed: {summary['passed']}")
         print(f"Failed: {summary['failed']}")
+        if latency.get('timed'):
+            overall = latency['overall']
+            print(f"Latency p50/p95/p99: {overall['p50']}/{overall['p95']}/{overall['p99']} ms")
+            print(f"Throughput: {latency['throughput']['requests_per_second']} req/s")
         print(f"Report saved to: {report_path}")
         
-        return report_path
\ No newline at end of file
+        return report_path
@@ -0,0 +1,270 @@
+import contextvars
+import functools
+import json
+import os
+import secrets
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+STATUS_OK, STATUS_ERROR = 1, 2  # OTLP status codes
+
+_current_span = contextvars.ContextVar('gentest_current_span', default=None)
+
+class _Trace:
+    def __init__(self):
+        self.trace_id = secrets.token_hex(16)
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, span: 'Span'):
+        # Spans can finish on pool threads (see wrap)
+        with self._lock:
+            self.spans.append(span)
+
+class Span:
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'attributes', 'start_ns', 'end_ns', 'status', 'message')
+
+    def __init__(self, trace: _Trace, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.status = STATUS_OK
+        self.message = ''
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+class _NoopSpan:
+    def set(self, **attributes):
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+def _plain_value(value: Dict[str, Any]) -> Any:
+    if 'intValue' in value:
+        return int(value['intValue'])
+    return next(iter(value.values()), None)
+
+def to_otlp(trace: _Trace, service_name: str = 'gentest') -> Dict[str, Any]:
+    """One trace as an OTLP/JSON ExportTraceServiceRequest"""
+    spans = [{
+        'traceId': trace.trace_id,
+        'spanId': span.span_id,
+        'parentSpanId': span.parent_id or '',
+        'name': span.name,
+        'kind': 1,  # SPAN_KIND_INTERNAL
+        'startTimeUnixNano': str(span.start_ns),
+        'endTimeUnixNano': str(span.end_ns),
+        'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in span.attributes.items()],
+        'status': {'code': span.status, 'message': span.message}
+    } for span in sorted(trace.spans, key=lambda span: span.start_ns)]
+    return {'resourceSpans': [{
+        'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': service_name}}]},
+        'scopeSpans': [{'scope': {'name': 'gentest'}, 'spans': spans}]
+    }]}
+
+def otlp_spans(document: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten an OTLP/JSON document back into simple span dicts"""
+    spans = []
+    for resource_spans in document.get('resourceSpans', []):
+        for scope_spans in resource_spans.get('scopeSpans', []):
+            for span in scope_spans.get('spans', []):
+                start, end = int(span['startTimeUnixNano']), int(span['endTimeUnixNano'])
+                spans.append({
+                    'span_id': span['spanId'],
+                    'parent_id': span.get('parentSpanId') or None,
+                    'name': span['name'],
+                    'start_ns': start,
+                    'end_ns': end,
+                    'duration_ms': round((end - start) / 1e6, 3),
+                    'attributes': {item['key']: _plain_value(item['value']) for item in span.get('attributes', [])},
+                    'error': span.get('status', {}).get('code') == STATUS_ERROR
+                })
+    return spans
+
+def critical_path(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Spans that decided the trace's duration, depth first.
+
+    Walks each span's children backwards from its end: take the child that
+    finished last, jump to that child's start and repeat. Sequential steps all
+    land on the path; of overlapping children (e.g. parallel test requests)
+    only the one that held the parent up does. self_ms is the span's time not
+    covered by children on the path.
+    """
+    children = {}
+    for span in spans:
+        children.setdefault(span['parent_id'], []).append(span)
+
+    path = []
+    def visit(span: Dict[str, Any], depth: int):
+        chain, cursor = [], span['end_ns']
+        candidates = sorted(children.get(span['span_id'], []), key=lambda child: child['end_ns'], reverse=True)
+        for child in candidates:
+            if child['end_ns'] <= cursor:
+                chain.append(child)
+                cursor = child['start_ns']
+        path.append({
+            'name': span['name'],
+            'depth': depth,
+            'duration_ms': span['duration_ms'],
+            'self_ms': round(span['duration_ms'] - sum(child['duration_ms'] for child in chain), 3),
+            'attributes': span['attributes']
+        })
+        for child in reversed(chain):
+            visit(child, depth + 1)
+
+    for root in children.get(None, []):
+        visit(root, 0)
+    return path
+
+class OTLPFileExporter:
+    """Writes each finished trace to <directory>/<trace_id>.json, keeping the newest max_files"""
+
+    def __init__(self, directory: str, max_files: int = 200):
+        self.directory = directory
+        self.max_files = max_files
+        os.makedirs(directory, exist_ok=True)
+
+    def export(self, trace: _Trace):
+        path = os.path.join(self.directory, f"{trace.trace_id}.json")
+        try:
+            with open(f"{path}.tmp", 'w') as f:
+                json.dump(to_otlp(trace), f)
+            os.replace(f"{path}.tmp", path)
+            self._prune()
+        except OSError as e:
+            logger.warning(f"Could not export trace {trace.trace_id}: {e}")
+
+    def _files(self) -> List[str]:
+        """Trace files, newest first"""
+        dated = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                dated.append((os.path.getmtime(os.path.join(self.directory, name)), name))
+            except OSError:
+                # Pruned by another worker in the meantime
+                continue
+        return [os.path.join(self.directory, name) for _, name in sorted(dated, reverse=True)]
+
+    def _prune(self):
+        for path in self._files()[self.max_files:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def load(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        if not all(c in '0123456789abcdef' for c in trace_id) or len(trace_id) != 32:
+            return None
+        try:
+            with open(os.path.join(self.directory, f"{trace_id}.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Summaries of the newest traces: root span, duration and span count"""
+        summaries = []
+        for path in self._files()[:limit]:
+            try:
+                with open(path) as f:
+                    spans = otlp_spans(json.load(f))
+            except (OSError, ValueError):
+                continue
+            root = next((span for span in spans if span['parent_id'] is None), None)
+            if root is None:
+                continue
+            summaries.append({
+                'trace_id': os.path.basename(path)[:-len('.json')],
+                'name': root['name'],
+                'started_at': root['start_ns'] / 1e9,
+                'duration_ms': root['duration_ms'],
+                'span_count': len(spans),
+                'error': any(span['error'] for span in spans),
+                'attributes': root['attributes']
+            })
+        return summaries
+
+class Tracer:
+    """Nested spans tracked through a context variable; each finished root span exports its whole trace.
+
+    Without an exporter every span is a no-op, so instrumented code costs
+    next to nothing when tracing is off.
+    """
+
+    def __init__(self, exporter: Optional[OTLPFileExporter] = None):
+        self.exporter = exporter
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        if self.exporter is None:
+            yield _NOOP_SPAN
+            return
+        parent = _current_span.get()
+        trace = parent.trace if parent is not None else _Trace()
+        span = Span(trace, name, parent.span_id if parent is not None else None, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status, span.message = STATUS_ERROR, f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+            trace.add(span)
+            if parent is None:
+                self.exporter.export(trace)
+
+tracer = Tracer(OTLPFileExporter(settings.TRACE_DIR, settings.TRACE_MAX_FILES) if settings.TRACE_DIR else None)
+
+def span(name: str, **attributes):
+    """Context manager for a span under the current one (or a new trace's root)"""
+    return tracer.span(name, **attributes)
+
+def traced(name: str):
+    """Decorator running the function inside a span"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def annotate(**attributes):
+    """Set attributes on the current span, if there is one"""
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attributes)
+
+def wrap(func: Callable) -> Callable:
+    """Carry the current span into calls made on other threads (e.g. a pool's map)"""
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # Each call gets its own copy: one Context can't be entered by two threads at once
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper
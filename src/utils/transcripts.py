@@ -0,0 +1,133 @@
+import contextvars
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_transcript = contextvars.ContextVar('gentest_current_transcript', default=None)
+
+SUMMARY_FIELDS = ('transcript_id', 'started_at', 'duration_ms', 'curl_signature', 'model', 'parse_strategy', 'test_cases')
+
+class TranscriptStore:
+    """Bounded in-memory record of recent model exchanges, for debugging generations.
+
+    Each generation opens a session; the prompt, every attempt, the raw and
+    extracted responses, the parse strategy and stage timings are noted on it.
+    Only the newest max_entries are kept and long texts are cut at max_chars.
+    With spill_dir set, finished transcripts are also appended to a daily
+    JSONL file by a background thread; when that falls behind, transcripts
+    are dropped from the spill rather than slowing a request down.
+    """
+
+    def __init__(self, max_entries: int = 100, max_chars: int = 100000, spill_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.spill_dir = spill_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._spill_queue = None
+        self._spill_pid = None
+        self.spill_dropped = 0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    @contextmanager
+    def session(self, **fields):
+        """Collect notes made (through note/note_attempt) while the block runs; yields the transcript id"""
+        transcript_id = uuid.uuid4().hex
+        transcript = {'transcript_id': transcript_id, 'started_at': time.time(), 'attempts': [], 'timings_ms': {}}
+        transcript.update(fields)
+        with self._lock:
+            self._entries[transcript_id] = transcript
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        token = _current_transcript.set(transcript)
+        started = time.perf_counter()
+        try:
+            yield transcript_id
+        except Exception as e:
+            transcript['error'] = str(e)
+            raise
+        finally:
+            _current_transcript.reset(token)
+            transcript['duration_ms'] = round((time.perf_counter() - started) * 1000, 2)
+            if self.spill_dir:
+                self._spill(dict(transcript))
+
+    def _clip(self, value: Any) -> Any:
+        if isinstance(value, str) and len(value) > self.max_chars:
+            return value[:self.max_chars] + f"... [{len(value) - self.max_chars} more chars]"
+        return value
+
+    def note(self, **fields):
+        """Set fields on the current transcript; a no-op outside a session"""
+        transcript = _current_transcript.get()
+        if transcript is not None:
+            transcript.update({name: self._clip(value) for name, value in fields.items()})
+
+    def note_attempt(self, **fields):
+        transcript = _current_transcript.get()
+        if transcript is not None:
+            transcript['attempts'].append(fields)
+
+    def note_timing(self, stage: str, started: float):
+        """Record milliseconds since a perf_counter() reading under timings_ms[stage]"""
+        transcript = _current_transcript.get()
+        if transcript is not None:
+            transcript['timings_ms'][stage] = round((time.perf_counter() - started) * 1000, 2)
+
+    def current(self) -> Optional[Dict[str, Any]]:
+        """The transcript of the session running in this context, if any"""
+        return _current_transcript.get()
+
+    def get(self, transcript_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            transcript = self._entries.get(transcript_id)
+            return dict(transcript) if transcript is not None else None
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Summaries of the newest transcripts, newest first"""
+        with self._lock:
+            newest = list(self._entries.values())[-limit:]
+        return [{name: transcript.get(name) for name in SUMMARY_FIELDS} for transcript in reversed(newest)]
+
+    def _spill(self, transcript: Dict[str, Any]):
+        with self._lock:
+            # The writer thread is started lazily so that a server worker forked after import gets its own
+            if self._spill_pid != os.getpid():
+                self._spill_pid = os.getpid()
+                self._spill_queue = queue.Queue(maxsize=1000)
+                threading.Thread(target=self._spill_forever, args=(self._spill_queue,),
+                                 name='transcript-spill', daemon=True).start()
+            spill_queue = self._spill_queue
+        try:
+            spill_queue.put_nowait(transcript)
+        except queue.Full:
+            self.spill_dropped += 1
+
+    def _spill_forever(self, spill_queue: queue.Queue):
+        while True:
+            transcript = spill_queue.get()
+            path = os.path.join(self.spill_dir, f"transcripts-{time.strftime('%Y%m%d')}.jsonl")
+            try:
+                with open(path, 'a') as f:
+                    f.write(json.dumps(transcript, default=str) + '\n')
+            except OSError as e:
+                logger.warning(f"Could not spill transcript {transcript['transcript_id']}: {e}")
+            finally:
+                spill_queue.task_done()
+
+# One store per process; under gunicorn each worker holds the transcripts of the requests it served
+transcript_store = TranscriptStore(
+    max_entries=settings.TRANSCRIPT_MAX_ENTRIES,
+    spill_dir=settings.TRANSCRIPT_SPILL_DIR
+)
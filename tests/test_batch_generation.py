@@ -0,0 +1,145 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.utils import test_generator
+from src.utils.llm_gate import LLMGate
+from src.utils.ai_providers.base import AIProvider
+from src.utils.ai_providers.pool import ProviderPool, BackendUnavailableError
+
+class Echo(AIProvider):
+    def generate_completion(self, prompt):
+        return f"echo: {prompt}"
+
+class Chunked(Echo):
+    def iter_completion(self, prompt, **options):
+        yield from ['one ', 'two ', 'three']
+
+@pytest.fixture
+def server():
+    """A local server answering Ollama's streaming /api/generate and LocalAI's /v1/completions"""
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            requests_seen.append(payload)
+            if self.path == '/v1/completions':
+                prompts = payload['prompt'] if isinstance(payload['prompt'], list) else [payload['prompt']]
+                # Out of order on purpose: choices carry their prompt's index
+                data = json.dumps({'choices': [{'index': index, 'text': f"answer to {prompt}"}
+                                               for index, prompt in reversed(list(enumerate(prompts)))]}).encode()
+            else:
+                data = b''.join(json.dumps({'response': word, 'done': False}).encode() + b'\n'
+                                for word in ['a', 'b', 'c']) + json.dumps({'response': '', 'done': True}).encode()
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}", requests_seen
+    httpd.shutdown()
+    httpd.server_close()
+
+def test_base_provider_defaults():
+    provider = Echo()
+    assert not provider.supports_batching
+    assert provider.generate_batch(['a', 'b']) == ['echo: a', 'echo: b']
+    assert asyncio.run(provider.generate('a')) == 'echo: a'
+
+def test_stream_yields_chunks_as_they_come():
+    async def collect():
+        return [chunk async for chunk in Chunked().stream('a')]
+
+    assert asyncio.run(collect()) == ['one ', 'two ', 'three']
+    assert asyncio.run(Chunked().generate('a')) == 'one two three'
+
+def test_localai_batch_is_one_request(server):
+    url, requests_seen = server
+    pool = ProviderPool.from_specs([f"localai={url}"])
+    assert pool.supports_batching
+    assert pool.generate_batch(['x', 'y', 'z']) == ['answer to x', 'answer to y', 'answer to z']
+    assert len(requests_seen) == 1 and requests_seen[0]['prompt'] == ['x', 'y', 'z']
+
+def test_ollama_streams_ndjson(server):
+    url, requests_seen = server
+    pool = ProviderPool.from_specs([url])
+    assert list(pool.iter_completion('hi', model='llama3')) == ['a', 'b', 'c']
+    assert requests_seen[0]['stream'] is True
+
+def test_generator_batches_endpoints(monkeypatch):
+    class Pool:
+        supports_batching = True
+        batches = []
+
+        def generate_batch(self, prompts, **options):
+            self.batches.append(prompts)
+            return [json.dumps({'test_cases': [{'description': f"case {index}", 'test_type': 'positive',
+                                                'expected_status_code': 200,
+                                                'curl_command': f"curl http://api.test/{index}"}]})
+                    for index in range(len(prompts))]
+
+    monkeypatch.setattr(test_generator, 'provider_pool', Pool())
+    monkeypatch.setattr(test_generator.TestGenerator, '_select_model', lambda self: 'llama3')
+    generator = test_generator.TestGenerator()
+    suites = generator.generate_test_cases_batch(['curl http://api.test/a', 'curl http://api.test/b'])
+    assert len(Pool.batches) == 1 and len(Pool.batches[0]) == 2
+    assert [[case['description'] for case in suite] for suite in suites] == [['case 0'], ['case 1']]
+
+def test_batch_holds_a_gate_slot_per_request_in_flight(monkeypatch):
+    gate = LLMGate(max_concurrent=2)
+    lock = threading.Lock()
+    in_flight, peak, active = [0], [0], []
+
+    def call(self, payload, timeout):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+            active.append(gate.stats()['active'])
+        threading.Event().wait(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return {'response': f"answer to {payload['prompt']}"}
+
+    pool = ProviderPool.from_specs(['http://ollama.test'])
+    backend = pool.backends[0].provider
+    monkeypatch.setattr(type(backend), 'call', call)
+    monkeypatch.setattr(test_generator, 'backend_gate', gate)
+    monkeypatch.setattr(test_generator, 'provider_pool', pool)
+    monkeypatch.setattr(test_generator.TestGenerator, '_select_model', lambda self: 'llama3')
+    # Ollama would fan out to 4 requests; the gate allows 2, and the batch holds both slots while they run
+    assert backend.parallel == 4
+    answers = test_generator.TestGenerator()._generate_batch(['a', 'b', 'c', 'd'])
+    assert answers == ['answer to a', 'answer to b', 'answer to c', 'answer to d']
+    assert peak[0] == 2 and set(active) == {2} and gate.stats()['active'] == 0
+
+def test_generator_falls_back_per_endpoint(monkeypatch):
+    class Pool:
+        supports_batching = True
+
+        def generate_batch(self, prompts, **options):
+            raise BackendUnavailableError('No model backend answered')
+
+    single = []
+    monkeypatch.setattr(test_generator, 'provider_pool', Pool())
+    monkeypatch.setattr(test_generator.TestGenerator, '_select_model', lambda self: 'llama3')
+    monkeypatch.setattr(test_generator.TestGenerator, 'generate_test_cases',
+                        lambda self, curl: single.append(curl) or [{'description': curl}])
+    generator = test_generator.TestGenerator()
+    suites = generator.generate_test_cases_batch(['curl http://api.test/a', 'curl http://api.test/b'])
+    assert single == ['curl http://api.test/a', 'curl http://api.test/b']
+    assert suites == [[{'description': 'curl http://api.test/a'}], [{'description': 'curl http://api.test/b'}]]
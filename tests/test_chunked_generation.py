@@ -0,0 +1,80 @@
+import json
+import os
+import re
+import sys
+import threading
+
+import pytest
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.utils import test_generator
+
+HEADERS = [f'X-Field-{i:02d}' for i in range(30)]
+CURL = "curl -X GET 'https://api.example.com/items' " + ' '.join(f"-H '{name}: value'" for name in HEADERS)
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    """Answers each chunk prompt with one test per planned description; a chunk planning X-Field-13 always fails"""
+    calls = []
+    lock = threading.Lock()
+
+    def call_ollama(self, model, prompt, timeout_seconds):
+        descriptions = re.findall(r'"description":"([^"]+)"', prompt)
+        with lock:
+            calls.append(descriptions)
+        if any('X-Field-13' in description for description in descriptions):
+            return b'{"response": "not json at all"}', b''
+        cases = [{
+            'description': description,
+            'test_type': 'positive' if description.startswith('Baseline') else 'negative',
+            'expected_status_code': 200 if description.startswith('Baseline') else 400,
+            'curl_command': f"curl 'https://api.example.com/items' -H 'Case: {description}'"
+        } for description in descriptions]
+        return json.dumps({'response': json.dumps(cases)}).encode(), b''
+
+    monkeypatch.setattr(test_generator.TestGenerator, '_call_ollama', call_ollama)
+    monkeypatch.setattr(test_generator.TestGenerator, '_select_model', lambda self: 'fake-model')
+    monkeypatch.setattr(test_generator.time, 'sleep', lambda seconds: None)
+    monkeypatch.setattr(test_generator.settings, 'GENERATION_CHUNK_FIELDS', 12)
+    monkeypatch.setattr(test_generator.settings, 'GENERATION_CHUNK_RETRIES', 1)
+    return calls
+
+def test_large_plan_is_chunked_and_a_failed_chunk_is_left_out(fake_model):
+    generator = test_generator.TestGenerator()
+    test_cases = generator.generate_test_cases(CURL, parsed_curl=generator.parse_curl_command(CURL))
+
+    # 30 fields -> chunks of 12, 12 and 6 fields; the middle one fails both attempts
+    assert len(fake_model) == 4
+    descriptions = [case['description'] for case in test_cases]
+    assert descriptions[0] == 'Baseline positive test with all valid parameters'
+    assert len(descriptions) == 1 + 2 * 18
+    assert not any(f'X-Field-{i:02d}' in description for description in descriptions for i in range(12, 24))
+    # Merged in plan order
+    assert descriptions.index('Missing required header: X-Field-00') < descriptions.index('Missing required header: X-Field-29')
+
+def test_small_plan_keeps_single_prompt(fake_model, monkeypatch):
+    generator = test_generator.TestGenerator()
+    single_calls = []
+    monkeypatch.setattr(test_generator.TestGenerator, '_generate_ai_test_scenarios', lambda self, prompt, curl_command: single_calls.append(prompt) or '[]')
+    generator.generate_test_cases("curl 'https://api.example.com/items' -H 'Accept: application/json'")
+    assert len(single_calls) == 1 and fake_model == []
+
+def test_basic_prompt_path_is_never_chunked(fake_model, monkeypatch):
+    single_calls = []
+    monkeypatch.setattr(test_generator.TestGenerator, '_generate_ai_test_scenarios', lambda self, prompt, curl_command: single_calls.append(prompt) or '[]')
+    # Without parsed_curl there is no plan to split, however many fields the request has
+    test_generator.TestGenerator().generate_test_cases(CURL)
+    assert len(single_calls) == 1 and fake_model == []
+
+def test_chunk_prompts_carry_the_generation_instructions(fake_model, monkeypatch):
+    monkeypatch.setattr(test_generator.settings, 'LLM_OUTPUT_FORMAT', 'schema')
+    prompts = []
+    monkeypatch.setattr(test_generator.TestGenerator, '_generate_chunk',
+                        lambda self, model, prompt, curl_command: prompts.append(prompt.text) or [])
+    generator = test_generator.TestGenerator()
+    generator.generate_test_cases(CURL, parsed_curl=generator.parse_curl_command(CURL))
+    assert len(prompts) == 3
+    assert all('You are an API testing expert' in text and '"test_cases" key' in text for text in prompts)
@@ -0,0 +1,31 @@
+import os
+import sys
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.utils.test_dedup import request_signature, deduplicate_test_cases
+
+BASELINE = "curl --location 'https://api.example.com/v1/users?b=2&a=1' --header 'x-id: 42' --header 'Content-Type: application/json' --data '{\"name\": \"a\", \"age\": 1}'"
+
+def test_signature_ignores_formatting():
+    reordered = 'curl -X POST "https://API.example.com/v1/users?a=1&b=2" -H "content-type:  application/json" -H "X-Id: 42" -d \'{"age":1,"name":"a"}\''
+    assert request_signature(reordered) == request_signature(BASELINE)
+
+    changed = BASELINE.replace("x-id: 42", "x-id: invalid")
+    assert request_signature(changed) != request_signature(BASELINE)
+
+def test_duplicates_and_baseline_copies_are_removed():
+    test_cases = [
+        {'description': 'Baseline', 'test_type': 'positive', 'curl_command': BASELINE},
+        {'description': 'Invalid x-id', 'test_type': 'negative', 'curl_command': BASELINE.replace('42', 'abc')},
+        {'description': 'Bad x-id', 'test_type': 'negative', 'curl_command': BASELINE.replace("'x-id: 42'", "'x-id:   abc'")},
+        {'description': 'Missing nothing', 'test_type': 'negative', 'curl_command': BASELINE + ' '},
+    ]
+    unique, stats = deduplicate_test_cases(test_cases, BASELINE)
+
+    assert [t['description'] for t in unique] == ['Baseline', 'Invalid x-id']
+    assert unique[1]['merged_descriptions'] == ['Bad x-id']
+    assert 'merged_descriptions' not in unique[0]
+    assert stats == {'generated': 4, 'kept': 2, 'duplicates_removed': 1, 'baseline_copies_removed': 1}
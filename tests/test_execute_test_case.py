@@ -0,0 +1,18 @@
+import os
+import sys
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.utils import test_executor
+
+def test_non_numeric_expected_status_is_an_error_result(monkeypatch):
+    requests_sent = []
+    monkeypatch.setattr('src.utils.test_executor.requests.request', lambda **kwargs: requests_sent.append(kwargs))
+    result = test_executor.TestExecutor().execute_test_case({
+        'description': 'Model wrote a status class', 'test_type': 'positive',
+        'expected_status_code': '2xx', 'curl_command': "curl 'https://api.example.com/items'"
+    })
+    assert result['status'] == 'ERROR' and result['expected_status_code'] == '2xx'
+    assert "'2xx'" in result['error'] and requests_sent == []
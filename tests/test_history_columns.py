@@ -0,0 +1,37 @@
+import os
+import sys
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import numpy as np
+from src.utils.history_columns import RunHistoryColumns
+
+ROWS = [
+    ('run-1', 100.0, '/api/users', 'PASS', 201, 10.0),
+    ('run-1', 101.0, '/api/users', 'FAIL', 500, 30.0),
+    ('run-1', 102.0, '/api/orders', 'PASS', 200, 5.0),
+    ('run-2', 200.0, '/api/users', 'PASS', 201, 20.0),
+    ('run-2', 201.0, '/api/users', 'ERROR', None, None),
+]
+
+def test_rollups_match_reference_values(tmp_path):
+    columns = RunHistoryColumns.from_rows(ROWS)
+
+    per_run = columns.pass_rate_per_run()
+    assert per_run['run_id'].tolist() == ['run-1', 'run-2']
+    assert np.allclose(per_run['pass_rate'], [200 / 3, 50.0])
+
+    latency = columns.latency_percentiles((50, 95))
+    users = np.array([10.0, 30.0, 20.0])
+    assert latency['/api/users']['p50'] == round(np.percentile(users, 50), 2)
+    assert latency['/api/users']['p95'] == round(np.percentile(users, 95), 2)
+    assert latency['/api/users']['max'] == 30.0 and latency['/api/users']['count'] == 3
+
+    assert columns.failure_counts_by_status() == {'FAIL': {500: 1}, 'ERROR': {0: 1}}
+
+    # Memory-mapped columns give the same rollups
+    columns.save(str(tmp_path / 'history'))
+    loaded = RunHistoryColumns.load(str(tmp_path / 'history'))
+    assert np.allclose(loaded.pass_rate_per_run()['pass_rate'], per_run['pass_rate'])
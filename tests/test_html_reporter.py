@@ -0,0 +1,30 @@
+import os
+import sys
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.utils.html_reporter import HTMLReporter
+
+def test_report_is_streamed_from_template_and_escaped(tmp_path):
+    reporter = HTMLReporter(output_dir=str(tmp_path))
+    results = [
+        {'test_name': '<script>alert(1)</script>', 'test_type': 'negative', 'status': 'FAIL',
+         'method': 'GET', 'endpoint': '/api/users', 'headers': {'x-id': '42'}, 'params': None,
+         'actual_response': {'error': 'bad'}, 'error_message': 'Expected 400'},
+        {'test_name': 'Valid request', 'test_type': 'positive', 'status': 'PASS',
+         'method': 'GET', 'endpoint': '/api/users', 'headers': {}, 'params': {}, 'actual_response': []},
+    ]
+
+    summary = {'total': 2, 'passed': 1, 'failed': 1}
+    report_path = reporter.generate_html_report(iter(results), summary=summary)
+
+    with open(report_path) as f:
+        html = f.read()
+    assert report_path.startswith(str(tmp_path))
+    assert '&lt;script&gt;alert(1)&lt;/script&gt;' in html
+    assert '<script>alert(1)</script>' not in html
+    assert 'Total Tests: 2' in html and 'x-id: 42' in html and 'Error: Expected 400' in html
+    # The caller's summary is left as it was
+    assert summary == {'total': 2, 'passed': 1, 'failed': 1}
@@ -0,0 +1,118 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+import requests
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import app as gentest_app
+from src.utils import test_generator
+
+CURL = ("curl -X POST 'https://api.example.com/pay?mode=fast' -H 'X-Key: abc' "
+        "-d '{\"amount\": 10, \"currency\": \"USD\"}'")
+
+def model_suite(delay=0.0, calls=None):
+    """Stands in for generate_suite: one case the plan already has and one it doesn't"""
+    def generate_suite(curl_command, priority=None, deadline_at=None):
+        if calls is not None:
+            calls.append((priority, deadline_at))
+        time.sleep(delay)
+        cases = [
+            {'description': 'Model: no key', 'test_type': 'negative', 'expected_status_code': 400,
+             'curl_command': "curl -X POST -d '{\"amount\": 10, \"currency\": \"USD\"}' 'https://api.example.com/pay?mode=fast'"},
+            {'description': 'SQL injection in currency', 'test_type': 'negative', 'expected_status_code': 400,
+             'curl_command': "curl -X POST -H 'X-Key: abc' -d '{\"amount\": 10, \"currency\": \"1 OR 1=1\"}' 'https://api.example.com/pay?mode=fast'"}
+        ]
+        return cases, {}, False, 'transcript-1'
+    return generate_suite
+
+def finished_job(job_id):
+    job = gentest_app.job_queue.wait(job_id, timeout=10)
+    while job.state not in ('succeeded', 'failed'):
+        job = gentest_app.job_queue.wait(job_id, job.version, timeout=10)
+    return job
+
+def test_deterministic_cases_cover_every_field():
+    descriptions = [case['description'] for case in test_generator.TestGenerator().deterministic_test_cases(CURL)]
+    assert descriptions[0].startswith('Baseline')
+    for field in ('header: X-Key', 'body parameter: amount', 'body parameter: currency', 'query parameter: mode'):
+        assert f"Missing required {field}" in descriptions
+        assert f"Invalid value for {field}" in descriptions
+    assert len(descriptions) == 9
+
+def test_deadline_request_returns_plan_at_once_and_appends_new_model_cases(monkeypatch):
+    monkeypatch.setattr(gentest_app, 'generate_suite', model_suite())
+    client = gentest_app.app.test_client()
+    body = client.post('/generate-tests', json={'curl_command': CURL, 'deadline_seconds': 30}).get_json()
+    assert body['status'] == 'success' and len(body['test_cases']) == 9
+
+    result = finished_job(body['enrichment']['job_id']).result
+    assert result['outcome'] == 'appended'
+    # The model's "no key" case sends the same request as the plan's missing-header case
+    assert [case['description'] for case in result['added_cases']] == ['SQL injection in currency']
+    assert result['test_count'] == 10
+
+def test_enrichment_runs_at_batch_priority_bounded_by_the_deadline(monkeypatch):
+    calls = []
+    monkeypatch.setattr(gentest_app, 'generate_suite', model_suite(calls=calls))
+    client = gentest_app.app.test_client()
+    body = client.post('/generate-tests', json={'curl_command': CURL, 'deadline_seconds': 30}).get_json()
+    finished_job(body['enrichment']['job_id'])
+    assert calls == [('batch', body['deadline_at'])]
+
+def test_generator_stops_model_calls_at_the_deadline(monkeypatch):
+    queue_timeouts, timeouts = [], []
+
+    class Gate:
+        @contextmanager
+        def slot(self, priority, queue_timeout=None):
+            queue_timeouts.append(queue_timeout)
+            yield
+
+    class Pool:
+        def call(self, payload, timeout):
+            timeouts.append(timeout)
+            raise requests.Timeout()
+
+    monkeypatch.setattr(test_generator, 'backend_gate', Gate())
+    monkeypatch.setattr(test_generator, 'provider_pool', Pool())
+    monkeypatch.setattr(test_generator.TestGenerator, '_select_model', lambda self: 'm')
+    monkeypatch.setattr(test_generator.time, 'sleep', lambda seconds: None)
+
+    # 3s left: one attempt, its gate wait and call capped at what is left, and no retry that could not finish
+    generator = test_generator.TestGenerator(deadline_at=time.time() + 3)
+    answer = generator._generate_ai_test_scenarios('prompt', CURL)
+    assert len(timeouts) == 1 and 0 < timeouts[0] <= 3 and 0 < queue_timeouts[0] <= 3
+    assert 'deadline' in answer
+
+    # Already past the deadline: no model call at all
+    generator = test_generator.TestGenerator(deadline_at=time.time() - 1)
+    assert 'deadline' in generator._generate_ai_test_scenarios('prompt', CURL)
+    assert len(timeouts) == 1
+
+def test_model_cases_after_the_deadline_are_dropped(monkeypatch):
+    monkeypatch.setattr(gentest_app, 'generate_suite', model_suite(delay=0.3))
+    client = gentest_app.app.test_client()
+    body = client.post('/generate-tests', json={'curl_command': CURL, 'deadline_seconds': 0.1}).get_json()
+    assert len(body['test_cases']) == 9
+
+    result = finished_job(body['enrichment']['job_id']).result
+    assert result['outcome'] in ('dropped', 'expired')
+    assert result['added_cases'] == []
+
+def test_invalid_deadline_is_rejected_and_a_long_one_clamped(monkeypatch):
+    client = gentest_app.app.test_client()
+    for deadline_seconds in ('soon', -5, 0, 'nan', True, [30]):
+        response = client.post('/generate-tests', json={'curl_command': CURL, 'deadline_seconds': deadline_seconds})
+        assert response.status_code == 400 and 'deadline_seconds' in response.get_json()['error']
+
+    deadlines = []
+    monkeypatch.setattr(gentest_app, 'hybrid_generation',
+                        lambda curl_command, deadline_seconds: deadlines.append(deadline_seconds) or {'status': 'success'})
+    monkeypatch.setattr(gentest_app.settings, 'GENERATION_MAX_DEADLINE_SECONDS', 120)
+    client.post('/generate-tests', json={'curl_command': CURL, 'deadline_seconds': 1e9})
+    assert deadlines == [120]
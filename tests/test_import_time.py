@@ -0,0 +1,20 @@
+import os
+import sys
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.utils.import_budget import measure_imports, format_summary
+
+# Cold-start budget for the CLI entry point; override on slow machines
+CLI_IMPORT_BUDGET_MS = float(os.environ.get('CLI_IMPORT_BUDGET_MS', '150'))
+
+def test_cli_cold_start_within_budget():
+    summary = measure_imports('import src.cli', cwd=project_root)
+    assert not summary['heavy_modules'], format_summary('import src.cli', summary)
+    assert summary['total_ms'] < CLI_IMPORT_BUDGET_MS, format_summary('import src.cli', summary)
+
+def test_generator_does_not_load_heavy_dependencies():
+    summary = measure_imports('import src.utils.test_generator, src.utils.html_reporter', cwd=project_root)
+    assert not summary['heavy_modules'], format_summary('generator imports', summary)
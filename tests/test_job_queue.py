@@ -0,0 +1,54 @@
+import os
+import sys
+import threading
+import time
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import pytest
+from src.utils.job_queue import JobQueue, QueueFullError
+
+def test_submit_returns_immediately_and_events_follow_the_job():
+    queue = JobQueue(max_workers=1)
+    release = threading.Event()
+    job = queue.submit('generate', lambda value: release.wait(5) and value * 2, value=21)
+    assert queue.get(job.id).state in ('queued', 'running')
+
+    release.set()
+    states = [event['state'] for event in queue.events(job.id, heartbeat=1) if event]
+    assert states[-1] == 'succeeded'
+    assert queue.get(job.id).to_dict()['result'] == 42
+    queue.shutdown()
+
+def test_failures_are_reported_and_pending_queue_is_bounded():
+    queue = JobQueue(max_workers=1, max_pending=1)
+    release = threading.Event()
+    running = queue.submit('run', lambda: release.wait(5))
+    while queue.get(running.id).state != 'running':
+        time.sleep(0.01)
+    queued = queue.submit('run', lambda: 1 / 0)
+    with pytest.raises(QueueFullError):
+        queue.submit('run', lambda: None)
+
+    release.set()
+    failed = queue.wait(queued.id, timeout=5)
+    assert failed.state == 'failed' and 'division by zero' in failed.error
+    queue.shutdown()
+
+def test_finished_jobs_are_pruned_by_retention():
+    queue = JobQueue(max_workers=1, retention_seconds=0.05, max_finished=10)
+    job = queue.submit('run', lambda: 'done')
+    assert queue.wait(job.id, timeout=5).state == 'succeeded'
+    time.sleep(0.1)
+    assert queue.get(job.id) is None
+    queue.shutdown()
+
+def test_run_job_counts_passed_results(monkeypatch):
+    import app as gentest_app
+    results = [{'test_name': 'Valid', 'status': 'PASS'}, {'test_name': 'No key', 'status': 'PASS'},
+               {'test_name': 'Bad body', 'status': 'FAIL'}]
+    monkeypatch.setattr(gentest_app.TestExecutor, 'run_all_tests', lambda self, curl_command: results)
+    summary = gentest_app.run_job('curl http://api.test')
+    assert summary['test_count'] == 3 and summary['passed'] == 2
@@ -0,0 +1,43 @@
+import os
+import sys
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import numpy as np
+from src.utils.latency_stats import summarize_latency
+from src.utils.html_reporter import HTMLReporter
+
+def _results(count=1000):
+    rng = np.random.default_rng(7)
+    durations = rng.exponential(50, count)
+    return [{
+        'test': {'endpoint': f'/api/{i % 3}', 'test_type': 'negative' if i % 2 else 'positive', 'description': f'Test {i}'},
+        'status': 'PASS',
+        'duration_ms': float(durations[i]),
+        'timestamp': 1000.0 + i * 0.01
+    } for i in range(count)] + [{'test_name': 'Untimed', 'status': 'ERROR'}]
+
+def test_percentiles_match_numpy_and_slowest_are_sorted():
+    results = _results()
+    latency = summarize_latency(results, slowest=5)
+    durations = np.array([r['duration_ms'] for r in results[:-1]])
+
+    assert latency['total'] == 1001 and latency['timed'] == 1000
+    assert latency['overall']['p95'] == round(float(np.percentile(durations, 95)), 2)
+    endpoint = durations[1::3]
+    assert latency['by_endpoint']['/api/1']['p50'] == round(float(np.percentile(endpoint, 50)), 2)
+    assert set(latency['by_test_type']) == {'positive', 'negative'}
+    assert [s['duration_ms'] for s in latency['slowest']] == sorted(np.round(durations, 2), reverse=True)[:5]
+    assert sum(latency['throughput']['timeline']) == 1000
+    assert latency['throughput']['requests_per_second'] > 0
+
+def test_html_report_includes_latency_section(tmp_path):
+    report_path = HTMLReporter(output_dir=str(tmp_path)).generate_html_report([
+        {'test_name': 'Slow one', 'test_type': 'positive', 'status': 'PASS', 'endpoint': '/api/users', 'duration_ms': 812.5},
+        {'test_name': 'Fast one', 'test_type': 'negative', 'status': 'FAIL', 'endpoint': '/api/users', 'duration_ms': 12.0},
+    ])
+    with open(report_path) as f:
+        html = f.read()
+    assert 'Latency and Throughput' in html and '812.5' in html
@@ -0,0 +1,98 @@
+import os
+import sys
+import threading
+import time
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import pytest
+from src.utils.llm_gate import LLMGate, LLMBusyError, INTERACTIVE, BATCH
+
+def _hold(gate, release, priority=INTERACTIVE, order=None, name=None):
+    with gate.slot(priority):
+        if order is not None:
+            order.append(name)
+        release.wait(5)
+
+def _wait_for_queue(gate, depth):
+    while gate.stats()['queue_depth'] < depth:
+        time.sleep(0.01)
+
+def test_interactive_callers_are_admitted_before_batch():
+    gate = LLMGate(max_concurrent=1, max_queue=4)
+    release = threading.Event()
+    order = []
+    holder = threading.Thread(target=_hold, args=(gate, release))
+    holder.start()
+    while gate.stats()['active'] < 1:
+        time.sleep(0.01)
+
+    # Waiters leave as soon as they are admitted
+    admitted = threading.Event()
+    admitted.set()
+    waiters = []
+    for priority, name in ((BATCH, 'batch-1'), (BATCH, 'batch-2'), (INTERACTIVE, 'interactive')):
+        thread = threading.Thread(target=_hold, args=(gate, admitted, priority, order, name))
+        waiters.append(thread)
+        thread.start()
+        _wait_for_queue(gate, len(waiters))
+
+    release.set()
+    for thread in [holder] + waiters:
+        thread.join(5)
+    assert order == ['interactive', 'batch-1', 'batch-2']
+    assert gate.stats()['admitted'] == 4
+
+def test_full_queue_and_queue_deadline_fail_fast():
+    gate = LLMGate(max_concurrent=1, max_queue=1, queue_timeouts={INTERACTIVE: 0.1, BATCH: 5})
+    release = threading.Event()
+    holder = threading.Thread(target=_hold, args=(gate, release))
+    holder.start()
+    while gate.stats()['active'] < 1:
+        time.sleep(0.01)
+
+    started = time.monotonic()
+    with pytest.raises(LLMBusyError, match='deadline'):
+        with gate.slot(INTERACTIVE):
+            pass
+    assert time.monotonic() - started < 1
+
+    admitted = threading.Event()
+    admitted.set()
+    queued = threading.Thread(target=_hold, args=(gate, admitted, BATCH))
+    queued.start()
+    _wait_for_queue(gate, 1)
+    with pytest.raises(LLMBusyError, match='queue full'):
+        with gate.slot(INTERACTIVE):
+            pass
+
+    release.set()
+    holder.join(5)
+    queued.join(5)
+    stats = gate.stats()
+    assert stats['rejected_deadline'] == 1 and stats['rejected_queue_full'] == 1
+    assert stats['queue_depth'] == 0 and stats['active'] == 0
+
+def test_multi_slot_callers_take_their_slots_all_at_once():
+    gate = LLMGate(max_concurrent=3, max_queue=4)
+    release = threading.Event()
+    holder = threading.Thread(target=_hold, args=(gate, release))
+    holder.start()
+    while gate.stats()['active'] < 1:
+        time.sleep(0.01)
+
+    # Two slots are free, so a caller asking for three waits rather than holding part of them
+    with pytest.raises(LLMBusyError):
+        with gate.slot(BATCH, queue_timeout=0.05, count=3):
+            pass
+    assert gate.stats()['active'] == 1
+    with gate.slot(BATCH, count=2):
+        assert gate.stats()['active'] == 3
+    # More than the gate has is capped at all of them
+    release.set()
+    holder.join()
+    with gate.slot(BATCH, count=10):
+        assert gate.stats()['active'] == 3
+    assert gate.stats()['active'] == 0
@@ -0,0 +1,97 @@
+import json
+import os
+import subprocess
+import sys
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.utils.metrics import Registry, Counter, Histogram
+
+def test_prometheus_text_format():
+    registry = Registry()
+    retries = registry.register(Counter('demo_retries_total', 'Retries', ('reason',)))
+    latency = registry.register(Histogram('demo_latency_seconds', 'Latency', buckets=(0.1, 1)))
+    registry.add_collector(lambda: [('demo_queue_depth', 'gauge', 'Depth', [({}, 3)])])
+
+    retries.inc(reason='timeout "slow"')
+    retries.inc(2, reason='timeout "slow"')
+    for value in (0.05, 0.5, 5):
+        latency.observe(value)
+    with latency.time():
+        pass
+
+    text = registry.render()
+    assert '# TYPE demo_latency_seconds histogram' in text
+    assert 'demo_retries_total{reason="timeout \\"slow\\""} 3' in text
+    assert 'demo_latency_seconds_bucket{le="0.1"} 2' in text
+    assert 'demo_latency_seconds_bucket{le="1"} 3' in text
+    assert 'demo_latency_seconds_bucket{le="+Inf"} 4' in text
+    assert 'demo_latency_seconds_count 4' in text
+    assert 'demo_queue_depth 3' in text
+
+def test_shared_directory_sums_every_process(tmp_path):
+    registry = Registry()
+    requests_total = registry.register(Counter('demo_requests_total', 'Requests', ('status',)))
+    latency = registry.register(Histogram('demo_latency_seconds', 'Latency', buckets=(0.1, 1)))
+    registry.share(str(tmp_path), interval=3600)
+    requests_total.inc(2, status='ok')
+    latency.observe(0.05)
+
+    # Snapshot written by another worker process
+    sibling = Registry()
+    sibling_requests = sibling.register(Counter('demo_requests_total', 'Requests', ('status',)))
+    sibling_latency = sibling.register(Histogram('demo_latency_seconds', 'Latency', buckets=(0.1, 1)))
+    sibling_requests.inc(3, status='ok')
+    sibling_requests.inc(status='error')
+    sibling_latency.observe(0.5)
+    # Named after a process that is running (the test runner's parent)
+    with open(tmp_path / f'{os.getppid()}.json', 'w') as f:
+        json.dump(sibling.families(), f)
+
+    text = registry.render()
+    assert 'demo_requests_total{status="ok"} 5' in text
+    assert 'demo_requests_total{status="error"} 1' in text
+    assert 'demo_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'demo_latency_seconds_bucket{le="1"} 2' in text
+    assert 'demo_latency_seconds_count 2' in text
+
+def test_shared_gauges_are_per_process_and_exited_processes_keep_their_counts(tmp_path):
+    registry = Registry()
+    requests_total = registry.register(Counter('demo_requests_total', 'Requests'))
+    registry.add_collector(lambda: [('demo_backend_up', 'gauge', 'Up', [({'backend': 'a'}, 1)])])
+    registry.add_collector(lambda: [('demo_jobs', 'gauge', 'Jobs in the shared queue', [({}, 7)])], shared=True)
+    registry.share(str(tmp_path), interval=3600)
+    requests_total.inc()
+
+    sibling = Registry()
+    sibling.register(Counter('demo_requests_total', 'Requests')).inc(4)
+    sibling.add_collector(lambda: [('demo_backend_up', 'gauge', 'Up', [({'backend': 'a'}, 1)])])
+    with open(tmp_path / f'{os.getppid()}.json', 'w') as f:
+        json.dump(sibling.families(), f)
+    # Left behind by a worker that has exited
+    exited = subprocess.Popen([sys.executable, '-c', 'pass'])
+    exited.wait()
+    with open(tmp_path / f'{exited.pid}.json', 'w') as f:
+        json.dump(sibling.families(), f)
+
+    text = registry.render()
+    # The exited worker's count stays in the total; its gauge is gone
+    assert 'demo_requests_total 9' in text
+    assert f'demo_backend_up{{backend="a",pid="{os.getpid()}"}} 1' in text
+    assert f'demo_backend_up{{backend="a",pid="{os.getppid()}"}} 1' in text
+    assert text.count('demo_backend_up{') == 2
+    assert '\ndemo_jobs 7\n' in text and 'demo_jobs{' not in text
+    assert not (tmp_path / f'{exited.pid}.json').exists()
+    # Folded once: later scrapes don't count it again
+    assert 'demo_requests_total 9' in registry.render()
+
+def test_stopped_process_writes_no_snapshot(tmp_path):
+    registry = Registry()
+    registry.register(Counter('demo_requests_total', 'Requests')).inc()
+    registry.share(str(tmp_path), interval=3600)
+    registry.flush()
+    registry.stop_sharing()
+    registry.flush()
+    assert not (tmp_path / f'{os.getpid()}.json').exists()
@@ -0,0 +1,92 @@
+import os
+import sys
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import requests
+
+from src.utils import model_warmup, test_generator
+from src.utils.ai_providers.base import AIProvider
+from src.utils.ai_providers.pool import OPEN, ProviderPool
+from src.utils.model_warmup import ModelWarmer, first_token_ms, parse_hours
+from src.utils.llm_gate import LLMGate
+
+def ollama_stats(load_ms, prompt_eval_ms=50, eval_ms=200, eval_count=10):
+    return {'total_duration': int((load_ms + prompt_eval_ms + eval_ms) * 1e6), 'load_duration': int(load_ms * 1e6),
+            'prompt_eval_duration': int(prompt_eval_ms * 1e6), 'eval_duration': int(eval_ms * 1e6), 'eval_count': eval_count}
+
+def test_first_token_latency_from_ollama_durations():
+    assert first_token_ms(ollama_stats(load_ms=3000)) == 3000 + 50 + 20
+    assert first_token_ms({'response': 'no timings'}) is None
+
+def test_parse_hours():
+    assert parse_hours('8-19') == (8, 19)
+    assert parse_hours('') is None
+
+def test_observe_splits_cold_and_warm_starts():
+    warmer = ModelWarmer(cold_load_ms=500)
+    warmer.observe(ollama_stats(load_ms=4000))
+    warmer.observe(ollama_stats(load_ms=10))
+    warmer.observe(ollama_stats(load_ms=20))
+    latency = warmer.stats()['first_token_latency']
+    assert latency['cold']['count'] == 1 and latency['cold']['last_ms'] == 4070
+    assert latency['warm']['count'] == 2 and latency['warm']['max_ms'] == 90
+    assert warmer.stats()['last_call_at'] is not None
+
+class Backend(AIProvider):
+    """Stands in for one model host in a ProviderPool, recording what it is sent"""
+
+    def __init__(self, kind, url, load_ms=2500, fail=False, on_call=None):
+        self.kind, self.url, self.load_ms, self.fail, self.on_call = kind, url, load_ms, fail, on_call
+        self.sent = []
+
+    def call(self, payload, timeout):
+        self.sent.append(payload)
+        if self.on_call:
+            self.on_call()
+        if self.fail:
+            raise requests.ConnectionError('refused')
+        return ollama_stats(load_ms=self.load_ms)
+
+    def generate_completion(self, prompt):
+        return ''
+
+def test_ping_warms_every_ollama_backend_through_the_pool():
+    first, second, localai = Backend('ollama', 'http://gpu1'), Backend('ollama', 'http://gpu2', fail=True), Backend('localai', 'http://cpu')
+    pool = ProviderPool([first, second, localai], failure_threshold=1, reset_seconds=60)
+    warmer = ModelWarmer(pool, keep_alive='1h')
+    warmer.model = 'llama3'
+    results = warmer.ping()
+    assert [result['backend'] for result in results] == ['ollama=http://gpu1', 'ollama=http://gpu2']
+    assert first.sent[0]['keep_alive'] == '1h' and first.sent[0]['model'] == 'llama3'
+    assert first.sent[0]['options'] == {'num_predict': 1} and localai.sent == []
+    assert results[0]['load_ms'] == 2500 and results[0]['first_token_ms'] == 2570
+    assert 'refused' in results[1]['error']
+    assert warmer.stats()['first_token_latency']['cold']['count'] == 1
+
+    # Counted by the pool: requests, failures and the breaker, without skewing the latency average
+    stats = pool.stats()
+    assert [backend['requests'] for backend in stats] == [1, 1, 0]
+    assert stats[1]['state'] == OPEN and stats[1]['failures'] == 1
+    assert all(backend['outstanding'] == 0 and backend['latency_ewma_s'] is None for backend in stats)
+    # An ejected backend is not pinged until its breaker lets a probe through
+    assert 'ejected' in warmer.ping()[1]['error'] and len(second.sent) == 1
+
+def test_ping_holds_a_gate_slot_and_is_skipped_when_none_is_free(monkeypatch):
+    gate = LLMGate(max_concurrent=1)
+    active_during_call = []
+    backend = Backend('ollama', 'http://gpu1', load_ms=10, on_call=lambda: active_during_call.append(gate.stats()['active']))
+
+    monkeypatch.setattr(model_warmup, 'backend_gate', gate)
+    warmer = ModelWarmer(ProviderPool([backend]))
+    warmer.model = 'llama3'
+    assert 'first_token_ms' in warmer.ping()[0] and active_during_call == [1]
+    with gate.slot():
+        assert 'skipped' in warmer.ping()[0]
+    assert active_during_call == [1] and gate.stats()['active'] == 0
+
+def test_generation_calls_carry_keep_alive(monkeypatch):
+    monkeypatch.setattr(test_generator.settings, 'OLLAMA_KEEP_ALIVE', '45m')
+    assert test_generator.TestGenerator()._ollama_payload('m', 'p')['keep_alive'] == '45m'
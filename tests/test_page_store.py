@@ -0,0 +1,38 @@
+import os
+import sys
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.utils.page_store import PageStore
+
+def test_pages_carry_only_summary_fields():
+    store = PageStore(('description', 'test_type'))
+    cases = [{'description': f'Case {i}', 'test_type': 'negative', 'curl_command': 'curl x' * 1000} for i in range(120)]
+    key = store.put(cases)
+
+    page = store.page(key, offset=100, limit=50)
+    assert page['total'] == 120 and len(page['items']) == 20
+    assert page['items'][0] == {'index': 100, 'description': 'Case 100', 'test_type': 'negative'}
+    assert store.item(key, 100)['curl_command'] == cases[100]['curl_command']
+    assert store.item(key, 120) is None
+
+def test_least_recently_used_entries_are_evicted():
+    store = PageStore(('description',), max_entries=2)
+    first, second = store.put([{}]), store.put([{}])
+    store.page(first)  # touching keeps it alive
+    store.put([{}])
+    assert store.page(second) is None and store.page(first) is not None
+
+def test_invalid_page_size_is_a_client_error(monkeypatch):
+    import app as gentest_app
+    monkeypatch.setattr(gentest_app, 'generate_suite', lambda curl_command: ([{'description': 'Case'}], {}, False, None))
+    client = gentest_app.app.test_client()
+    for page_size in ('ten', -1, 2.5, True):
+        response = client.post('/generate-tests', json={'curl_command': 'curl http://api.test', 'page_size': page_size})
+        assert response.status_code == 400 and 'page_size' in response.get_json()['error']
+        response = client.post('/run_tests', json={'curl_command': 'curl http://api.test', 'page_size': page_size})
+        assert response.status_code == 400
+    body = client.post('/generate-tests', json={'curl_command': 'curl http://api.test', 'page_size': '5'}).get_json()
+    assert body['page']['total'] == 1
@@ -0,0 +1,72 @@
+import os
+import sys
+import threading
+
+import pytest
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.utils.profiler import ProfileStore
+
+def slow_parse(n):
+    return sum(i * i for i in range(n))
+
+def test_capture_report_and_pruning(tmp_path):
+    store = ProfileStore(str(tmp_path), max_profiles=2)
+    result, first = store.run('POST /generate-tests', slow_parse, 10000)
+    assert result == slow_parse(10000)
+    assert 'slow_parse' in store.report(first, sort='tottime')
+    assert store.file_path(first).endswith(f'{first}.prof')
+
+    store.run('POST /run_tests', slow_parse, 10)
+    store.run('POST /run_tests', slow_parse, 10)
+    profiles = store.list()
+    assert len(profiles) == 2 and first not in [meta['profile_id'] for meta in profiles]
+    assert store.report(first) is None
+    assert store.file_path('../../etc/passwd') is None
+
+def test_failed_call_is_still_captured(tmp_path):
+    store = ProfileStore(str(tmp_path))
+
+    def fail():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError):
+        store.run('job', fail, profile_id='a' * 32)
+    assert store.list()[0]['profile_id'] == 'a' * 32
+
+def test_overlapping_capture_runs_unprofiled(tmp_path):
+    store = ProfileStore(str(tmp_path))
+    entered, release = threading.Event(), threading.Event()
+
+    def hold():
+        entered.set()
+        release.wait(5)
+
+    thread = threading.Thread(target=store.run, args=('first', hold))
+    thread.start()
+    entered.wait(5)
+    assert store.run('second', slow_parse, 10) == (slow_parse(10), None)
+    release.set()
+    thread.join()
+    assert len(store.list()) == 1
+
+def test_job_result_records_whether_it_was_profiled(tmp_path, monkeypatch):
+    import app as gentest_app
+    monkeypatch.setattr(gentest_app, 'profile_store', ProfileStore(str(tmp_path)))
+    monkeypatch.setattr(gentest_app, 'run_job', lambda curl_command, priority: {'test_count': 0})
+    client = gentest_app.app.test_client()
+
+    def submit():
+        body = client.post('/jobs/run-tests', json={'curl_command': 'curl http://api.test'}, headers={'X-Profile': '1'}).get_json()
+        assert 'profile_url' not in body
+        return gentest_app.job_queue.wait(body['job_id'], timeout=5).result
+
+    profiled = submit()
+    assert profiled['profile_url'].endswith(profiled['profile_id']) and profiled['test_count'] == 0
+    # A capture already running: the job runs unprofiled and says so
+    with gentest_app.profile_store._lock:
+        unprofiled = submit()
+    assert unprofiled['profile_id'] is None and unprofiled['profile_url'] is None
@@ -0,0 +1,53 @@
+import json
+import os
+import sys
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.utils import test_generator
+from src.utils.prompt_budget import Placeholders, compact_curl, estimate_tokens, group_plan
+
+TOKEN = 'eyJ' + 'a' * 600
+DOCUMENT = 'x' * 5000
+
+def big_curl():
+    body = json.dumps({'name': 'Widget', 'document': DOCUMENT, 'tags': [f'tag-{i}' for i in range(300)]}, indent=2)
+    return (f"curl -X POST 'https://api.example.com/items?debug=1' -H 'Authorization: Bearer {TOKEN}' "
+            f"-H 'Content-Type: application/json' -d '{body}'")
+
+def test_compact_curl_round_trips_through_placeholders():
+    placeholders = Placeholders(max_value_chars=100)
+    compacted = compact_curl(big_curl(), placeholders)
+    assert TOKEN not in compacted and DOCUMENT not in compacted and 'tag-299' not in compacted
+    assert len(compacted) < 400
+
+    # A model answer that copied the placeholders into a modified request
+    answer = [{'description': 'Missing name', 'curl_command': compacted.replace('"name":"Widget",', '')}]
+    restored = placeholders.restore(answer)[0]['curl_command']
+    assert TOKEN in restored and DOCUMENT in restored
+    assert json.loads(restored.split("-d '", 1)[1][:-1]) == {'document': DOCUMENT, 'tags': [f'tag-{i}' for i in range(300)]}
+
+def test_group_plan_lists_each_kind_once():
+    plan = group_plan([('header', ['Authorization', 'Content-Type']), ('query parameter', [])])
+    assert plan.count('Missing required header') == 1 and 'query parameter' not in plan
+
+def test_optimized_prompt_fits_budget(monkeypatch):
+    monkeypatch.setattr(test_generator.settings, 'PROMPT_TOKEN_BUDGET', 1200)
+    generator = test_generator.TestGenerator()
+    curl = big_curl()
+    parsed = {
+        'url': 'https://api.example.com/items?debug=1',
+        'method': 'POST',
+        'headers': {'Authorization': f'Bearer {TOKEN}', 'Content-Type': 'application/json'},
+        'body': {'name': 'Widget', 'document': DOCUMENT, 'tags': [f'tag-{i}' for i in range(300)]}
+    }
+    prompt = generator._generate_optimized_prompt(curl, parsed)
+    assert prompt.tokens <= 1200 and estimate_tokens(prompt.text) == prompt.tokens
+    assert prompt.steps == ['compact_json', 'group_plan', 'placeholders']
+    assert prompt.restore([{'curl_command': '<<VALUE_1>>'}])[0]['curl_command'] in (f'Bearer {TOKEN}', TOKEN, DOCUMENT)
+
+    small = generator._generate_optimized_prompt("curl 'https://api.example.com/ping'",
+                                                 {'url': 'https://api.example.com/ping', 'headers': {}, 'body': {}})
+    assert small.steps == ['compact_json'] and not small.placeholders
@@ -0,0 +1,211 @@
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.utils import test_generator
+from src.utils.ai_providers.base import AIProvider
+from src.utils.ai_providers.pool import (BackendUnavailableError, CircuitBreaker, ProviderPool, CLOSED, OPEN,
+                                         parse_backend_spec)
+
+class StandIn:
+    """A local HTTP server playing an Ollama or LocalAI backend"""
+
+    def __init__(self, name, delay=0.0, status=200, models=('llama3',), drop=False):
+        self.name, self.delay, self.status, self.models, self.drop = name, delay, status, list(models), drop
+        self.calls = 0
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._reply(200, {'models': [{'name': name} for name in stand_in.models]})
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                stand_in.calls += 1
+                time.sleep(stand_in.delay)
+                if stand_in.status != 200:
+                    return self._reply(stand_in.status, {'error': 'broken'})
+                if stand_in.drop:
+                    # Promise a full body, send part of it and hang up
+                    self.send_response(200)
+                    self.send_header('Content-Length', '1000')
+                    self.end_headers()
+                    self.wfile.write(b'{"response": "par')
+                    self.wfile.flush()
+                    self.close_connection = True
+                    return
+                if self.path == '/v1/completions':
+                    return self._reply(200, {'choices': [{'text': f"{stand_in.name}: {payload['prompt']}"}],
+                                             'usage': {'prompt_tokens': 3, 'completion_tokens': 4}})
+                self._reply(200, {'model': payload['model'], 'response': f"{stand_in.name}: {payload['prompt']}", 'done': True})
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def stand_ins():
+    servers = []
+
+    def make(*args, **kwargs):
+        servers.append(StandIn(*args, **kwargs))
+        return servers[-1]
+
+    yield make
+    for server in servers:
+        server.close()
+
+def unused_url():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+PAYLOAD = {'model': 'llama3', 'prompt': 'hi', 'stream': False}
+
+def test_parse_backend_spec():
+    assert parse_backend_spec('http://gpu1:11434') == ('ollama', 'http://gpu1:11434')
+    assert parse_backend_spec('localai=http://localhost:8080') == ('localai', 'http://localhost:8080')
+
+def test_routes_to_the_faster_backend_once_latency_is_known(stand_ins):
+    slow, fast = stand_ins('slow', delay=0.15), stand_ins('fast')
+    pool = ProviderPool.from_specs([slow.url, fast.url])
+    for _ in range(6):
+        pool.call(PAYLOAD, timeout=5)
+    # Each backend is tried at most until its latency is measured; then the fast one takes over
+    assert slow.calls <= 1 and fast.calls >= 5
+
+def test_spreads_concurrent_calls_by_outstanding_requests(stand_ins):
+    first, second = stand_ins('first', delay=0.3), stand_ins('second', delay=0.3)
+    pool = ProviderPool.from_specs([first.url, second.url])
+    threads = [threading.Thread(target=pool.call, args=(PAYLOAD, 5)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.02)
+    for thread in threads:
+        thread.join()
+    assert first.calls == 2 and second.calls == 2
+
+def test_fails_over_mid_request_and_ejects_a_broken_backend(stand_ins):
+    broken, healthy = stand_ins('broken', status=500), stand_ins('healthy', delay=0.05)
+    pool = ProviderPool.from_specs([broken.url, healthy.url], failure_threshold=2, reset_seconds=60)
+    # Unknown latencies rank both the same, so the broken one (listed first) is tried first
+    for _ in range(4):
+        answer, backend = pool.call(PAYLOAD, timeout=5)
+        assert answer['response'] == 'healthy: hi' and backend.provider.url == healthy.url
+    assert broken.calls == 2
+    assert [backend['state'] for backend in pool.stats()] == [OPEN, CLOSED]
+
+def test_unreachable_backend_fails_over(stand_ins):
+    healthy = stand_ins('healthy')
+    pool = ProviderPool.from_specs([unused_url(), healthy.url])
+    answer, _ = pool.call(PAYLOAD, timeout=5)
+    assert answer['response'] == 'healthy: hi'
+    assert pool.stats()[0]['failures'] == 1
+
+def test_refusing_backend_is_skipped_but_not_ejected(stand_ins):
+    refusing, healthy = stand_ins('refusing', status=404), stand_ins('healthy', delay=0.05)
+    pool = ProviderPool.from_specs([refusing.url, healthy.url], failure_threshold=1)
+    assert pool.call(PAYLOAD, timeout=5)[0]['response'] == 'healthy: hi'
+    assert pool.stats()[0]['state'] == CLOSED
+
+def test_connection_dropped_mid_response_fails_over_and_settles_the_probe(stand_ins):
+    dropping, healthy = stand_ins('dropping', drop=True), stand_ins('healthy', delay=0.05)
+    pool = ProviderPool.from_specs([dropping.url, healthy.url], failure_threshold=1, reset_seconds=0.05)
+    assert pool.call(PAYLOAD, timeout=5)[0]['response'] == 'healthy: hi'
+    assert pool.stats()[0]['state'] == OPEN and pool.stats()[0]['outstanding'] == 0
+
+    # After the reset the half-open probe goes back to the dropping backend, fails and reopens it
+    time.sleep(0.06)
+    assert pool.call(PAYLOAD, timeout=5)[0]['response'] == 'healthy: hi'
+    assert dropping.calls == 2 and pool.stats()[0]['state'] == OPEN
+
+def test_unexpected_error_still_settles_a_half_open_probe():
+    class Broken(AIProvider):
+        kind, url = 'ollama', 'http://broken'
+
+        def call(self, payload, timeout):
+            raise RuntimeError('bug')
+
+        def generate_completion(self, prompt):
+            raise RuntimeError('bug')
+
+    pool = ProviderPool([Broken()], failure_threshold=1, reset_seconds=0.05)
+    with pytest.raises(RuntimeError):
+        pool.call(PAYLOAD, timeout=1)
+    assert pool.stats()[0]['state'] == OPEN
+    time.sleep(0.06)
+    with pytest.raises(RuntimeError):
+        pool.call(PAYLOAD, timeout=1)
+    # Reopened rather than stuck half-open, so it is probed again after the next reset
+    assert pool.stats()[0]['state'] == OPEN
+    time.sleep(0.06)
+    assert pool.backends[0].breaker.allow()
+
+def test_localai_answers_are_reshaped_like_ollama(stand_ins):
+    localai = stand_ins('localai')
+    pool = ProviderPool.from_specs([f"localai={localai.url}"], localai_model='gpt4all-j')
+    answer, _ = pool.call(PAYLOAD, timeout=5)
+    assert answer['response'] == 'localai: hi' and answer['eval_count'] == 4
+    assert pool.models() == ['gpt4all-j']
+
+def test_models_prefer_ollama_backends(stand_ins):
+    ollama, localai = stand_ins('ollama', models=('mistral',)), stand_ins('localai')
+    pool = ProviderPool.from_specs([f"localai={localai.url}", ollama.url])
+    assert pool.models() == ['mistral']
+
+def test_raises_when_no_backend_answers(stand_ins):
+    slow = stand_ins('slow', delay=0.5)
+    with pytest.raises(requests.Timeout):
+        ProviderPool.from_specs([slow.url]).call(PAYLOAD, timeout=0.1)
+    with pytest.raises(BackendUnavailableError):
+        ProviderPool.from_specs([unused_url()]).call(PAYLOAD, timeout=1)
+
+def test_circuit_breaker_probes_after_reset():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+    time.sleep(0.06)
+    # One probe only while half-open
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+
+def test_generator_calls_go_through_the_pool(stand_ins, monkeypatch):
+    healthy = stand_ins('healthy', models=('mistral',))
+    monkeypatch.setattr(test_generator, 'provider_pool', ProviderPool.from_specs([unused_url(), healthy.url]))
+    generator = test_generator.TestGenerator()
+    assert generator._select_model() == 'mistral'
+    stdout, stderr = generator._call_ollama('mistral', 'hi', 5)
+    assert json.loads(stdout)['response'] == 'healthy: hi' and stderr == b''
+
+    monkeypatch.setattr(test_generator, 'provider_pool', ProviderPool.from_specs([unused_url()]))
+    stdout, stderr = generator._call_ollama('mistral', 'hi', 5)
+    assert stdout == b'' and b'No model backend answered' in stderr
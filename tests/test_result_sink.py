@@ -0,0 +1,27 @@
+import os
+import sys
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import pytest
+from src.utils.result_sink import JSONLResultSink, iter_results, aggregate, tail
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_sink_streams_and_reader_aggregates(tmp_path, compress):
+    with JSONLResultSink(str(tmp_path / 'results.jsonl'), compress=compress) as sink:
+        for i in range(10):
+            sink.write({'test_name': f'Test {i}', 'test_type': 'negative', 'status': 'PASS' if i % 3 else 'FAIL'})
+        assert sink.summary()['total'] == 10
+
+    assert sink.path.endswith('.gz') == compress
+    assert aggregate(sink.path)['passed'] == 6 and aggregate(sink.path)['failed'] == 4
+    assert [r['test_name'] for r in tail(sink.path, 3, block_size=16)] == ['Test 7', 'Test 8', 'Test 9']
+
+def test_reader_skips_line_cut_off_by_a_crash(tmp_path):
+    path = tmp_path / 'results.jsonl'
+    path.write_text('{"status":"PASS"}\n{"status":"FAIL"}\n{"status":"PA')
+
+    assert [r['status'] for r in iter_results(str(path))] == ['PASS', 'FAIL']
+    assert [r['status'] for r in tail(str(path), 5)] == ['PASS', 'FAIL']
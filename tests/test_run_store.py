@@ -0,0 +1,33 @@
+import os
+import sys
+import time
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.utils.run_store import RunStore
+
+def make_result(description, status, ts):
+    test = {'method': 'GET', 'endpoint': '/api/users', 'description': description, 'test_type': 'negative'}
+    return {'test': test, 'status': status, 'expected_status_code': 400, 'actual_status_code': 400, 'timestamp': ts}
+
+def test_pass_rate_and_flaky_tests(tmp_path):
+    store = RunStore(str(tmp_path / 'history.db'))
+    now = time.time()
+
+    for run in range(4):
+        run_id = store.begin_run()
+        store.record_many(run_id, [
+            make_result('Stable test', 'PASS', now - run * 60),
+            make_result('Flaky test', 'PASS' if run % 2 else 'FAIL', now - run * 60),
+        ])
+    # Results older than the window are ignored
+    store.record(store.begin_run(), make_result('Stable test', 'FAIL', now - 120 * 86400))
+
+    assert store.pass_rate('/api/users', days=90) == 75.0
+    assert store.pass_rate('/api/unknown') is None
+
+    flaky = store.flaky_tests(days=30)
+    assert [t['test_name'] for t in flaky] == ['Flaky test']
+    assert flaky[0]['runs'] == 4 and flaky[0]['pass_rate'] == 50.0
@@ -0,0 +1,41 @@
+import os
+import sys
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.utils.shard_queue import ShardQueue
+
+TEST_CASES = [{'description': f'Test {i}', 'expected_status_code': 200} for i in range(5)]
+
+def test_shards_are_merged_in_order(tmp_path):
+    queue = ShardQueue(str(tmp_path / 'shards.db'))
+    run_id = queue.enqueue(TEST_CASES, shard_size=2)
+
+    while True:
+        shard = queue.claim(run_id, 'worker-1')
+        if shard is None:
+            break
+        results = [{'test': t, 'success': True} for t in shard['test_cases']]
+        assert queue.complete(run_id, shard['shard_id'], 'worker-1', results)
+
+    assert queue.is_finished(run_id)
+    merged = queue.collect(run_id)
+    assert [r['test']['description'] for r in merged] == [t['description'] for t in TEST_CASES]
+
+def test_expired_lease_is_reassigned_and_retries_are_bounded(tmp_path):
+    # A zero-second lease behaves like a worker that died right after claiming
+    queue = ShardQueue(str(tmp_path / 'shards.db'), lease_seconds=0, max_attempts=2)
+    run_id = queue.enqueue(TEST_CASES[:1], shard_size=1)
+
+    first = queue.claim(run_id, 'dead-worker')
+    second = queue.claim(run_id, 'worker-2')
+    assert second['shard_id'] == first['shard_id'] and second['attempt'] == 2
+
+    # The dead worker can no longer report for a shard it lost
+    assert not queue.complete(run_id, first['shard_id'], 'dead-worker', [])
+
+    assert queue.claim(run_id, 'worker-3') is None
+    assert queue.progress(run_id) == {'failed': 1}
+    assert queue.collect(run_id)[0]['status'] == 'ERROR'
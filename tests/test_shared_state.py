@@ -0,0 +1,78 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.utils.page_store import SQLitePageStore
+from src.utils.job_queue import SQLiteJobQueue
+
+def test_pages_written_by_one_worker_are_read_by_another(tmp_path):
+    db_path = str(tmp_path / 'state.db')
+    writer = SQLitePageStore(db_path, 'test_cases', ('description',), max_entries=2)
+    reader = SQLitePageStore(db_path, 'test_cases', ('description',))
+    key = writer.put([{'description': f'Case {i}', 'curl_command': 'curl x'} for i in range(5)])
+
+    page = reader.page(key, offset=3, limit=10)
+    assert page['total'] == 5 and [item['index'] for item in page['items']] == [3, 4]
+    assert reader.item(key, 4)['curl_command'] == 'curl x'
+
+    writer.put([{}])
+    writer.put([{}])
+    assert reader.page(key) is None
+
+def test_job_state_is_visible_and_cancellable_from_another_worker(tmp_path):
+    db_path = str(tmp_path / 'state.db')
+    owner = SQLiteJobQueue(db_path, max_workers=1)
+    other = SQLiteJobQueue(db_path, max_workers=1)
+    release = threading.Event()
+
+    running = owner.submit('run', lambda: release.wait(5) and 'done')
+    queued = owner.submit('run', lambda: 'never')
+    assert other.cancel(queued.id)
+
+    release.set()
+    finished = other.wait(running.id, timeout=5)
+    assert finished.state == 'succeeded' and finished.result == 'done'
+    assert owner.wait(queued.id, timeout=5).state == 'cancelled'
+    owner.shutdown()
+    other.shutdown()
+
+def test_jobs_of_a_dead_worker_are_failed_and_free_the_queue(tmp_path):
+    db_path = str(tmp_path / 'state.db')
+    queue = SQLiteJobQueue(db_path, max_workers=1, max_pending=1)
+    release = threading.Event()
+    live = queue.submit('run', lambda: release.wait(5) and 'done')
+
+    # Rows left behind by a worker that exited mid-job, and by one that stopped renewing its lease
+    dead_pid = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead_pid.wait()
+    conn = sqlite3.connect(db_path)
+    with conn:
+        for job_id, owner_pid, lease_expires in (('dead', dead_pid.pid, time.time() + 60),
+                                                 ('stale', os.getpid(), time.time() - 1)):
+            conn.execute("INSERT INTO jobs (job_id, state, data, owner_pid, lease_expires) VALUES (?, 'queued', ?, ?, ?)",
+                         (job_id, '{"job_id": "%s", "kind": "run", "state": "queued", "version": 1, "submitted_at": 0, '
+                                  '"started_at": null, "finished_at": null, "error": null}' % job_id,
+                          owner_pid, lease_expires))
+    conn.close()
+
+    other = SQLiteJobQueue(db_path, max_workers=1, max_pending=1)
+    # Neither orphan counts against max_pending
+    queued = other.submit('run', lambda: 'ok')
+    for job_id in ('dead', 'stale'):
+        orphan = other.get(job_id)
+        assert orphan.state == 'failed' and 'stopped before the job finished' in orphan.error
+    assert other.get(live.id).state != 'failed'
+    release.set()
+    assert other.wait(queued.id, timeout=5).state == 'succeeded'
+    # Counts cover every process's jobs, not just this one's
+    assert other.wait(live.id, timeout=5).state == 'succeeded'
+    assert other.stats()['failed'] == 2 and other.stats()['succeeded'] == 2
+    queue.shutdown()
+    other.shutdown()
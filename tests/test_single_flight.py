@@ -0,0 +1,55 @@
+import os
+import sys
+import threading
+import time
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.single_flight import SingleFlight
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    executions = []
+    release = threading.Event()
+
+    def generate():
+        executions.append(1)
+        release.wait(5)
+        return ['case']
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(flights.do, 'curl-a', generate) for _ in range(5)]
+        while flights.stats()['waiting'] < 4:
+            time.sleep(0.01)
+        release.set()
+        outcomes = [future.result() for future in futures]
+
+    assert len(executions) == 1
+    assert all(result == ['case'] for result, _ in outcomes)
+    assert sorted(shared for _, shared in outcomes) == [False, True, True, True, True]
+    assert flights.stats()['coalesced_waiters'] == 4 and flights.stats()['in_flight'] == 0
+
+    # Landed flights are not cached
+    flights.do('curl-a', generate)
+    assert len(executions) == 2
+
+def test_waiters_receive_the_leaders_error():
+    flights = SingleFlight()
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError('model unavailable')
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flights.do, 'curl-b', fail)
+        started.wait(5)
+        waiter = pool.submit(flights.do, 'curl-b', fail)
+        for future in (leader, waiter):
+            with pytest.raises(RuntimeError):
+                future.result()
@@ -0,0 +1,54 @@
+import os
+import sys
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import yaml
+from src.api_parser import APIParser
+from src.utils.suite_cache import SuiteCache
+
+SPEC = {
+    'openapi': '3.0.0',
+    'paths': {
+        '/api/users': {
+            'post': {
+                'requestBody': {'content': {'application/json': {'schema': {'$ref': '#/components/schemas/User'}}}},
+                'responses': {'201': {'description': 'User created'}}
+            }
+        },
+        '/api/users/{user_id}': {
+            'get': {
+                'parameters': [{'name': 'user_id', 'in': 'path', 'schema': {'type': 'integer'}}],
+                'responses': {'200': {'description': 'User'}}
+            }
+        }
+    },
+    'components': {'schemas': {'User': {'type': 'object', 'properties': {'name': {'type': 'string'}}}}}
+}
+
+def write_spec(tmp_path, spec):
+    spec_path = tmp_path / 'spec.yaml'
+    spec_path.write_text(yaml.safe_dump(spec))
+    return str(spec_path)
+
+def test_fingerprint_changes_only_for_edited_operation(tmp_path):
+    before = APIParser.fingerprint_openapi(write_spec(tmp_path, SPEC))
+    assert before == APIParser.fingerprint_openapi(write_spec(tmp_path, SPEC))
+
+    # Editing a shared schema must invalidate the operation that references it
+    changed = yaml.safe_load(yaml.safe_dump(SPEC))
+    changed['components']['schemas']['User']['properties']['age'] = {'type': 'integer'}
+    after = APIParser.fingerprint_openapi(write_spec(tmp_path, changed))
+
+    assert after['POST_/api/users'] != before['POST_/api/users']
+    assert after['GET_/api/users/{user_id}'] == before['GET_/api/users/{user_id}']
+
+def test_suite_cache_round_trip(tmp_path):
+    cache = SuiteCache(str(tmp_path / 'suites'))
+    assert cache.get('abc') is None
+
+    test_cases = [{'description': 'Valid request', 'test_type': 'positive'}]
+    cache.put('abc', 'POST_/api/users', test_cases)
+    assert cache.get('abc') == test_cases
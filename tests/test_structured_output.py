@@ -0,0 +1,80 @@
+import json
+import os
+import sys
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.utils import metrics, test_generator
+
+CASE = {
+    'description': 'Missing required header: Authorization',
+    'test_type': 'negative',
+    'expected_status_code': 400,
+    'curl_command': "curl 'https://api.example.com/items'"
+}
+
+def _path_count(path):
+    family = metrics.AI_PARSE_PATH.family()
+    return next((value for key, value in family['samples'] if key == [path]), 0)
+
+def test_parse_structured_accepts_schema_object_and_bare_array():
+    assert test_generator.parse_structured_test_cases(json.dumps({'test_cases': [CASE]})) == [CASE]
+    assert test_generator.parse_structured_test_cases(json.dumps([CASE])) == [CASE]
+
+def test_parse_structured_rejects_non_conformant_output():
+    assert test_generator.parse_structured_test_cases('Here are your tests: [...]') is None
+    assert test_generator.parse_structured_test_cases(json.dumps({'test_cases': []})) is None
+    assert test_generator.parse_structured_test_cases(json.dumps([{**CASE, 'expected_status_code': 'Bad Request'}])) is None
+    assert test_generator.parse_structured_test_cases(json.dumps([{**CASE, 'test_type': 'edge'}])) is None
+    assert test_generator.parse_structured_test_cases(json.dumps([{k: v for k, v in CASE.items() if k != 'curl_command'}])) is None
+
+def test_parse_structured_keeps_conformant_cases_and_coerces_numeric_status():
+    other = {**CASE, 'description': 'Baseline', 'test_type': 'positive', 'expected_status_code': '200'}
+    response = json.dumps({'test_cases': [CASE, {**CASE, 'test_type': 'edge'}, other, 'not a case']})
+    assert test_generator.parse_structured_test_cases(response) == [CASE, {**other, 'expected_status_code': 200}]
+
+def test_heuristic_parser_unwraps_test_cases_object(monkeypatch):
+    monkeypatch.setattr(test_generator, 'parse_structured_test_cases', lambda ai_response: None)
+    before = _path_count('json')
+    generator = test_generator.TestGenerator()
+    case = {**CASE, 'test_type': 'edge'}
+    assert generator._parse_ai_response(json.dumps({'test_cases': [case]}), CASE['curl_command']) == [case]
+    assert _path_count('json') == before + 1
+
+def test_conformant_response_skips_heuristic_cascade(monkeypatch):
+    def heuristic(self, ai_response, curl_command):
+        raise AssertionError('heuristic parser should not run')
+    monkeypatch.setattr(test_generator.TestGenerator, '_parse_ai_response_heuristic', heuristic)
+
+    before = _path_count('structured')
+    generator = test_generator.TestGenerator()
+    assert generator._parse_ai_response(json.dumps({'test_cases': [CASE]}), CASE['curl_command']) == [CASE]
+    assert _path_count('structured') == before + 1
+
+def test_free_form_response_falls_back_to_heuristics():
+    before = metrics.AI_PARSE_FALLBACK_SECONDS.family()['samples']
+    before_count = before[0][1][2] if before else 0
+    generator = test_generator.TestGenerator()
+    # A JSON array with stray control characters is not strict JSON, but the cascade cleans it up
+    response = json.dumps([CASE]).replace('Authorization', 'Author\x01ization')
+    test_cases = generator._parse_ai_response(response, CASE['curl_command'])
+    assert test_cases[0]['description'] == CASE['description']
+    assert metrics.AI_PARSE_FALLBACK_SECONDS.family()['samples'][0][1][2] == before_count + 1
+
+def test_payload_format_follows_setting(monkeypatch):
+    generator = test_generator.TestGenerator()
+    monkeypatch.setattr(test_generator.settings, 'LLM_OUTPUT_FORMAT', 'schema')
+    assert generator._ollama_payload('m', 'p')['format'] == test_generator.TEST_CASES_SCHEMA
+    monkeypatch.setattr(test_generator.settings, 'LLM_OUTPUT_FORMAT', 'json')
+    assert generator._ollama_payload('m', 'p')['format'] == 'json'
+    monkeypatch.setattr(test_generator.settings, 'LLM_OUTPUT_FORMAT', 'none')
+    assert 'format' not in generator._ollama_payload('m', 'p')
+
+def test_default_case_sends_the_curl_command_not_the_prompt(monkeypatch):
+    monkeypatch.setattr(test_generator.TestGenerator, '_select_model', lambda self: 'm')
+    monkeypatch.setattr(test_generator.TestGenerator, '_call_ollama', lambda self, model, prompt, timeout_seconds: (b'not json', b''))
+    monkeypatch.setattr(test_generator.time, 'sleep', lambda seconds: None)
+    answer = test_generator.TestGenerator()._generate_ai_test_scenarios('the full prompt', CASE['curl_command'])
+    assert json.loads(answer)[0]['curl_command'] == CASE['curl_command']
@@ -0,0 +1,84 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.utils import tracing
+from src.utils.tracing import Tracer, OTLPFileExporter, otlp_spans, critical_path
+
+@pytest.fixture
+def exporter(tmp_path, monkeypatch):
+    exporter = OTLPFileExporter(str(tmp_path), max_files=3)
+    monkeypatch.setattr(tracing, 'tracer', Tracer(exporter))
+    return exporter
+
+def load_spans(exporter):
+    [summary] = exporter.recent()
+    return summary, {span['name']: span for span in otlp_spans(exporter.load(summary['trace_id']))}
+
+def test_nested_spans_export_one_otlp_trace(exporter):
+    @tracing.traced('ai_response.parse')
+    def parse():
+        tracing.annotate(strategy='json')
+
+    with tracing.span('generate', curl_signature='abc'):
+        with tracing.span('llm.attempt', attempt=1):
+            pass
+        parse()
+
+    summary, spans = load_spans(exporter)
+    assert summary['name'] == 'generate' and summary['span_count'] == 3
+    assert summary['attributes'] == {'curl_signature': 'abc'}
+    assert spans['llm.attempt']['attributes'] == {'attempt': 1}
+    assert spans['ai_response.parse']['attributes'] == {'strategy': 'json'}
+    assert spans['ai_response.parse']['parent_id'] == spans['generate']['span_id']
+
+def test_errors_are_recorded_and_pool_threads_join_the_trace(exporter):
+    def execute(index):
+        try:
+            with tracing.span('test.execute', index=index):
+                if index == 1:
+                    raise ValueError('boom')
+        except ValueError:
+            pass
+
+    with tracing.span('run'):
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(tracing.wrap(execute), range(3)))
+
+    summary, _ = load_spans(exporter)
+    spans = otlp_spans(exporter.load(summary['trace_id']))
+    executed = [span for span in spans if span['name'] == 'test.execute']
+    assert summary['error'] and len(executed) == 3
+    run = next(span for span in spans if span['name'] == 'run')
+    assert all(span['parent_id'] == run['span_id'] for span in executed)
+
+def test_critical_path_skips_overlapped_parallel_work():
+    def span(span_id, parent_id, name, start, end):
+        return {'span_id': span_id, 'parent_id': parent_id, 'name': name, 'start_ns': start, 'end_ns': end,
+                'duration_ms': float(end - start), 'attributes': {}}
+
+    spans = [
+        span('r', None, 'run', 0, 100),
+        span('g', 'r', 'generate', 0, 60),
+        span('t1', 'r', 'test.execute', 60, 80),
+        span('t2', 'r', 'test.execute', 60, 95),
+        span('l', 'g', 'llm.call', 10, 55)
+    ]
+    path = critical_path(spans)
+    assert [(step['name'], step['depth']) for step in path] == [
+        ('run', 0), ('generate', 1), ('llm.call', 2), ('test.execute', 1)
+    ]
+    assert path[0]['self_ms'] == 5.0 and path[-1]['duration_ms'] == 35.0
+
+def test_exporter_keeps_newest_traces(exporter):
+    for _ in range(5):
+        with tracing.span('generate'):
+            pass
+    assert len(exporter.recent()) == 3
+    assert exporter.load('../../etc/passwd') is None
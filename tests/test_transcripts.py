@@ -0,0 +1,48 @@
+import json
+import os
+import sys
+import threading
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.utils.transcripts import TranscriptStore
+
+def test_sessions_are_isolated_bounded_and_clipped():
+    store = TranscriptStore(max_entries=2, max_chars=10)
+    ids = {}
+
+    def generate(name):
+        with store.session(curl_signature=name) as transcript_id:
+            ids[name] = transcript_id
+            store.note(raw_response=f'{name} response that is long', parse_strategy='json')
+            store.note_attempt(model='mistral', outcome='ok', seconds=0.1)
+
+    threads = [threading.Thread(target=generate, args=(name,)) for name in ('a', 'b')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for name in ('a', 'b'):
+        transcript = store.get(ids[name])
+        assert transcript['raw_response'].startswith(f'{name} respon') and 'more chars' in transcript['raw_response']
+        assert len(transcript['attempts']) == 1 and transcript['duration_ms'] >= 0
+
+    with store.session() as newest:
+        pass
+    assert [summary['transcript_id'] for summary in store.recent()][0] == newest
+    assert len(store.recent()) == 2
+    store.note(raw_response='outside a session is a no-op')
+
+def test_spill_appends_finished_transcripts(tmp_path):
+    store = TranscriptStore(spill_dir=str(tmp_path))
+    with store.session(curl_signature='abc') as transcript_id:
+        store.note(prompt='hello')
+    store._spill_queue.join()
+
+    [spill_file] = os.listdir(tmp_path)
+    with open(tmp_path / spill_file) as f:
+        spilled = [json.loads(line) for line in f]
+    assert spilled[0]['transcript_id'] == transcript_id and spilled[0]['prompt'] == 'hello'
@@ -0,0 +1,12 @@
+"""Production entry point: gunicorn -c gunicorn.conf.py wsgi:app"""
+import gc
+import logging
+
+from app import app, preload_resources
+
+logging.basicConfig(level=logging.INFO)
+preload_resources()
+
+# Everything loaded so far is long-lived; moving it out of the collector's reach
+# keeps GC passes in the workers from touching (and so copying) the shared pages
+gc.freeze()